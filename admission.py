@@ -0,0 +1,140 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class Rejected(Exception):
+    """Raised when a request is turned away; carries the HTTP status and Retry-After seconds."""
+
+    def __init__(self, status, retry_after, message):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """Caps how many requests run at once, with a bounded queue of waiters.
+
+    Requests beyond limit wait up to queue_timeout seconds for a slot; when
+    max_queue requests are already waiting, or the wait times out, they are
+    rejected with a 503 straight away instead of tying up a worker thread.
+    """
+
+    def __init__(self, name, limit, max_queue=0, queue_timeout=5.0):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        # Moving average of how long a request holds its slot, for Retry-After
+        self._avg_hold_time = 1.0
+        self._stats = {'admitted': 0, 'rejected': 0, 'timeouts': 0, 'max_waiting': 0}
+
+    def _retry_after(self):
+        return max(1, math.ceil(self._avg_hold_time * (self._waiting + 1) / self.limit))
+
+    def acquire(self):
+        """Take a slot, waiting in the queue if needed; returns a callable that releases it"""
+        with self._cond:
+            if self._active >= self.limit:
+                if self._waiting >= self.max_queue:
+                    self._stats['rejected'] += 1
+                    raise Rejected(503, self._retry_after(), f"{self.name} is at capacity")
+                self._waiting += 1
+                self._stats['max_waiting'] = max(self._stats['max_waiting'], self._waiting)
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self._active >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats['rejected'] += 1
+                            self._stats['timeouts'] += 1
+                            raise Rejected(503, self._retry_after(), f"{self.name} is at capacity")
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._active += 1
+            self._stats['admitted'] += 1
+        return self._releaser()
+
+    def try_acquire(self):
+        """Take a slot only if one is free right now; returns a release callable, or None"""
+        with self._cond:
+            if self._active >= self.limit or self._waiting:
+                return None
+            self._active += 1
+            self._stats['admitted'] += 1
+        return self._releaser()
+
+    def _releaser(self):
+        started = time.monotonic()
+        released = False
+
+        def release():
+            nonlocal released
+            with self._cond:
+                if released:
+                    return
+                released = True
+                self._active -= 1
+                self._avg_hold_time = 0.8 * self._avg_hold_time + 0.2 * (time.monotonic() - started)
+                self._cond.notify()
+        return release
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats['active'] = self._active
+            stats['waiting'] = self._waiting
+            stats['limit'] = self.limit
+            stats['max_queue'] = self.max_queue
+            stats['avg_hold_time'] = round(self._avg_hold_time, 3)
+        return stats
+
+
+class RateLimiter:
+    """Per-key token buckets: rate tokens per second, holding at most burst.
+
+    Only the max_keys most recently seen keys keep a bucket; a key whose
+    bucket was dropped starts again from a full one.
+    """
+
+    def __init__(self, name, rate, burst, max_keys=10000):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'allowed': 0, 'limited': 0}
+
+    def acquire(self, key):
+        """Spend one token for key, or raise Rejected with a 429 when none is left"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                self._stats['allowed'] += 1
+                limited = False
+            else:
+                self._stats['limited'] += 1
+                limited = True
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if limited:
+            raise Rejected(429, max(1, math.ceil((1 - tokens) / self.rate)),
+                           f"Too many {self.name} requests")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['keys'] = len(self._buckets)
+            stats['rate'] = self.rate
+            stats['burst'] = self.burst
+        return stats
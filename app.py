@@ -1,22 +1,44 @@
+import time
+# Taken before any other import so the startup timings include them
+IMPORT_STARTED = time.perf_counter()
+
 from flask import Flask, render_template, request, jsonify, send_file
-import openai
 import os
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
 import io
+import atexit
+import threading
 
 import requests
 import secrets
 import jwt
 from functools import wraps
-from flask import session, redirect, url_for
-import boto3
+from collections import deque
+from itertools import islice
+from flask import session, redirect, url_for, stream_with_context, make_response
+from flask import before_render_template, template_rendered, g
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 from urllib.parse import urlencode
 import hmac
+import click
 import hashlib
 import base64
+import gzip
+import contextvars
+from pdf_renderer import BrowserPool, font_face_css
+from caching import LRUCache, DiskCache, SQLiteCache, TieredCache, SingleFlight
+from jobs import JobQueue, QueueFull
+from zip_stream import stream_zip
+from json_patch import make_patch, apply_patch
+from write_behind import WriteBehindBuffer
+from admission import ConcurrencyLimiter, RateLimiter, Rejected
+from tracing import Histogram, Tracer, render_metrics
+from clients import (LazyClient, create_http_session, create_httpx_client,
+                     http_session_pool_stats, aws_pool_stats, httpx_pool_stats)
+from keyword_extractor import KeywordExtractor, load_lexicon, synonym_groups
+from resume_scoring import ResumeIndex, KeywordMatcher, score_resume
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Add WeasyPrint import for alternative PDF generation
 # try:
@@ -26,7 +48,28 @@ import base64
 #     WEASYPRINT_AVAILABLE = False
 WEASYPRINT_AVAILABLE = False  
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+
+WARM_UP_ON_START = os.getenv("WARM_UP_ON_START", "false").lower() == "true"
+
+# Seconds from the start of the import to each startup milestone
+startup_timings = {}
+
+# openai and boto3 are slow to import and their clients slow to build, so both
+# are deferred until the first request that needs them (or warm_up)
+def load_openai():
+    import openai
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    openai.max_retries = OPENAI_MAX_RETRIES
+    openai.timeout = openai_timeout()
+    openai.http_client = create_httpx_client(HTTP_POOL_SIZE, openai.timeout)
+    return openai
+
+def openai_timeout(read=None):
+    """Timeout for a model call, read seconds overriding OPENAI_READ_TIMEOUT"""
+    import httpx
+    return httpx.Timeout(read or OPENAI_READ_TIMEOUT, connect=UPSTREAM_CONNECT_TIMEOUT)
+
+openai = LazyClient('openai', load_openai)
 
 # Cognito configuration
 COGNITO_REGION = os.getenv("COGNITO_REGION", "us-east-2")
@@ -42,28 +85,66 @@ AWS_REGION = os.getenv("AWS_REGION", "us-east-2")
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 
-# Initialize AWS clients
-s3_client = boto3.client(
-    's3',
-    region_name=AWS_REGION,
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-)
+# Outbound HTTP: every upstream gets a connect and a read timeout, and keeps its
+# connections alive so repeat calls skip the TCP and TLS handshakes
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "5"))
+AWS_READ_TIMEOUT = float(os.getenv("AWS_READ_TIMEOUT", "30"))
+# Sized for the request threads plus the resume fetch pool sharing one client
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+AWS_RETRY_MODE = os.getenv("AWS_RETRY_MODE", "adaptive")
+AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+COGNITO_READ_TIMEOUT = float(os.getenv("COGNITO_READ_TIMEOUT", "15"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
 
-dynamodb = boto3.resource(
-    'dynamodb',
-    region_name=AWS_REGION,
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-)
+def aws_config():
+    """botocore Config shared by the AWS clients: pool size, timeouts and client-side rate adapting retries"""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=UPSTREAM_CONNECT_TIMEOUT,
+        read_timeout=AWS_READ_TIMEOUT,
+        retries={'mode': AWS_RETRY_MODE, 'total_max_attempts': AWS_MAX_ATTEMPTS},
+        tcp_keepalive=True
+    )
 
-# Initialize Cognito client
-cognito_client = boto3.client(
-    'cognito-idp',
-    region_name=COGNITO_REGION,
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-)
+# AWS clients, each created on first use
+def create_s3_client():
+    import boto3
+    return boto3.client(
+        's3',
+        region_name=AWS_REGION,
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        config=aws_config()
+    )
+
+def create_dynamodb_resource():
+    import boto3
+    return boto3.resource(
+        'dynamodb',
+        region_name=AWS_REGION,
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        config=aws_config()
+    )
+
+def create_cognito_client():
+    import boto3
+    return boto3.client(
+        'cognito-idp',
+        region_name=COGNITO_REGION,
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        config=aws_config()
+    )
+
+s3_client = LazyClient('s3', create_s3_client)
+dynamodb = LazyClient('dynamodb', create_dynamodb_resource)
+cognito_client = LazyClient('cognito-idp', create_cognito_client)
+# Keep-alive session for the Cognito token endpoint
+http_session = LazyClient('http', lambda: create_http_session(HTTP_POOL_SIZE))
 
 def secret_hash(username: str) -> str:
     """Compute secret hash for Cognito authentication"""
@@ -75,11 +156,189 @@ def secret_hash(username: str) -> str:
 # S3 bucket name (you'll need to create this)
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "app-resume-data")
 DYNAMODB_TABLE_NAME = os.getenv("DYNAMODB_TABLE_NAME", "ResumeData")
+LOGIN_WRITE_BATCH_SIZE = int(os.getenv("LOGIN_WRITE_BATCH_SIZE", "25"))
+LOGIN_WRITE_FLUSH_INTERVAL = float(os.getenv("LOGIN_WRITE_FLUSH_INTERVAL", "5"))
+RESUME_INDEX_TABLE_NAME = os.getenv("RESUME_INDEX_TABLE_NAME", "ResumeIndex")
+# Sort key of the index item tracking a user's base snapshot (resume keys always contain a '/')
+RESUME_HEAD_KEY = '#head'
+RESUME_INDEX_SUMMARY_LENGTH = 200
+RESUME_DELTA_SUFFIX = '.patch'
+RESUME_COMPACT_EVERY = int(os.getenv("RESUME_COMPACT_EVERY", "20"))
+RESUME_DELTA_MAX_RATIO = float(os.getenv("RESUME_DELTA_MAX_RATIO", "0.5"))
+RESUME_VERSION_RETENTION = int(os.getenv("RESUME_VERSION_RETENTION", "0"))
+RESUME_SAVE_ATTEMPTS = 3
+S3_FETCH_CONCURRENCY = int(os.getenv("S3_FETCH_CONCURRENCY", "8"))
+S3_GZIP_LEVEL = 6
+
+# Responses the app gzips itself when the client sends Accept-Encoding: gzip
+RESPONSE_GZIP_MIN_BYTES = int(os.getenv("RESPONSE_GZIP_MIN_BYTES", "1024"))
+RESPONSE_GZIP_MIMETYPES = {'application/json', 'text/html'}
+
+# Request tracing: span timings go to /metrics and, when enabled, a Server-Timing header
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+request_latency = Histogram('http_request_duration_seconds', 'Time to produce an HTTP response',
+                            ('method', 'endpoint', 'status'))
+span_latency = Histogram('span_duration_seconds', 'Time spent in named steps of request handling', ('span',))
+tracer = Tracer(span_latency)
+
+def submit_traced(executor, fn, *args):
+    """Submit work to a thread pool so its spans count toward the current request"""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+# Read-through cache of resume bodies for /load-resume and exports
+RESUME_CACHE_MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESUME_CACHE_DIR = os.getenv("RESUME_CACHE_DIR")
+RESUME_CACHE_DISK_MAX_BYTES = int(os.getenv("RESUME_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+
+resume_cache = TieredCache(
+    LRUCache(RESUME_CACHE_MAX_BYTES),
+    DiskCache(RESUME_CACHE_DIR, RESUME_CACHE_DISK_MAX_BYTES) if RESUME_CACHE_DIR else None
+)
+
+# Keyword extraction results shared by everyone who pastes the same job description
+KEYWORD_CACHE_MAX_BYTES = int(os.getenv("KEYWORD_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+KEYWORD_CACHE_TTL = int(os.getenv("KEYWORD_CACHE_TTL", str(7 * 24 * 3600)))
+KEYWORD_CACHE_DB = os.getenv("KEYWORD_CACHE_DB")
+KEYWORD_CACHE_DB_MAX_ENTRIES = int(os.getenv("KEYWORD_CACHE_DB_MAX_ENTRIES", "50000"))
+
+keyword_cache = TieredCache(
+    LRUCache(KEYWORD_CACHE_MAX_BYTES, ttl=KEYWORD_CACHE_TTL),
+    SQLiteCache(KEYWORD_CACHE_DB, KEYWORD_CACHE_DB_MAX_ENTRIES, ttl=KEYWORD_CACHE_TTL) if KEYWORD_CACHE_DB else None
+)
+keyword_flights = SingleFlight()
+
+# "openai" asks GPT-4 for keywords, "local" uses the offline lexicon extractor, and
+# "hybrid" answers from the lexicon and adds the model's keywords when asked to enrich
+KEYWORD_MODES = ('openai', 'local', 'hybrid')
+KEYWORD_EXTRACTION_MODE = os.getenv("KEYWORD_EXTRACTION_MODE", "openai")
+KEYWORD_LEXICON_PATH = os.getenv("KEYWORD_LEXICON_PATH")
+KEYWORD_LOCAL_LIMIT = int(os.getenv("KEYWORD_LOCAL_LIMIT", "30"))
+keyword_lexicon = load_lexicon(KEYWORD_LEXICON_PATH)
+keyword_extractor = KeywordExtractor(keyword_lexicon)
+keyword_synonyms = synonym_groups(keyword_lexicon)
+
+# Normalized resume text for keyword coverage; saved versions never change, so entries stay valid
+COVERAGE_INDEX_CACHE_MAX_BYTES = int(os.getenv("COVERAGE_INDEX_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+coverage_index_cache = LRUCache(COVERAGE_INDEX_CACHE_MAX_BYTES, sizeof=lambda index: index.size)
+
+# Per-bullet AI rewrites; bump REWRITE_PROMPT_VERSION when the rewrite prompts change
+REWRITE_PROMPT_VERSION = 1
+REWRITE_CACHE_MAX_BYTES = int(os.getenv("REWRITE_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+rewrite_cache = LRUCache(REWRITE_CACHE_MAX_BYTES)
+
+# Whole-resume tailoring rewrites up to AI_TAILOR_CONCURRENCY sections in parallel, each call bounded by AI_TAILOR_TIMEOUT seconds
+# and the whole request by AI_TAILOR_DEADLINE (sections still running then keep their original bullets)
+AI_TAILOR_CONCURRENCY = int(os.getenv("AI_TAILOR_CONCURRENCY", "4"))
+AI_TAILOR_TIMEOUT = float(os.getenv("AI_TAILOR_TIMEOUT", "60"))
+AI_TAILOR_DEADLINE = float(os.getenv("AI_TAILOR_DEADLINE", "90"))
+
+# Resume preview fragments: each section is rendered on its own and cached by a hash of its inputs
+PREVIEW_FRAGMENT_CACHE_MAX_BYTES = int(os.getenv("PREVIEW_FRAGMENT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+preview_fragment_cache = LRUCache(PREVIEW_FRAGMENT_CACHE_MAX_BYTES)
+DEFAULT_SECTION_ORDER = ['summary', 'skills', 'experience', 'education', 'projects']
+
+# Last preview rendered per browser session, so an unchanged payload is answered without rendering
+PREVIEW_MEMO_MAX_BYTES = int(os.getenv("PREVIEW_MEMO_MAX_BYTES", str(16 * 1024 * 1024)))
+preview_memo = LRUCache(PREVIEW_MEMO_MAX_BYTES, sizeof=lambda memo: len(memo[1]))
+
+# Resume fields read by each template in templates/resume_sections
+RESUME_SECTION_FIELDS = {
+    'start': (),
+    'header': ('name', 'phone', 'email', 'location', 'linkedin'),
+    'summary': ('summary',),
+    'skills': ('skills',),
+    'experience': ('job_title', 'company', 'exp_location', 'start_date', 'end_date', 'job_description'),
+    'education': ('degree', 'institution', 'program', 'start_date', 'end_date', 'gpa'),
+    'projects': ('project_title', 'project_role', 'project_location', 'project_start', 'project_end',
+                 'project_description'),
+    'end': (),
+}
+
+# PDF rendering configuration
+PDF_POOL_SIZE = int(os.getenv("PDF_POOL_SIZE", "2"))
+PDF_POOL_PAGE_REUSE = int(os.getenv("PDF_POOL_PAGE_REUSE", "50"))
+PDF_RENDER_TIMEOUT = int(os.getenv("PDF_RENDER_TIMEOUT", "30"))
+PDF_OPTIONS = {
+    'format': 'A4',
+    'print_background': True,
+    'margin': {
+        'top': '0.5in',
+        'right': '0.5in',
+        'bottom': '0.5in',
+        'left': '0.5in'
+    }
+}
+
+# Warm Chromium pool shared by every PDF request; browsers start on first use
+# The resume template links this stylesheet; PDF renders get it from memory, built from local font files.
+# Without any, renders stay offline and use the template's system font stack, unless
+# RESUME_FONTS_FROM_NETWORK lets them fetch it (and the font files it points at) from Google Fonts
+RESUME_FONT_CSS_URL = "https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap"
+RESUME_FONT_NETWORK_PREFIXES = ("https://fonts.googleapis.com/", "https://fonts.gstatic.com/")
+RESUME_FONT_DIR = os.getenv("RESUME_FONT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts'))
+RESUME_FONT_CSS = font_face_css(RESUME_FONT_DIR).encode('utf-8')
+RESUME_FONTS_FROM_NETWORK = os.getenv("RESUME_FONTS_FROM_NETWORK", "false").lower() == "true" and not RESUME_FONT_CSS
+
+pdf_pool = BrowserPool(
+    size=PDF_POOL_SIZE,
+    max_page_uses=PDF_POOL_PAGE_REUSE,
+    render_timeout=PDF_RENDER_TIMEOUT,
+    assets={} if RESUME_FONTS_FROM_NETWORK else {RESUME_FONT_CSS_URL: (RESUME_FONT_CSS, 'text/css')},
+    network_prefixes=RESUME_FONT_NETWORK_PREFIXES if RESUME_FONTS_FROM_NETWORK else (),
+    span=tracer.span
+)
+atexit.register(pdf_pool.shutdown)
+
+# Content-addressed cache of rendered PDFs
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR")
+PDF_CACHE_DISK_MAX_BYTES = int(os.getenv("PDF_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+
+pdf_cache = TieredCache(
+    LRUCache(PDF_CACHE_MAX_BYTES),
+    DiskCache(PDF_CACHE_DIR, PDF_CACHE_DISK_MAX_BYTES) if PDF_CACHE_DIR else None
+)
+
+# Background PDF jobs so slow renders don't hold Flask request threads
+PDF_JOB_WORKERS = int(os.getenv("PDF_JOB_WORKERS", str(PDF_POOL_SIZE)))
+PDF_JOB_QUEUE_SIZE = int(os.getenv("PDF_JOB_QUEUE_SIZE", "32"))
+PDF_JOB_RESULT_TTL = int(os.getenv("PDF_JOB_RESULT_TTL", "600"))
+
+pdf_jobs = JobQueue(
+    workers=PDF_JOB_WORKERS,
+    max_queue=PDF_JOB_QUEUE_SIZE,
+    result_ttl=PDF_JOB_RESULT_TTL,
+    name='pdf'
+)
+atexit.register(pdf_jobs.shutdown)
+
+# Renders in flight per bulk export, kept below the pool size so exports leave room for other users
+BULK_EXPORT_CONCURRENCY = int(os.getenv("BULK_EXPORT_CONCURRENCY", str(max(1, PDF_POOL_SIZE // 2))))
+
+# Admission control, so bursts of PDF or GPT-4 work are shed instead of stalling every route
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+PDF_MAX_CONCURRENCY = int(os.getenv("PDF_MAX_CONCURRENCY", str(PDF_POOL_SIZE * 2)))
+PDF_MAX_QUEUE = int(os.getenv("PDF_MAX_QUEUE", str(PDF_POOL_SIZE * 4)))
+PDF_RATE_PER_MINUTE = float(os.getenv("PDF_RATE_PER_MINUTE", "20"))
+PDF_RATE_BURST = int(os.getenv("PDF_RATE_BURST", "5"))
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+AI_MAX_QUEUE = int(os.getenv("AI_MAX_QUEUE", "16"))
+AI_RATE_PER_MINUTE = float(os.getenv("AI_RATE_PER_MINUTE", "30"))
+AI_RATE_BURST = int(os.getenv("AI_RATE_BURST", "10"))
+
+admission_limits = {
+    'pdf': (ConcurrencyLimiter('pdf', PDF_MAX_CONCURRENCY, PDF_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT),
+            RateLimiter('pdf', PDF_RATE_PER_MINUTE / 60, PDF_RATE_BURST)),
+    'ai': (ConcurrencyLimiter('ai', AI_MAX_CONCURRENCY, AI_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT),
+           RateLimiter('ai', AI_RATE_PER_MINUTE / 60, AI_RATE_BURST)),
+}
 
 # Flask app configuration
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", secrets.token_hex(32))
 
+app.jinja_env.globals['resume_font_css_url'] = RESUME_FONT_CSS_URL
+
 # Configure session cookies for better compatibility
 app.config.update(
     SESSION_COOKIE_NAME="resumeai",
@@ -87,6 +346,68 @@ app.config.update(
     SESSION_COOKIE_SECURE=True,      # True for production HTTPSgit
 )
 
+@app.before_request
+def start_request_trace():
+    tracer.begin()
+
+# Registered before compress_response so it runs after it and times the compression too
+@app.after_request
+def record_request_timing(response):
+    """Observe the request's latency and optionally report its spans in a Server-Timing header"""
+    trace = tracer.current()
+    if trace is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    request_latency.observe(time.perf_counter() - trace.started,
+                            method=request.method, endpoint=endpoint, status=response.status_code)
+    if SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+@app.after_request
+def record_first_response(response):
+    if 'first_response' not in startup_timings:
+        startup_timings['first_response'] = round(time.perf_counter() - IMPORT_STARTED, 3)
+        print(f"First response served {startup_timings['first_response']}s after startup began")
+    return response
+
+@app.teardown_request
+def end_request_trace(exc):
+    tracer.end()
+
+@before_render_template.connect_via(app)
+def start_template_span(sender, template, context, **extra):
+    g.setdefault('template_spans', []).append(tracer.start('render_template'))
+
+@template_rendered.connect_via(app)
+def end_template_span(sender, template, context, **extra):
+    spans = g.get('template_spans')
+    if spans:
+        spans.pop()()
+
+@app.after_request
+def compress_response(response):
+    """Gzip large JSON and HTML responses for clients that accept it"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in RESPONSE_GZIP_MIMETYPES
+            or not request.accept_encodings['gzip']):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < RESPONSE_GZIP_MIN_BYTES:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=S3_GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    # The gzipped bytes differ from the plain ones, so they cannot share a strong validator
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -95,6 +416,34 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def admit(group):
+    """Apply an admission group's per-user rate limit and concurrency limit to a route"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            concurrency, rate = admission_limits[group]
+            try:
+                rate.acquire(session.get('user_id'))
+                release = concurrency.acquire()
+            except Rejected as e:
+                response = jsonify({'error': str(e)})
+                response.status_code = e.status
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+            try:
+                response = make_response(f(*args, **kwargs))
+            except BaseException:
+                release()
+                raise
+            if response.is_streamed:
+                # Streamed bodies are produced after this returns, so hold the slot until they close
+                response.call_on_close(release)
+            else:
+                release()
+            return response
+        return decorated_function
+    return decorator
+
 def make_state():
     """Generate and store state parameter for CSRF protection"""
     state = secrets.token_urlsafe(32)
@@ -102,74 +451,1084 @@ def make_state():
     return state
 
 # AWS helper functions
-def save_resume_to_s3(user_id, resume_data):
-    """Save resume data to S3"""
-    try:
-        filename = f"{user_id}/resume_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+def put_json_to_s3(key, body):
+    """Store JSON bytes in S3 gzip-compressed and return the stored size"""
+    compressed = gzip.compress(body, compresslevel=S3_GZIP_LEVEL)
+    with tracer.span('s3.put_object'):
         s3_client.put_object(
             Bucket=S3_BUCKET_NAME,
-            Key=filename,
-            Body=json.dumps(resume_data),
-            ContentType='application/json'
+            Key=key,
+            Body=compressed,
+            ContentType='application/json',
+            ContentEncoding='gzip'
         )
+    return len(compressed)
+
+def read_s3_body(response):
+    """Read an S3 object body, decompressing it if it was stored gzip-encoded"""
+    body = response['Body'].read()
+    # Objects written before compression was enabled are plain JSON
+    if response.get('ContentEncoding') == 'gzip' or body[:2] == b'\x1f\x8b':
+        body = gzip.decompress(body)
+    return body
+
+def write_resume_version(user_id, resume_data, head):
+    """Write one resume version to S3 and return (key, stored size, new head).
+
+    Versions are stored as a JSON patch against the user's current base
+    snapshot, so any version can be rebuilt from two objects. A full snapshot
+    becomes the new base when there is no base yet, after RESUME_COMPACT_EVERY
+    deltas, or once the patch outgrows RESUME_DELTA_MAX_RATIO of the base.
+    """
+    # Microseconds keep same-second saves from overwriting a base that deltas depend on
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    if head is not None and head['deltas'] < RESUME_COMPACT_EVERY:
+        base_data = get_cached_resume(head['base'])[0]
+        delta = json.dumps({'base': head['base'], 'ops': make_patch(base_data, resume_data)}).encode('utf-8')
+        if len(delta) <= head['base_size'] * RESUME_DELTA_MAX_RATIO:
+            filename = f"{user_id}/resume_{stamp}{RESUME_DELTA_SUFFIX}"
+            size = put_json_to_s3(filename, delta)
+            return filename, size, dict(head, deltas=head['deltas'] + 1)
+    
+    filename = f"{user_id}/resume_{stamp}.json"
+    body = json.dumps(resume_data).encode('utf-8')
+    size = put_json_to_s3(filename, body)
+    return filename, size, {'base': filename, 'base_size': len(body), 'deltas': 0}
+
+@tracer.traced()
+def save_resume_to_s3(user_id, resume_data):
+    """Save a new resume version to S3 and add it to the user's index"""
+    try:
+        for _ in range(RESUME_SAVE_ATTEMPTS):
+            head = load_resume_head(user_id)
+            filename, size, new_head = write_resume_version(user_id, resume_data, head)
+            
+            saved_at = datetime.now(timezone.utc)
+            entry = resume_index_entry(filename, resume_data, size, saved_at.isoformat())
+            if new_head['base'] != filename:
+                entry['base'] = new_head['base']
+            put_resume_index_entry(user_id, entry)
+            if commit_resume_head(user_id, head, new_head):
+                break
+            # The base was retired while the delta was written and may be purged: save again
+            delete_resume_index_entry(user_id, filename)
+            delete_resume_object(filename)
+        else:
+            raise RuntimeError(f"resume base kept changing after {RESUME_SAVE_ATTEMPTS} attempts")
+        apply_resume_retention(user_id)
+        
+        cache_resume_body(filename, json.dumps(resume_data).encode('utf-8'), saved_at)
         return filename
     except Exception as e:
         print(f"Error saving to S3: {e}")
         return None
 
+def iter_user_resume_objects(user_id):
+    """Yield S3 listing entries for a user's resumes, following every page"""
+    paginator = s3_client.get_paginator('list_objects_v2')
+    pages = iter(paginator.paginate(Bucket=S3_BUCKET_NAME, Prefix=f"{user_id}/"))
+    while True:
+        # Pages are requested lazily, so each one is timed as it is fetched
+        with tracer.span('s3.list_objects_v2'):
+            page = next(pages, None)
+        if page is None:
+            break
+        for obj in page.get('Contents', []):
+            if obj['Key'].endswith(('.json', RESUME_DELTA_SUFFIX)):
+                yield obj
+
+def fetch_resume_body(key):
+    """Read a resume version from S3 as (JSON bytes, last modified, base key).
+
+    Delta versions are rebuilt by applying their patch to the base snapshot,
+    which is read through the resume cache.
+    """
+    with tracer.span('s3.get_object'):
+        response = s3_client.get_object(
+            Bucket=S3_BUCKET_NAME,
+            Key=key
+        )
+    body = read_s3_body(response)
+    base = None
+    if key.endswith(RESUME_DELTA_SUFFIX):
+        delta = json.loads(body)
+        base = delta['base']
+        body = json.dumps(apply_patch(get_cached_resume(base)[0], delta['ops'])).encode('utf-8')
+    return body, response['LastModified'], base
+
+def cache_resume_body(key, body, last_modified):
+    """Store a resume body with its modification time in the resume cache"""
+    entry = last_modified.isoformat().encode('ascii') + b'\n' + body
+    resume_cache.set(key, entry)
+    return entry
+
+def get_cached_resume(key):
+    """Load a single resume through the read-through resume cache.
+
+    Returns (resume_data, etag, last_modified). Resume keys are timestamped and
+    never rewritten, so entries only have to be dropped when a resume is deleted.
+    """
+    entry = resume_cache.get(key)
+    if entry is None:
+        body, last_modified, _ = fetch_resume_body(key)
+        entry = cache_resume_body(key, body, last_modified)
+    header, body = entry.split(b'\n', 1)
+    last_modified = datetime.fromisoformat(header.decode('ascii'))
+    return json.loads(body), hashlib.sha256(body).hexdigest(), last_modified
+
 def get_user_resumes_from_s3(user_id):
-    """Get all resumes for a user from S3"""
+    """Yield all resumes for a user from S3, oldest first.
+
+    Bodies are fetched on a bounded thread pool a few objects ahead of the
+    consumer, so wall-clock time scales with S3_FETCH_CONCURRENCY rather than
+    the number of resumes.
+    """
+    # The span stays open while the caller consumes the generator
+    with tracer.span('get_user_resumes_from_s3'):
+        try:
+            objects = sorted(iter_user_resume_objects(user_id), key=lambda obj: obj['LastModified'])
+        except Exception as e:
+            print(f"Error getting resumes from S3: {e}")
+            return
+    
+        with ThreadPoolExecutor(max_workers=S3_FETCH_CONCURRENCY) as executor:
+            objects = iter(objects)
+            pending = deque(
+                (obj, submit_traced(executor, fetch_resume_body, obj['Key']))
+                for obj in islice(objects, S3_FETCH_CONCURRENCY * 2)
+            )
+            while pending:
+                obj, future = pending.popleft()
+                next_obj = next(objects, None)
+                if next_obj is not None:
+                    pending.append((next_obj, submit_traced(executor, fetch_resume_body, next_obj['Key'])))
+                try:
+                    body, _, base = future.result()
+                except Exception as e:
+                    print(f"Error getting resume {obj['Key']} from S3: {e}")
+                    continue
+                yield {
+                    'filename': obj['Key'],
+                    'data': json.loads(body),
+                    'created': obj['LastModified'].isoformat(),
+                    'size': obj.get('Size'),
+                    'base': base
+                }
+
+# Resume index in DynamoDB: one item per saved version (keyed by userId and
+# filename) plus a head item, so list views read metadata with one query and a
+# save only adds its own item instead of rewriting a shared list
+def resume_index_table():
+    return dynamodb.Table(RESUME_INDEX_TABLE_NAME)
+
+def resume_index_entry(filename, resume_data, size, created):
+    """Metadata kept in the index for one saved resume"""
+    summary = resume_data.get('summary') or ''
+    return {
+        'filename': filename,
+        'name': resume_data.get('name'),
+        'template': resume_data.get('template', 'modern'),
+        'created': created,
+        'updated': datetime.now(timezone.utc).isoformat(),
+        'size': size,
+        # Same shape as the resume body for the fields list views display
+        'data': {
+            'name': resume_data.get('name'),
+            'email': resume_data.get('email'),
+            'phone': resume_data.get('phone'),
+            'summary': summary[:RESUME_INDEX_SUMMARY_LENGTH]
+        }
+    }
+
+def put_resume_index_entry(user_id, entry):
+    with tracer.span('dynamodb.put_item'):
+        resume_index_table().put_item(Item=dict(entry, userId=user_id))
+
+def query_resume_index(user_id):
+    """Yield every index item of a user, the head item included, following every page"""
+    params = {
+        'KeyConditionExpression': 'userId = :user',
+        'ExpressionAttributeValues': {':user': user_id},
+        'ConsistentRead': True
+    }
+    while True:
+        with tracer.span('dynamodb.query'):
+            response = resume_index_table().query(**params)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            break
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def resume_head(item):
+    """The base snapshot new deltas are written against, or None to start a new base"""
+    if item is None or 'base' not in item:
+        return None
+    # DynamoDB returns numbers as Decimal
+    return {'base': item['base'], 'base_size': int(item['base_size']), 'deltas': int(item['deltas'])}
+
+def load_resume_head(user_id):
+    """Load a user's current head, building the index first if the user has none"""
+    with tracer.span('dynamodb.get_item'):
+        item = resume_index_table().get_item(
+            Key={'userId': user_id, 'filename': RESUME_HEAD_KEY},
+            ConsistentRead=True
+        ).get('Item')
+    if item is None:
+        return rebuild_resume_index(user_id)['head']
+    return resume_head(item)
+
+def write_resume_head(user_id, head):
+    with tracer.span('dynamodb.put_item'):
+        resume_index_table().put_item(Item=dict(head or {}, userId=user_id, filename=RESUME_HEAD_KEY))
+
+def commit_resume_head(user_id, head, new_head):
+    """Record a saved version in the head item, returning False if a delta's base stopped being the head.
+
+    A delta only counts while its base is still the head. Bases are retired
+    from the head before they are purged, so a committed delta never points
+    at a deleted snapshot. A new base only replaces the head it was read
+    with; if another save moved the head first, that base is kept, which is
+    harmless because a snapshot stands on its own.
+    """
+    key = {'userId': user_id, 'filename': RESUME_HEAD_KEY}
+    is_delta = head is not None and new_head['base'] == head['base']
+    try:
+        with tracer.span('dynamodb.update_item'):
+            if is_delta:
+                resume_index_table().update_item(
+                    Key=key,
+                    UpdateExpression='ADD deltas :one',
+                    ConditionExpression='base = :base',
+                    ExpressionAttributeValues={':one': 1, ':base': head['base']}
+                )
+            else:
+                values = {':base': new_head['base'], ':size': new_head['base_size'], ':zero': 0}
+                if head is not None:
+                    values[':old'] = head['base']
+                resume_index_table().update_item(
+                    Key=key,
+                    UpdateExpression='SET base = :base, base_size = :size, deltas = :zero',
+                    ConditionExpression='attribute_not_exists(base)' if head is None else 'base = :old',
+                    ExpressionAttributeValues=values
+                )
+        return True
+    except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+        return not is_delta
+
+def retire_resume_head(user_id, base):
+    """Stop new deltas being written against base, unless the head has already moved on"""
+    try:
+        with tracer.span('dynamodb.update_item'):
+            resume_index_table().update_item(
+                Key={'userId': user_id, 'filename': RESUME_HEAD_KEY},
+                UpdateExpression='REMOVE base, base_size, deltas',
+                ConditionExpression='base = :base',
+                ExpressionAttributeValues={':base': base}
+            )
+    except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+        pass
+
+def load_resume_index(user_id):
+    """Load a user's index as {'resumes': {filename: entry}, 'head': head}, or None if it has not been built yet"""
+    items = list(query_resume_index(user_id))
+    if not items:
+        return None
+    index = {'resumes': {}, 'head': None}
+    for item in items:
+        if item['filename'] == RESUME_HEAD_KEY:
+            index['head'] = resume_head(item)
+            continue
+        entry = {name: value for name, value in item.items() if name != 'userId'}
+        if entry.get('size') is not None:
+            entry['size'] = int(entry['size'])
+        index['resumes'][entry['filename']] = entry
+    return index
+
+def rebuild_resume_index(user_id):
+    """Rebuild a user's index from the resumes stored in S3.
+
+    Versions the user deleted that are still in S3 (bases kept for their
+    deltas) stay hidden, and are never made the head again.
+    """
+    existing = {item['filename']: item for item in query_resume_index(user_id)}
+    index = {'resumes': {}, 'head': None}
+    for resume in get_user_resumes_from_s3(user_id):
+        entry = resume_index_entry(resume['filename'], resume['data'], resume['size'], resume['created'])
+        if existing.get(resume['filename'], {}).get('deleted'):
+            entry['deleted'] = True
+        if resume['base'] is None and entry.get('deleted'):
+            index['head'] = None
+        elif resume['base'] is None:
+            base_size = len(json.dumps(resume['data']).encode('utf-8'))
+            index['head'] = {'base': resume['filename'], 'base_size': base_size, 'deltas': 0}
+        else:
+            entry['base'] = resume['base']
+            if index['head'] is not None and index['head']['base'] == resume['base']:
+                index['head']['deltas'] += 1
+        index['resumes'][resume['filename']] = entry
+    
+    stale = set(existing) - set(index['resumes']) - {RESUME_HEAD_KEY}
+    for filename in stale:
+        delete_resume_index_entry(user_id, filename)
+    for entry in index['resumes'].values():
+        put_resume_index_entry(user_id, entry)
+    # Written even without a base, so the index counts as built
+    write_resume_head(user_id, index['head'])
+    return index
+
+def delete_resume_index_entry(user_id, filename):
+    with tracer.span('dynamodb.delete_item'):
+        resume_index_table().delete_item(Key={'userId': user_id, 'filename': filename})
+
+def is_resume_version_hidden(user_id, filename):
+    """Whether a version was deleted but is still kept in S3 for the deltas based on it"""
+    with tracer.span('dynamodb.get_item'):
+        item = resume_index_table().get_item(
+            Key={'userId': user_id, 'filename': filename},
+            ConsistentRead=True
+        ).get('Item')
+    return bool(item and item.get('deleted'))
+
+def hide_resume_version(user_id, filename):
+    """Mark an indexed version deleted, returning False if it is not in the index"""
     try:
-        response = s3_client.list_objects_v2(
+        with tracer.span('dynamodb.update_item'):
+            resume_index_table().update_item(
+                Key={'userId': user_id, 'filename': filename},
+                UpdateExpression='SET deleted = :true',
+                ConditionExpression='attribute_exists(filename)',
+                ExpressionAttributeValues={':true': True}
+            )
+        return True
+    except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+
+def delete_resume_object(filename):
+    with tracer.span('s3.delete_object'):
+        s3_client.delete_object(
             Bucket=S3_BUCKET_NAME,
-            Prefix=f"{user_id}/"
+            Key=filename
         )
-        resumes = []
-        if 'Contents' in response:
-            for obj in response['Contents']:
-                if obj['Key'].endswith('.json'):
-                    file_response = s3_client.get_object(
-                        Bucket=S3_BUCKET_NAME,
-                        Key=obj['Key']
-                    )
-                    resume_data = json.loads(file_response['Body'].read())
-                    resumes.append({
-                        'filename': obj['Key'],
-                        'data': resume_data,
-                        'created': obj['LastModified'].isoformat()
-                    })
-        return resumes
+    resume_cache.delete(filename)
+
+def live_bases(index):
+    """Bases that a version still listed depends on"""
+    return {entry.get('base') for entry in index['resumes'].values() if not entry.get('deleted')}
+
+def purge_deleted_versions(user_id):
+    """Delete hidden versions from S3 once no remaining delta is based on them.
+
+    A hidden base that is still the head is retired first and the index read
+    again, so a save still writing a delta against it either shows up as a
+    dependent here or fails its commit and saves again.
+    """
+    index = load_resume_index(user_id)
+    if index is None:
+        return
+    head = index['head']
+    if head and head['base'] not in live_bases(index) and index['resumes'].get(head['base'], {}).get('deleted'):
+        retire_resume_head(user_id, head['base'])
+        index = load_resume_index(user_id)
+    needed = live_bases(index) | {index['head']['base'] if index['head'] else None}
+    for filename, entry in index['resumes'].items():
+        if entry.get('deleted') and filename not in needed:
+            delete_resume_object(filename)
+            delete_resume_index_entry(user_id, filename)
+
+def apply_resume_retention(user_id):
+    """Keep only the newest RESUME_VERSION_RETENTION versions (0 keeps everything)"""
+    if not RESUME_VERSION_RETENTION:
+        return
+    index = load_resume_index(user_id)
+    live = sorted(filename for filename, entry in index['resumes'].items() if not entry.get('deleted'))
+    expired = live[:-RESUME_VERSION_RETENTION]
+    for filename in expired:
+        hide_resume_version(user_id, filename)
+    if expired:
+        purge_deleted_versions(user_id)
+
+def delete_resume_version(user_id, filename):
+    """Remove a resume version from the user's history.
+
+    A base snapshot that later deltas still depend on is hidden from listings
+    and only removed from S3 once those deltas are gone.
+    """
+    if not hide_resume_version(user_id, filename):
+        delete_resume_object(filename)
+        return
+    purge_deleted_versions(user_id)
+
+def list_user_resumes(user_id):
+    """List a user's resumes (metadata only), oldest first"""
+    try:
+        index = load_resume_index(user_id)
+        if index is None:
+            index = rebuild_resume_index(user_id)
+        resumes = [entry for entry in index['resumes'].values() if not entry.get('deleted')]
+        return sorted(resumes, key=lambda entry: entry['filename'])
     except Exception as e:
-        print(f"Error getting resumes from S3: {e}")
+        print(f"Error loading resume index: {e}")
         return []
 
-def save_user_to_dynamodb(user_id, email, resume_count=0):
-    """Save user info to DynamoDB"""
-    try:
-        table = dynamodb.Table(DYNAMODB_TABLE_NAME)
-        table.put_item(
-            Item={
-                'userId': user_id,  # Changed to match DynamoDB schema
-                'email': email,
-                'resume_count': resume_count,
-                'created_at': datetime.now().isoformat(),
-                'last_login': datetime.now().isoformat()
-            }
-        )
-        return True
-    except Exception as e:
-        print(f"Error saving to DynamoDB: {e}")
-        return False
+def record_user_login(user_id, email, login_time=None):
+    """Upsert a user record and stamp its last login in a single write.
+
+    last_login only moves forward, so a delayed write can never overwrite a
+    newer login, and created_at/resume_count are only set on first sight.
+    """
+    login_time = login_time or datetime.now().isoformat()
+    try:
+        table = dynamodb.Table(DYNAMODB_TABLE_NAME)
+        with tracer.span('dynamodb.update_item'):
+            table.update_item(
+                Key={'userId': user_id},  # Changed to match DynamoDB schema
+                UpdateExpression=(
+                    'SET email = :email, last_login = :now, '
+                    'created_at = if_not_exists(created_at, :now), '
+                    'resume_count = if_not_exists(resume_count, :zero)'
+                ),
+                ConditionExpression='attribute_not_exists(last_login) OR last_login < :now',
+                ExpressionAttributeValues={':email': email, ':now': login_time, ':zero': 0}
+            )
+        return True
+    except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+        # A newer login has already been recorded
+        return True
+    except Exception as e:
+        print(f"Error saving to DynamoDB: {e}")
+        return False
+
+def record_resume_saved(user_id, email):
+    """Atomically increment a user's resume count, creating the record if needed"""
+    try:
+        table = dynamodb.Table(DYNAMODB_TABLE_NAME)
+        with tracer.span('dynamodb.update_item'):
+            response = table.update_item(
+                Key={'userId': user_id},
+                UpdateExpression='SET email = :email, created_at = if_not_exists(created_at, :now) ADD resume_count :one',
+                ExpressionAttributeValues={':email': email, ':now': datetime.now().isoformat(), ':one': 1},
+                ReturnValues='UPDATED_NEW'
+            )
+        return response['Attributes']['resume_count']
+    except Exception as e:
+        print(f"Error saving to DynamoDB: {e}")
+        return None
+
+def get_user_from_dynamodb(user_id):
+    """Get user info from DynamoDB"""
+    try:
+        table = dynamodb.Table(DYNAMODB_TABLE_NAME)
+        with tracer.span('dynamodb.get_item'):
+            response = table.get_item(Key={'userId': user_id})  # Changed to match DynamoDB schema
+        return response.get('Item')
+    except Exception as e:
+        print(f"Error getting user from DynamoDB: {e}")
+        return None
+
+def flush_login_writes(logins):
+    """Write buffered login bookkeeping, one conditional update per user"""
+    for user_id, (email, login_time) in logins.items():
+        record_user_login(user_id, email, login_time)
+
+# Logins only update last_login, so those writes are coalesced per user and
+# flushed in the background instead of delaying the login response
+login_writes = WriteBehindBuffer(
+    flush_login_writes,
+    max_pending=LOGIN_WRITE_BATCH_SIZE,
+    flush_interval=LOGIN_WRITE_FLUSH_INTERVAL,
+    name='login-writes'
+)
+atexit.register(login_writes.shutdown)
+
+def with_pending_login(user_id, user_info):
+    """Overlay a login still waiting in login_writes onto a user record read from DynamoDB"""
+    pending = login_writes.get(user_id)
+    if pending is None:
+        return user_info
+    email, login_time = pending
+    # A first-time user has no record until the flush creates it
+    user_info = dict(user_info or {'userId': user_id, 'email': email, 'created_at': login_time, 'resume_count': 0})
+    if not user_info.get('last_login') or user_info['last_login'] < login_time:
+        user_info['last_login'] = login_time
+    return user_info
+
+def job_rewrite_prompt(bullet_points, selected_keywords):
+    # Create a comprehensive prompt for rewriting job descriptions
+    keyword_instruction = ""
+    if selected_keywords:
+        keyword_instruction = f"""
+                                        CRITICAL REQUIREMENT: You MUST include these keywords in your rewritten bullet points: {', '.join(selected_keywords)}
+
+                                        MANDATORY INSTRUCTIONS:
+                                        - Each bullet point MUST contain at least one of these keywords
+                                        - Use the keywords naturally within the sentence structure
+                                        - If a keyword doesn't fit naturally, rephrase the bullet point to include it
+                                        - Make sure all keywords are used across the bullet points
+                                        - Prioritize keyword inclusion over perfect flow if necessary
+
+                                        EXAMPLE: If keywords are ["Git", "SQL"], rewrite like:
+                                        "Implemented Git version control and SQL database optimization, resulting in..."
+
+                                        Original Bullet Points:
+                                        {chr(10).join([f"{i+1}. {point}" for i, point in enumerate(bullet_points)])}
+
+                                        Now rewrite all {len(bullet_points)} bullet points using the given instructions.
+                                        """
+    
+    prompt = f"""You are a professional resume writer. Rewrite the following job description bullet points to make them more impactful, professional, and human-like. 
+
+{keyword_instruction}
+
+Guidelines:
+- Use strong action verbs at the beginning of each bullet point
+- Include specific metrics, numbers, and achievements when possible
+- Make them sound natural and professional
+- Keep each point concise but impactful
+- Focus on results and accomplishments
+- Use industry-standard terminology
+- Make them sound like they were written by a human professional
+
+Original bullet points:
+{chr(10).join([f"- {point}" for point in bullet_points])}
+
+Please rewrite each bullet point to be more professional and impactful. Return only the rewritten bullet points, one per line, without numbering or bullet symbols:"""
+    return prompt
+
+def project_rewrite_prompt(bullet_points, selected_keywords):
+    # Create a comprehensive prompt for rewriting project descriptions
+    keyword_instruction = ""
+    if selected_keywords:
+        keyword_instruction = f"""
+CRITICAL REQUIREMENT: You MUST include these keywords in your rewritten bullet points: {', '.join(selected_keywords)}
+
+MANDATORY INSTRUCTIONS:
+- Each bullet point MUST contain at least one of these keywords
+- Use the keywords naturally within the sentence structure
+- If a keyword doesn't fit naturally, rephrase the bullet point to include it
+- Make sure all keywords are used across the bullet points
+- Prioritize keyword inclusion over perfect flow if necessary
+
+EXAMPLE: If keywords are ["Git", "SQL"], rewrite like:
+"Implemented Git version control and SQL database optimization, resulting in..."
+
+Original Bullet Points:
+{chr(10).join([f"{i+1}. {point}" for i, point in enumerate(bullet_points)])}
+
+Now rewrite all {len(bullet_points)} bullet points using the given instructions.
+"""
+    
+    prompt = f"""You are a professional resume writer. Rewrite the following project description bullet points to make them more impactful, professional, and human-like. 
+
+{keyword_instruction}
+
+Guidelines:
+- Use strong action verbs at the beginning of each bullet point
+- Include specific technologies, tools, and methodologies used
+- Highlight technical achievements and problem-solving skills
+- Make them sound natural and professional
+- Keep each point concise but impactful
+- Focus on technical results and accomplishments
+- Use industry-standard terminology
+- Make them sound like they were written by a human professional
+- Emphasize the technical complexity and impact of the project
+
+Original bullet points:
+{chr(10).join([f"- {point}" for point in bullet_points])}
+
+Please rewrite each bullet point to be more professional and impactful. Return only the rewritten bullet points, one per line, without numbering or bullet symbols:"""
+    return prompt
+
+REWRITE_PROMPTS = {
+    'job': job_rewrite_prompt,
+    'project': project_rewrite_prompt,
+}
+
+def clean_rewritten_lines(lines):
+    """Yield the bullet text of each non-empty model output line"""
+    for line in lines:
+        line = line.strip()
+        if line:
+            # Remove any bullet symbols or numbering that might be in the response
+            line = line.lstrip('•-1234567890. ')
+            if line:
+                yield line
+
+def stream_completion(prompt, max_tokens, temperature):
+    """Yield the text of a GPT-4 completion piece by piece as it is generated"""
+    # Only the wait for the response to start is timed; tokens arrive while the caller streams
+    with tracer.span('openai.chat.completions.create'):
+        stream = openai.chat.completions.create(
+            model="gpt-4",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def split_stream(pieces, separator='\n'):
+    """Re-chunk streamed text into the parts between separators, each yielded once complete"""
+    buffer = ''
+    for piece in pieces:
+        buffer += piece
+        *parts, buffer = buffer.split(separator)
+        yield from parts
+    if buffer:
+        yield buffer
+
+def rewrite_bullets_with_openai(kind, bullet_points, selected_keywords, timeout=None):
+    """Ask the model to rewrite bullet points, returning at most one line per bullet"""
+    prompt = REWRITE_PROMPTS[kind](bullet_points, selected_keywords)
+    # Without a timeout of its own the call keeps the client's default
+    options = {'timeout': openai_timeout(timeout)} if timeout is not None else {}
+    with tracer.span('openai.chat.completions.create'):
+        response = openai.chat.completions.create(
+            model="gpt-4",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=1000,
+            temperature=0.3,
+            **options,
+        )
+    
+    rewritten_text = response.choices[0].message.content.strip()
+    
+    # Split the response into individual bullet points
+    rewritten_points = list(clean_rewritten_lines(rewritten_text.split('\n')))
+    
+    # Ensure we have the same number of points or fewer
+    return rewritten_points[:len(bullet_points)]
+
+def stream_rewrite_bullets_with_openai(kind, bullet_points, selected_keywords):
+    """Like rewrite_bullets_with_openai, but yield each bullet as soon as its line is complete"""
+    prompt = REWRITE_PROMPTS[kind](bullet_points, selected_keywords)
+    lines = clean_rewritten_lines(split_stream(stream_completion(prompt, max_tokens=1000, temperature=0.3)))
+    return islice(lines, len(bullet_points))
+
+def rewrite_cache_key(kind, bullet, selected_keywords):
+    """Cache key for one bullet rewritten for a section kind and keyword set"""
+    keywords = sorted({keyword.strip().casefold() for keyword in selected_keywords})
+    payload = json.dumps([REWRITE_PROMPT_VERSION, kind, bullet.strip(), keywords])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def rewrite_bullets(kind, bullet_points, selected_keywords, timeout=None):
+    """Rewrite bullet points, sending only the ones without a cached rewrite to the model"""
+    keys = [rewrite_cache_key(kind, point, selected_keywords) for point in bullet_points]
+    rewritten_points = [rewrite_cache.get(key) for key in keys]
+    missing = [i for i, point in enumerate(rewritten_points) if point is None]
+    
+    if missing:
+        rewritten = rewrite_bullets_with_openai(kind, [bullet_points[i] for i in missing], selected_keywords,
+                                                timeout=timeout)
+        for i, point in zip(missing, rewritten):
+            rewritten_points[i] = point
+        store_rewrites(kind, keys, missing, rewritten, selected_keywords)
+        # Keep the original text for any bullet the model skipped
+        for i in missing[len(rewritten):]:
+            rewritten_points[i] = bullet_points[i]
+    
+    return rewritten_points
+
+def stream_rewrite_bullets(kind, bullet_points, selected_keywords):
+    """Yield (index, text) for each rewritten bullet, cached ones first and the rest as the model writes them"""
+    keys = [rewrite_cache_key(kind, point, selected_keywords) for point in bullet_points]
+    missing = []
+    for i, key in enumerate(keys):
+        point = rewrite_cache.get(key)
+        if point is None:
+            missing.append(i)
+        else:
+            yield i, point
+    
+    if missing:
+        rewritten = []
+        lines = stream_rewrite_bullets_with_openai(kind, [bullet_points[i] for i in missing], selected_keywords)
+        for i, point in zip(missing, lines):
+            rewritten.append(point)
+            yield i, point
+        store_rewrites(kind, keys, missing, rewritten, selected_keywords)
+        # Keep the original text for any bullet the model skipped
+        for i in missing[len(rewritten):]:
+            yield i, bullet_points[i]
+
+# Resume fields holding one list of bullet points per entry, and the prompt used to rewrite them
+TAILOR_SECTIONS = {
+    'job_description': 'job',
+    'project_description': 'project',
+}
+
+def tailor_resume(data, selected_keywords):
+    """Rewrite every job and project entry of a resume concurrently.
+
+    Parallel calls beyond the first are charged to the 'ai' admission limiter,
+    so a request only fans out while AI slots are free.
+
+    Returns the rewritten bullet lists per section and a list of entries that
+    failed or missed the AI_TAILOR_DEADLINE; those keep their original bullets.
+    """
+    result = {field: [list(points or []) for points in data.get(field) or []] for field in TAILOR_SECTIONS}
+    errors = []
+    sections = [(field, kind, i, [point for point in points if point.strip()])
+                for field, kind in TAILOR_SECTIONS.items() for i, points in enumerate(result[field])]
+    sections = [section for section in sections if section[3]]
+    # The request's own 'ai' slot covers one model call at a time; each further parallel call
+    # takes a free slot from the same limiter, held until every section has finished
+    concurrency, _ = admission_limits['ai']
+    releases = []
+    for _ in range(min(AI_TAILOR_CONCURRENCY, len(sections)) - 1):
+        release = concurrency.try_acquire()
+        if release is None:
+            break
+        releases.append(release)
+    executor = ThreadPoolExecutor(max_workers=len(releases) + 1)
+    try:
+        futures = {}
+        for field, kind, i, points in sections:
+            future = submit_traced(executor, rewrite_bullets, kind, points, selected_keywords, AI_TAILOR_TIMEOUT)
+            futures[future] = (field, i)
+        release_when_done(futures, releases)
+        done, _ = wait(futures, timeout=AI_TAILOR_DEADLINE)
+        for future, (field, i) in futures.items():
+            if future not in done:
+                errors.append({'section': field, 'index': i, 'error': f"Timed out after {AI_TAILOR_DEADLINE:g} seconds"})
+                continue
+            try:
+                result[field][i] = future.result()
+            except Exception as e:
+                print(f"Error tailoring {field} {i}: {e}")
+                errors.append({'section': field, 'index': i, 'error': str(e)})
+    finally:
+        # Sections not started yet are dropped; running calls end within their own timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+    result['errors'] = errors
+    return result
+
+def release_when_done(futures, releases):
+    """Call every release once all futures have finished or been cancelled"""
+    pending = [len(futures)]
+    lock = threading.Lock()
+
+    def finished(future):
+        with lock:
+            pending[0] -= 1
+            if pending[0]:
+                return
+        for release in releases:
+            release()
+
+    if not futures:
+        for release in releases:
+            release()
+    for future in futures:
+        future.add_done_callback(finished)
+
+def store_rewrites(kind, keys, missing, rewritten, selected_keywords):
+    """Cache the model's rewrites of the bullets at the missing indexes"""
+    # Only cache when the model returned one line per bullet, otherwise lines may be misaligned
+    if len(rewritten) != len(missing):
+        return
+    for i, point in zip(missing, rewritten):
+        rewrite_cache.set(keys[i], point)
+        # Re-running a rewrite resubmits this output, which needs no further rewriting
+        rewrite_cache.set(rewrite_cache_key(kind, point, selected_keywords), point)
+
+def keyword_prompt(job_description):
+    return (
+        "Extract all the most important keywords, technical skills, qualifications, tools, "
+        "and relevant industry terms from the job description below. These keywords should reflect "
+        "what an ATS (Applicant Tracking System) would look for to match a resume with the job.\n\n"
+        f"Job Description:\n{job_description}\n\nKeywords:"
+    )
+
+def extract_keywords_with_openai(job_description):
+    """Ask the model for ATS keywords in a job description"""
+    prompt = keyword_prompt(job_description)
+    
+    with tracer.span('openai.chat.completions.create'):
+        response = openai.chat.completions.create(
+            model="gpt-4",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=256,
+            temperature=0.2,
+        )
+    
+    keywords_text = response.choices[0].message.content.strip()
+    return [kw.strip() for kw in keywords_text.replace("\n", ",").split(",") if kw.strip()]
+
+def job_description_key(job_description):
+    """Cache key for a job description, ignoring whitespace and case differences"""
+    normalized = ' '.join(job_description.split()).casefold()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def get_job_keywords(job_description):
+    """Keywords for a job description, shared across users and concurrent requests"""
+    key = job_description_key(job_description)
+    cached = keyword_cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+    
+    def extract():
+        # Another request may have filled the cache while this one was waiting
+        cached = keyword_cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+        keywords = extract_keywords_with_openai(job_description)
+        keyword_cache.set(key, json.dumps(keywords).encode('utf-8'))
+        return keywords
+    
+    return keyword_flights.do(key, extract)
+
+def extract_keywords_locally(job_description):
+    """Keywords found by the offline lexicon extractor, best first"""
+    return keyword_extractor.extract(job_description, limit=KEYWORD_LOCAL_LIMIT)
+
+def merge_keywords(*keyword_lists):
+    """Concatenate keyword lists, dropping repeats that differ only in case"""
+    seen = set()
+    merged = []
+    for keywords in keyword_lists:
+        for keyword in keywords:
+            if keyword.casefold() not in seen:
+                seen.add(keyword.casefold())
+                merged.append(keyword)
+    return merged
+
+def job_keywords_for_mode(job_description, mode, enrich=False):
+    """Keywords for a job description from the given extraction mode"""
+    if mode == 'openai':
+        return get_job_keywords(job_description)
+    keywords = extract_keywords_locally(job_description)
+    if mode == 'hybrid' and enrich:
+        keywords = merge_keywords(keywords, get_job_keywords(job_description))
+    return keywords
+
+def resume_coverage_index(key):
+    """Coverage index of a saved resume, normalized once per version"""
+    index = coverage_index_cache.get(key)
+    if index is None:
+        index = ResumeIndex(get_cached_resume(key)[0])
+        coverage_index_cache.set(key, index)
+    return index
+
+def rank_user_resumes(user_id, keywords):
+    """Score every saved resume of a user against keywords, best match first"""
+    matcher = KeywordMatcher(keywords, keyword_synonyms)
+    entries = list_user_resumes(user_id)
+    ranked = []
+    with ThreadPoolExecutor(max_workers=S3_FETCH_CONCURRENCY) as executor:
+        indexes = [submit_traced(executor, resume_coverage_index, entry['filename']) for entry in entries]
+        for entry, future in zip(entries, indexes):
+            try:
+                index = future.result()
+            except Exception as e:
+                # Like listing, one unreadable version must not fail the ranking of the rest
+                print(f"Error loading resume {entry['filename']} for ranking: {e}")
+                continue
+            ranked.append(dict(score_resume(index, matcher),
+                               filename=entry['filename'],
+                               name=entry.get('name'),
+                               created=entry.get('created')))
+    # Best score first, newest first among equal scores
+    ranked.sort(key=lambda result: result['filename'], reverse=True)
+    ranked.sort(key=lambda result: result['score'], reverse=True)
+    return ranked
+
+def stream_keywords_with_openai(job_description):
+    """Like extract_keywords_with_openai, but yield each keyword as soon as it is complete"""
+    pieces = stream_completion(keyword_prompt(job_description), max_tokens=256, temperature=0.2)
+    for keyword in split_stream((piece.replace("\n", ",") for piece in pieces), ','):
+        keyword = keyword.strip()
+        if keyword:
+            yield keyword
+
+def stream_job_keywords(job_description):
+    """Yield keywords for a job description, streaming from the model only on a cache miss"""
+    key = job_description_key(job_description)
+    cached = keyword_cache.get(key)
+    if cached is not None:
+        yield from json.loads(cached)
+        return
+    
+    def extract():
+        # Another request may have filled the cache while this one was waiting
+        cached = keyword_cache.get(key)
+        if cached is not None:
+            yield from json.loads(cached)
+            return
+        keywords = []
+        for keyword in stream_keywords_with_openai(job_description):
+            keywords.append(keyword)
+            yield keyword
+        keyword_cache.set(key, json.dumps(keywords).encode('utf-8'))
+    
+    # Shares the model call with concurrent requests for the same posting, streamed or not:
+    # the first streams it and the others get the full list once it is done
+    yield from keyword_flights.stream(key, extract)
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    """Stream (event, data) pairs to the client as Server-Sent Events.
+
+    An exception part way through is reported as a final "error" event, since
+    the status line has already been sent by then.
+    """
+    def generate():
+        try:
+            for event, data in events:
+                yield sse_event(event, data)
+        except Exception as e:
+            print(f"Error streaming response: {e}")
+            yield sse_event('error', {'error': str(e)})
+    
+    return app.response_class(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        # Stop proxies from buffering the stream, which would defeat the point of it
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def resume_template_fingerprint():
+    """Hash of the section templates, so fragments cached by clients go stale when they change"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'resume_sections')
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            digest.update(name.encode('utf-8') + b'\0' + f.read())
+    return digest.hexdigest()[:16]
+
+RESUME_TEMPLATE_VERSION = resume_template_fingerprint()
+
+def resume_sections(data):
+    """Fragments making up a resume, in document order"""
+    order = data.get('section_order') or DEFAULT_SECTION_ORDER
+    return ['start', 'header', *[section for section in order if section in DEFAULT_SECTION_ORDER], 'end']
+
+def section_fields(section, data):
+    # Missing fields stay missing so the template treats them as undefined, as in a full render
+    return {field: data[field] for field in RESUME_SECTION_FIELDS[section] if field in data}
+
+def fragment_hash(section, data, template_style):
+    """Content address of one rendered resume section"""
+    payload = json.dumps([RESUME_TEMPLATE_VERSION, template_style, section, section_fields(section, data)],
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+def render_resume_fragments(data, known=()):
+    """Return the fragment hashes of a resume in order, and the HTML of those not in known.
+
+    Sections whose inputs are unchanged come from preview_fragment_cache, so a
+    keystroke re-renders only the section it edited.
+    """
+    template_style = data.get('template', 'modern')
+    hashes = []
+    fragments = {}
+    for section in resume_sections(data):
+        fragment = fragment_hash(section, data, template_style)
+        hashes.append(fragment)
+        if fragment in known or fragment in fragments:
+            continue
+        html = preview_fragment_cache.get(fragment)
+        if html is None:
+            html = render_template(f'resume_sections/{section}.html',
+                                   data=section_fields(section, data),
+                                   template_style=template_style)
+            preview_fragment_cache.set(fragment, html)
+        fragments[fragment] = html
+    return hashes, fragments
+
+def resume_version(hashes):
+    """Version token of a whole rendered resume"""
+    return hashlib.sha256('.'.join(hashes).encode('utf-8')).hexdigest()[:32]
+
+def preview_etag(data):
+    """Canonical hash of a preview request and the templates it renders with"""
+    payload = {key: value for key, value in data.items() if key != 'known_fragments'}
+    canonical = json.dumps([RESUME_TEMPLATE_VERSION, payload], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+def render_resume_html(data):
+    """Render a resume to a complete HTML document from its section fragments"""
+    hashes, fragments = render_resume_fragments(data)
+    return '\n'.join(fragments[fragment] for fragment in hashes)
 
-def get_user_from_dynamodb(user_id):
-    """Get user info from DynamoDB"""
+def pdf_cache_key(resume_html, pdf_options=PDF_OPTIONS):
+    """Content address of a rendered resume, the options it is printed with and its fonts"""
+    fonts = hashlib.sha256(RESUME_FONT_CSS).hexdigest()
+    payload = json.dumps(pdf_options, sort_keys=True) + fonts + resume_html
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def render_pdf(resume_html):
+    """Render resume HTML to PDF bytes, or None if every renderer fails"""
+    # Try Playwright first (faster and better rendering)
     try:
-        table = dynamodb.Table(DYNAMODB_TABLE_NAME)
-        response = table.get_item(Key={'userId': user_id})  # Changed to match DynamoDB schema
-        return response.get('Item')
-    except Exception as e:
-        print(f"Error getting user from DynamoDB: {e}")
-        return None
+        return pdf_pool.render_pdf(resume_html, PDF_OPTIONS)
+    except Exception as playwright_error:
+        print(f"Playwright PDF generation failed: {playwright_error}")
+    
+    # Fallback to WeasyPrint if available
+    if WEASYPRINT_AVAILABLE:
+        try:
+            # Create HTML object and generate PDF
+            html_doc = HTML(string=resume_html)
+            pdf_bytes = html_doc.write_pdf()
+            print("Successfully generated PDF using WeasyPrint")
+            return pdf_bytes
+        except Exception as weasyprint_error:
+            print(f"WeasyPrint PDF generation failed: {weasyprint_error}")
+    return None
+
+def render_cached_pdf(cache_key, resume_html):
+    """Return PDF bytes for a rendered resume, rendering only on a cache miss"""
+    pdf_bytes = pdf_cache.get(cache_key)
+    if pdf_bytes is None:
+        pdf_bytes = render_pdf(resume_html)
+        if pdf_bytes is None:
+            raise RuntimeError('PDF generation failed. Please try again later.')
+        pdf_cache.set(cache_key, pdf_bytes)
+    return pdf_bytes
+
+def export_resume_pdf(key):
+    """Fetch a saved resume and render it to a (zip entry name, PDF bytes) pair"""
+    resume_data = get_cached_resume(key)[0]
+    with app.app_context():
+        resume_html = render_resume_html(resume_data)
+    pdf_bytes = render_cached_pdf(pdf_cache_key(resume_html), resume_html)
+    name = (resume_data.get('name') or 'Resume').replace(' ', '_')
+    stem = os.path.splitext(os.path.basename(key))[0]
+    return f"{name}_{stem}.pdf", pdf_bytes
+
+def export_resume_pdfs(keys):
+    """Yield zip entries as renders finish, with at most BULK_EXPORT_CONCURRENCY in flight"""
+    keys = iter(keys)
+    failed = []
+    with ThreadPoolExecutor(max_workers=BULK_EXPORT_CONCURRENCY) as executor:
+        pending = {}
+        
+        def submit_next():
+            key = next(keys, None)
+            if key is not None:
+                pending[executor.submit(export_resume_pdf, key)] = key
+        
+        for _ in range(BULK_EXPORT_CONCURRENCY):
+            submit_next()
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                submit_next()
+                try:
+                    yield future.result()
+                except Exception as e:
+                    print(f"Error exporting {key}: {e}")
+                    failed.append(f"{key}: {e}")
+    
+    if failed:
+        yield 'export_errors.txt', '\n'.join(failed).encode('utf-8')
 
 @app.route('/')
 def index():
@@ -205,7 +1564,8 @@ def custom_login():
                 }
             }
             
-            response = cognito_client.initiate_auth(**params)
+            with tracer.span('initiate_auth'):
+                response = cognito_client.initiate_auth(**params)
             
             # Handle challenges (MFA, new password, etc.)
             if "ChallengeName" in response:
@@ -232,7 +1592,7 @@ def custom_login():
                 session['refresh_token'] = auth_result.get('RefreshToken')
                 
                 # Save user to DynamoDB
-                save_user_to_dynamodb(email, email)
+                login_writes.put(email, (email, datetime.now().isoformat()))
                 
                 return jsonify({
                     'success': True, 
@@ -317,7 +1677,9 @@ def callback():
         if COGNITO_APP_CLIENT_SECRET:
             token_data['client_secret'] = COGNITO_APP_CLIENT_SECRET
         
-        response = requests.post(token_url, data=token_data, timeout=15)
+        with tracer.span('cognito.token'):
+            response = http_session.post(token_url, data=token_data,
+                                         timeout=(UPSTREAM_CONNECT_TIMEOUT, COGNITO_READ_TIMEOUT))
         if response.status_code != 200:
             return f"Token exchange failed: {response.status_code} {response.text}", 400
         
@@ -343,7 +1705,7 @@ def callback():
             session['refresh_token'] = tokens.get('refresh_token')
             
             # Save user to DynamoDB
-            save_user_to_dynamodb(user_id, email)
+            login_writes.put(user_id, (email, datetime.now().isoformat()))
             
             # Optional: prevent replay by clearing single-use values
             session.pop("oauth_state", None)
@@ -373,11 +1735,11 @@ def dashboard():
         user_id = session.get('user_id')
         user_email = session.get('email')
         
-        # Get user info from DynamoDB
-        user_info = get_user_from_dynamodb(user_id)
+        # Get user info from DynamoDB, including a login that has not been written yet
+        user_info = with_pending_login(user_id, get_user_from_dynamodb(user_id))
         
-        # Get user's resumes from S3
-        resumes = get_user_resumes_from_s3(user_id)
+        # Get user's resumes from the index (metadata only)
+        resumes = list_user_resumes(user_id)
         
         return render_template('dashboard.html', 
                              user_email=user_email,
@@ -407,10 +1769,7 @@ def save_resume():
         
         if filename:
             # Update user's resume count in DynamoDB
-            user_info = get_user_from_dynamodb(user_id)
-            resume_count = user_info.get('resume_count', 0) + 1 if user_info else 1
-            
-            save_user_to_dynamodb(user_id, session.get('email'), resume_count)
+            record_resume_saved(user_id, session.get('email'))
             
             return jsonify({
                 'success': True,
@@ -429,11 +1788,29 @@ def get_resumes():
     """Get all resumes for the current user"""
     try:
         user_id = session.get('user_id')
-        resumes = get_user_resumes_from_s3(user_id)
+        resumes = list_user_resumes(user_id)
         return jsonify({'resumes': resumes})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/resume-versions')
+@login_required
+def resume_versions():
+    """Version history for the current user, newest first"""
+    try:
+        user_id = session.get('user_id')
+        versions = [{
+            'filename': entry['filename'],
+            'name': entry['name'],
+            'created': entry['created'],
+            'size': entry['size'],
+            'storage': 'delta' if entry.get('base') else 'snapshot',
+            'base': entry.get('base')
+        } for entry in reversed(list_user_resumes(user_id))]
+        return jsonify({'versions': versions})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/load-resume/<path:filename>')
 @login_required
 def load_resume(filename):
@@ -445,19 +1822,47 @@ def load_resume(filename):
         if not filename.startswith(f"{user_id}/"):
             return jsonify({'error': 'Unauthorized'}), 403
         
-        response = s3_client.get_object(
-            Bucket=S3_BUCKET_NAME,
-            Key=filename
-        )
+        if is_resume_version_hidden(user_id, filename):
+            return jsonify({'error': 'Resume not found'}), 404
+        
+        resume_data, etag, last_modified = get_cached_resume(filename)
+        
+        # Saved resumes never change, so browsers can revalidate with a 304
+        response = jsonify({'resume': resume_data})
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
         
-        resume_data = json.loads(response['Body'].read())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/export-resumes')
+@login_required
+@admit('pdf')
+def export_resumes():
+    """Stream a ZIP of PDFs for all saved resumes, or the ones named by ?filename="""
+    try:
+        user_id = session.get('user_id')
+        keys = request.args.getlist('filename') or [entry['filename'] for entry in list_user_resumes(user_id)]
+        
+        # Verify the files belong to the user
+        if any(not key.startswith(f"{user_id}/") for key in keys):
+            return jsonify({'error': 'Unauthorized'}), 403
         
-        return jsonify({'resume': resume_data})
+        if not keys:
+            return jsonify({'error': 'No saved resumes to export'}), 404
         
+        return app.response_class(
+            stream_zip(export_resume_pdfs(keys)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': 'attachment; filename=resumes.zip'}
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/delete-resume/<filename>', methods=['DELETE'])
+@app.route('/delete-resume/<path:filename>', methods=['DELETE'])
 @login_required
 def delete_resume(filename):
     """Delete a resume from S3"""
@@ -468,10 +1873,7 @@ def delete_resume(filename):
         if not filename.startswith(f"{user_id}/"):
             return jsonify({'error': 'Unauthorized'}), 403
         
-        s3_client.delete_object(
-            Bucket=S3_BUCKET_NAME,
-            Key=filename
-        )
+        delete_resume_version(user_id, filename)
         
         return jsonify({'success': True, 'message': 'Resume deleted successfully'})
     except Exception as e:
@@ -479,6 +1881,7 @@ def delete_resume(filename):
 
 @app.route('/extract-keywords', methods=['POST'])
 @login_required
+@admit('ai')
 def extract_keywords():
     try:
         data = request.get_json()
@@ -488,24 +1891,107 @@ def extract_keywords():
         if not job_description or len(job_description) < 30:
             return jsonify({'error': 'Please enter a more detailed job description (at least 30 characters).'}), 400
         
-        prompt = (
-            "Extract all the most important keywords, technical skills, qualifications, tools, "
-            "and relevant industry terms from the job description below. These keywords should reflect "
-            "what an ATS (Applicant Tracking System) would look for to match a resume with the job.\n\n"
-            f"Job Description:\n{job_description}\n\nKeywords:"
-        )
+        mode = data.get('mode') or KEYWORD_EXTRACTION_MODE
+        if mode not in KEYWORD_MODES:
+            return jsonify({'error': f"Unknown keyword mode: {mode}"}), 400
         
-        response = openai.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=256,
-            temperature=0.2,
-        )
+        enrich = bool(data.get('enrich'))
+        keywords = job_keywords_for_mode(job_description, mode, enrich)
+        if mode != 'hybrid':
+            return jsonify({'keywords': keywords})
+        
+        # Hybrid answers from the lexicon right away; the client asks again with enrich for model keywords
+        return jsonify({'keywords': keywords, 'enriched': enrich})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def request_keywords(data):
+    """Keywords given in a request body, or extracted from its job description.
+
+    Returns (keywords, error message) with exactly one of them set.
+    """
+    keywords = data.get('keywords')
+    if keywords:
+        return keywords, None
+    
+    job_description = data.get('job_description', '').strip()
+    if not job_description or len(job_description) < 30:
+        return None, 'Please provide keywords or a detailed job description (at least 30 characters).'
+    
+    mode = data.get('mode') or KEYWORD_EXTRACTION_MODE
+    if mode not in KEYWORD_MODES:
+        return None, f"Unknown keyword mode: {mode}"
+    return job_keywords_for_mode(job_description, mode, bool(data.get('enrich'))), None
+
+@app.route('/keyword-coverage', methods=['POST'])
+@login_required
+@admit('ai')
+def keyword_coverage():
+    """Keyword coverage of a resume, overall and per section"""
+    try:
+        data = request.get_json()
+        keywords, error = request_keywords(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        matcher = KeywordMatcher(keywords, keyword_synonyms)
+        result = score_resume(ResumeIndex(data.get('resume') or {}), matcher)
+        return jsonify(dict(result, keywords=matcher.keywords))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/rank-resumes', methods=['POST'])
+@login_required
+@admit('ai')
+def rank_resumes():
+    """Score all of the user's saved resumes against a job description in one call"""
+    try:
+        data = request.get_json()
+        keywords, error = request_keywords(data)
+        if error:
+            return jsonify({'error': error}), 400
         
-        keywords_text = response.choices[0].message.content.strip()
-        keywords = [kw.strip() for kw in keywords_text.replace("\n", ",").split(",") if kw.strip()]
+        user_id = session.get('user_id')
+        return jsonify({'keywords': keywords, 'resumes': rank_user_resumes(user_id, keywords)})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def keyword_events(job_description, mode, enrich=False):
+    keywords = []
+    seen = set()
+    sources = []
+    if mode != 'openai':
+        sources.append(extract_keywords_locally(job_description))
+    if mode == 'openai' or (mode == 'hybrid' and enrich):
+        sources.append(stream_job_keywords(job_description))
+    for source in sources:
+        for keyword in source:
+            if keyword.casefold() not in seen:
+                seen.add(keyword.casefold())
+                keywords.append(keyword)
+                yield 'keyword', {'keyword': keyword}
+    yield 'done', {'keywords': keywords}
+
+@app.route('/extract-keywords/stream', methods=['POST'])
+@login_required
+@admit('ai')
+def extract_keywords_stream():
+    """Like /extract-keywords, but send each keyword as a Server-Sent Event once it is extracted"""
+    try:
+        data = request.get_json()
+        job_description = data.get('job_description', '').strip()
+        
+        if not job_description or len(job_description) < 30:
+            return jsonify({'error': 'Please enter a more detailed job description (at least 30 characters).'}), 400
+        
+        mode = data.get('mode') or KEYWORD_EXTRACTION_MODE
+        if mode not in KEYWORD_MODES:
+            return jsonify({'error': f"Unknown keyword mode: {mode}"}), 400
         
-        return jsonify({'keywords': keywords})
+        return sse_response(keyword_events(job_description, mode, bool(data.get('enrich'))))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -522,19 +2008,40 @@ def generate_resume():
             if not data.get(field):
                 return jsonify({'error': f'{field.title()} is required'}), 400
         
-        # Generate resume HTML
-        resume_html = render_template('resume_template.html', 
-                                    data=data,
-                                    template_style=data.get('template', 'modern'),
-                                    section_order=data.get('section_order', []))
+        # The preview form re-posts identical payloads on focus changes and no-op reorders
+        etag = preview_etag(data)
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        
+        # Clients that cache fragments send the hashes they hold and get back only the missing ones
+        known = data.get('known_fragments')
+        if known is not None:
+            hashes, fragments = render_resume_fragments(data, known=set(known))
+            response = jsonify({'version': resume_version(hashes), 'sections': hashes, 'fragments': fragments})
+        else:
+            memo_key = session.setdefault('preview_id', secrets.token_urlsafe(16))
+            memo = preview_memo.get(memo_key)
+            if memo is not None and memo[0] == etag:
+                resume_html, version = memo[1], memo[2]
+            else:
+                hashes, fragments = render_resume_fragments(data)
+                resume_html = '\n'.join(fragments[fragment] for fragment in hashes)
+                version = resume_version(hashes)
+                preview_memo.set(memo_key, (etag, resume_html, version))
+            response = jsonify({'resume_html': resume_html, 'version': version})
         
-        return jsonify({'resume_html': resume_html})
+        # Weak, since compress_response may gzip the body after this
+        response.set_etag(etag, weak=True)
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/generate-pdf', methods=['POST'])
 @login_required
+@admit('pdf')
 def generate_pdf():
     try:
         data = request.get_json()
@@ -545,58 +2052,23 @@ def generate_pdf():
             if not data.get(field):
                 return jsonify({'error': f'{field.title()} is required'}), 400
         
-        # Generate resume HTML (exact same as preview)
-        resume_html = render_template('resume_template.html', 
-                                    data=data,
-                                    template_style=data.get('template', 'modern'),
-                                    section_order=data.get('section_order', []))
+        # Generate resume HTML (same markup and fonts as the preview)
+        resume_html = render_resume_html(data)
         
-        pdf_bytes = None
+        # Serve repeat downloads of an unchanged resume without touching Chromium
+        cache_key = pdf_cache_key(resume_html)
+        if request.if_none_match.contains(cache_key):
+            response = app.response_class(status=304)
+            response.set_etag(cache_key)
+            return response
         
-        # Try Playwright first (faster and better rendering)
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch()
-                page = browser.new_page()
-                
-                # Set content to the HTML
-                page.set_content(resume_html)
-                
-                # Generate PDF with A4 size and proper styling
-                pdf_bytes = page.pdf(
-                    format='A4',
-                    print_background=True,
-                    margin={
-                        'top': '0.5in',
-                        'right': '0.5in',
-                        'bottom': '0.5in',
-                        'left': '0.5in'
-                    }
-                )
-                
-                browser.close()
-        except Exception as playwright_error:
-            print(f"Playwright PDF generation failed: {playwright_error}")
-            
-            # Fallback to WeasyPrint if available
-            if WEASYPRINT_AVAILABLE:
-                try:
-                    # Create HTML object and generate PDF
-                    html_doc = HTML(string=resume_html)
-                    pdf_bytes = html_doc.write_pdf()
-                    print("Successfully generated PDF using WeasyPrint")
-                except Exception as weasyprint_error:
-                    print(f"WeasyPrint PDF generation failed: {weasyprint_error}")
-                    return jsonify({'error': 'PDF generation failed. Please try again later.'}), 500
-            else:
+        pdf_io = pdf_cache.open(cache_key)
+        if pdf_io is None:
+            pdf_bytes = render_pdf(resume_html)
+            if pdf_bytes is None:
                 return jsonify({'error': 'PDF generation failed. Please try again later.'}), 500
-        
-        if pdf_bytes is None:
-            return jsonify({'error': 'PDF generation failed. Please try again later.'}), 500
-        
-        # Create a file-like object from the PDF bytes
-        pdf_io = io.BytesIO(pdf_bytes)
-        pdf_io.seek(0)
+            pdf_cache.set(cache_key, pdf_bytes)
+            pdf_io = io.BytesIO(pdf_bytes)
         
         # Generate filename
         filename = f"{data['name'].replace(' ', '_')}_Resume.pdf"
@@ -605,87 +2077,153 @@ def generate_pdf():
             pdf_io,
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=filename
+            download_name=filename,
+            etag=cache_key
         )
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/ai-rewrite-job-description', methods=['POST'])
+@app.route('/pdf-jobs', methods=['POST'])
 @login_required
-def ai_rewrite_job_description():
+@admit('pdf')
+def create_pdf_job():
+    """Queue a PDF render and return a job id without waiting for Chromium"""
     try:
         data = request.get_json()
-        bullet_points = data.get('bullet_points', [])
-        selected_keywords = data.get('selected_keywords', [])
         
-
+        # Validate required fields
+        required_fields = ['name', 'email', 'phone', 'summary']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({'error': f'{field.title()} is required'}), 400
         
-        if not bullet_points:
-            return jsonify({'error': 'No bullet points provided'}), 400
+        # Templates need the request context, so render the HTML before queueing
+        resume_html = render_resume_html(data)
+        cache_key = pdf_cache_key(resume_html)
         
-        # Create a comprehensive prompt for rewriting job descriptions
-        keyword_instruction = ""
-        if selected_keywords:
-            keyword_instruction = f"""
-                                        CRITICAL REQUIREMENT: You MUST include these keywords in your rewritten bullet points: {', '.join(selected_keywords)}
-
-                                        MANDATORY INSTRUCTIONS:
-                                        - Each bullet point MUST contain at least one of these keywords
-                                        - Use the keywords naturally within the sentence structure
-                                        - If a keyword doesn't fit naturally, rephrase the bullet point to include it
-                                        - Make sure all keywords are used across the bullet points
-                                        - Prioritize keyword inclusion over perfect flow if necessary
-
-                                        EXAMPLE: If keywords are ["Git", "SQL"], rewrite like:
-                                        "Implemented Git version control and SQL database optimization, resulting in..."
+        try:
+            job = pdf_jobs.submit(
+                render_cached_pdf, cache_key, resume_html,
+                owner=session.get('user_id'),
+                meta={
+                    'filename': f"{data['name'].replace(' ', '_')}_Resume.pdf",
+                    'etag': cache_key
+                }
+            )
+        except QueueFull:
+            return jsonify({'error': 'PDF queue is full. Please try again shortly.'}), 503, {'Retry-After': '5'}
+        
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('pdf_job_status', job_id=job.id),
+            'download_url': url_for('download_pdf_job', job_id=job.id)
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-                                        Original Bullet Points:
-                                        {chr(10).join([f"{i+1}. {point}" for i, point in enumerate(bullet_points)])}
+def get_user_pdf_job(job_id):
+    """Look up a PDF job owned by the current user"""
+    job = pdf_jobs.get(job_id)
+    if job is None or job.owner != session.get('user_id'):
+        return None
+    return job
 
-                                        Now rewrite all {len(bullet_points)} bullet points using the given instructions.
-                                        """
-        
-        prompt = f"""You are a professional resume writer. Rewrite the following job description bullet points to make them more impactful, professional, and human-like. 
+@app.route('/pdf-jobs/<job_id>')
+@login_required
+def pdf_job_status(job_id):
+    """Report the progress of a queued PDF render"""
+    job = get_user_pdf_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
 
-{keyword_instruction}
+@app.route('/pdf-jobs/<job_id>/download')
+@login_required
+def download_pdf_job(job_id):
+    """Download the PDF produced by a finished job"""
+    job = get_user_pdf_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status == 'failed':
+        return jsonify(job.to_dict()), 500
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 202, {'Retry-After': '1'}
+    
+    return send_file(
+        io.BytesIO(job.result),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=job.meta['filename'],
+        etag=job.meta['etag']
+    )
 
-Guidelines:
-- Use strong action verbs at the beginning of each bullet point
-- Include specific metrics, numbers, and achievements when possible
-- Make them sound natural and professional
-- Keep each point concise but impactful
-- Focus on results and accomplishments
-- Use industry-standard terminology
-- Make them sound like they were written by a human professional
+def outbound_pool_stats():
+    """Connection reuse per upstream; None for clients not created yet"""
+    pools = {
+        's3': (s3_client, aws_pool_stats),
+        'dynamodb': (dynamodb, aws_pool_stats),
+        'cognito-idp': (cognito_client, aws_pool_stats),
+        'cognito-token': (http_session, http_session_pool_stats),
+        'openai': (openai, lambda module: httpx_pool_stats(module.http_client)),
+    }
+    result = {}
+    for name, (client, pool_stats) in pools.items():
+        if isinstance(client, LazyClient) and not client.created:
+            result[name] = None
+            continue
+        try:
+            result[name] = pool_stats(client.get() if isinstance(client, LazyClient) else client)
+        except AttributeError:
+            # Stand-in clients (tests, benchmarks) have no connection pool
+            result[name] = None
+    return result
 
-Original bullet points:
-{chr(10).join([f"- {point}" for point in bullet_points])}
+@app.route('/stats')
+def stats():
+    """Operational counters for the PDF pipeline"""
+    return jsonify({
+        'pdf_pool': pdf_pool.stats(),
+        'pdf_cache': pdf_cache.stats(),
+        'pdf_jobs': pdf_jobs.stats(),
+        'resume_cache': resume_cache.stats(),
+        'login_writes': login_writes.stats(),
+        'keyword_cache': dict(keyword_cache.stats(), shared_calls=keyword_flights.shared),
+        'rewrite_cache': rewrite_cache.stats(),
+        'coverage_index_cache': coverage_index_cache.stats(),
+        'preview_fragment_cache': preview_fragment_cache.stats(),
+        'preview_memo': preview_memo.stats(),
+        'startup': startup_timings,
+        'http_pools': outbound_pool_stats(),
+        'admission': {
+            group: {'concurrency': concurrency.stats(), 'rate': rate.stats()}
+            for group, (concurrency, rate) in admission_limits.items()
+        }
+    })
 
-Please rewrite each bullet point to be more professional and impactful. Return only the rewritten bullet points, one per line, without numbering or bullet symbols:"""
+@app.route('/metrics')
+def metrics():
+    """Request and span latency histograms in the Prometheus text format"""
+    return app.response_class(render_metrics(request_latency, span_latency),
+                              mimetype='text/plain; version=0.0.4')
 
-        response = openai.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=1000,
-            temperature=0.3,
-        )
+@app.route('/ai-rewrite-job-description', methods=['POST'])
+@login_required
+@admit('ai')
+def ai_rewrite_job_description():
+    try:
+        data = request.get_json()
+        bullet_points = data.get('bullet_points', [])
+        selected_keywords = data.get('selected_keywords', [])
         
-        rewritten_text = response.choices[0].message.content.strip()
+
         
-        # Split the response into individual bullet points
-        rewritten_points = []
-        for line in rewritten_text.split('\n'):
-            line = line.strip()
-            if line:
-                # Remove any bullet symbols or numbering that might be in the response
-                line = line.lstrip('•-1234567890. ')
-                if line:
-                    rewritten_points.append(line)
+        if not bullet_points:
+            return jsonify({'error': 'No bullet points provided'}), 400
         
-        # Ensure we have the same number of points or fewer
-        if len(rewritten_points) > len(bullet_points):
-            rewritten_points = rewritten_points[:len(bullet_points)]
+        rewritten_points = rewrite_bullets('job', bullet_points, selected_keywords)
         
         return jsonify({'rewritten_points': rewritten_points})
         
@@ -694,6 +2232,7 @@ Please rewrite each bullet point to be more professional and impactful. Return o
 
 @app.route('/ai-rewrite-project-description', methods=['POST'])
 @login_required
+@admit('ai')
 def ai_rewrite_project_description():
     try:
         data = request.get_json()
@@ -705,77 +2244,116 @@ def ai_rewrite_project_description():
         if not bullet_points:
             return jsonify({'error': 'No bullet points provided'}), 400
         
-        # Create a comprehensive prompt for rewriting project descriptions
-        keyword_instruction = ""
-        if selected_keywords:
-            keyword_instruction = f"""
-CRITICAL REQUIREMENT: You MUST include these keywords in your rewritten bullet points: {', '.join(selected_keywords)}
-
-MANDATORY INSTRUCTIONS:
-- Each bullet point MUST contain at least one of these keywords
-- Use the keywords naturally within the sentence structure
-- If a keyword doesn't fit naturally, rephrase the bullet point to include it
-- Make sure all keywords are used across the bullet points
-- Prioritize keyword inclusion over perfect flow if necessary
-
-EXAMPLE: If keywords are ["Git", "SQL"], rewrite like:
-"Implemented Git version control and SQL database optimization, resulting in..."
-
-Original Bullet Points:
-{chr(10).join([f"{i+1}. {point}" for i, point in enumerate(bullet_points)])}
-
-Now rewrite all {len(bullet_points)} bullet points using the given instructions.
-"""
+        rewritten_points = rewrite_bullets('project', bullet_points, selected_keywords)
         
-        prompt = f"""You are a professional resume writer. Rewrite the following project description bullet points to make them more impactful, professional, and human-like. 
-
-{keyword_instruction}
-
-Guidelines:
-- Use strong action verbs at the beginning of each bullet point
-- Include specific technologies, tools, and methodologies used
-- Highlight technical achievements and problem-solving skills
-- Make them sound natural and professional
-- Keep each point concise but impactful
-- Focus on technical results and accomplishments
-- Use industry-standard terminology
-- Make them sound like they were written by a human professional
-- Emphasize the technical complexity and impact of the project
+        return jsonify({'rewritten_points': rewritten_points})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-Original bullet points:
-{chr(10).join([f"- {point}" for point in bullet_points])}
+@app.route('/ai-tailor-resume', methods=['POST'])
+@login_required
+@admit('ai')
+def ai_tailor_resume():
+    """Rewrite all job and project bullet points of a resume in one request"""
+    try:
+        data = request.get_json()
+        resume_data = data.get('resume', {})
+        selected_keywords = data.get('selected_keywords', [])
+        
+        if not any(resume_data.get(field) for field in TAILOR_SECTIONS):
+            return jsonify({'error': 'No job or project bullet points provided'}), 400
+        
+        return jsonify(tailor_resume(resume_data, selected_keywords))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-Please rewrite each bullet point to be more professional and impactful. Return only the rewritten bullet points, one per line, without numbering or bullet symbols:"""
+def rewrite_events(kind, bullet_points, selected_keywords):
+    rewritten_points = [None] * len(bullet_points)
+    for i, point in stream_rewrite_bullets(kind, bullet_points, selected_keywords):
+        rewritten_points[i] = point
+        yield 'bullet', {'index': i, 'text': point}
+    yield 'done', {'rewritten_points': rewritten_points}
 
-        response = openai.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=1000,
-            temperature=0.3,
-        )
+@app.route('/ai-rewrite-job-description/stream', methods=['POST'])
+@login_required
+@admit('ai')
+def ai_rewrite_job_description_stream():
+    """Like /ai-rewrite-job-description, but send each bullet as a Server-Sent Event once it is rewritten"""
+    try:
+        data = request.get_json()
+        bullet_points = data.get('bullet_points', [])
+        selected_keywords = data.get('selected_keywords', [])
+        
+        if not bullet_points:
+            return jsonify({'error': 'No bullet points provided'}), 400
         
-        rewritten_text = response.choices[0].message.content.strip()
+        return sse_response(rewrite_events('job', bullet_points, selected_keywords))
         
-        # Split the response into individual bullet points
-        rewritten_points = []
-        for line in rewritten_text.split('\n'):
-            line = line.strip()
-            if line:
-                # Remove any bullet symbols or numbering that might be in the response
-                line = line.lstrip('•-1234567890. ')
-                if line:
-                    rewritten_points.append(line)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/ai-rewrite-project-description/stream', methods=['POST'])
+@login_required
+@admit('ai')
+def ai_rewrite_project_description_stream():
+    """Like /ai-rewrite-project-description, but send each bullet as a Server-Sent Event once it is rewritten"""
+    try:
+        data = request.get_json()
+        bullet_points = data.get('bullet_points', [])
+        selected_keywords = data.get('selected_keywords', [])
         
-        # Ensure we have the same number of points or fewer
-        if len(rewritten_points) > len(bullet_points):
-            rewritten_points = rewritten_points[:len(bullet_points)]
+        if not bullet_points:
+            return jsonify({'error': 'No bullet points provided'}), 400
         
-        return jsonify({'rewritten_points': rewritten_points})
+        return sse_response(rewrite_events('project', bullet_points, selected_keywords))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.cli.command('rebuild-resume-index')
+@click.option('--user', 'user_ids', multiple=True, help='Only rebuild these users (default: every user in the bucket)')
+def rebuild_resume_index_command(user_ids):
+    """Build or rebuild the resume index for existing users"""
+    if not user_ids:
+        paginator = s3_client.get_paginator('list_objects_v2')
+        user_ids = [
+            prefix['Prefix'].rstrip('/')
+            for page in paginator.paginate(Bucket=S3_BUCKET_NAME, Delimiter='/')
+            for prefix in page.get('CommonPrefixes', [])
+        ]
+    for user_id in user_ids:
+        index = rebuild_resume_index(user_id)
+        click.echo(f"{user_id}: indexed {len(index['resumes'])} resumes")
+
+def warm_up():
+    """Create the service clients, compile the resume templates and launch the PDF browsers"""
+    started = time.perf_counter()
+    for client in (openai, s3_client, dynamodb, cognito_client):
+        if isinstance(client, LazyClient):
+            client.get()
+    with app.app_context():
+        render_resume_html({})
+    try:
+        pdf_pool.warm_up()
+    except Exception as e:
+        print(f"Error warming up PDF browsers: {e}")
+    startup_timings['warm_up'] = round(time.perf_counter() - started, 3)
+
+def create_app(warm=None):
+    """Return the app for a WSGI server (e.g. gunicorn 'app:create_app()').
+
+    With warm (default WARM_UP_ON_START), clients and browsers are created
+    before the app is handed over, so the first requests do not pay for them.
+    """
+    if WARM_UP_ON_START if warm is None else warm:
+        warm_up()
+    startup_timings.setdefault('ready', round(time.perf_counter() - IMPORT_STARTED, 3))
+    return app
+
+startup_timings['import'] = round(time.perf_counter() - IMPORT_STARTED, 3)
 
 if __name__ == '__main__':
-    app.run(debug=False, port=int(os.environ.get('PORT', 5001)), host='0.0.0.0') 
\ No newline at end of file
+    create_app().run(debug=False, port=int(os.environ.get('PORT', 5001)), host='0.0.0.0') 
\ No newline at end of file
@@ -0,0 +1,348 @@
+import io
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeS3:
+    """Thread-safe in-memory stand-in for the parts of the S3 client the app uses.
+
+    Every call sleeps for latency seconds to mimic a round trip to S3. Each
+    put gets a later LastModified than the one before, so listings sorted by
+    modification time follow the order objects were written in.
+    """
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self, latency=0.0, page_size=1000):
+        self.latency = latency
+        self.page_size = page_size
+        self.objects = {}
+        self.calls = 0
+        self.get_count = 0
+        self._last_modified = None
+        self._lock = threading.Lock()
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self._call()
+        body = Body.encode('utf-8') if isinstance(Body, str) else Body
+        with self._lock:
+            modified = datetime.now(timezone.utc)
+            if self._last_modified is not None and modified <= self._last_modified:
+                modified = self._last_modified + timedelta(microseconds=1)
+            self._last_modified = modified
+            self.objects[Key] = {'Body': body, 'LastModified': modified, **kwargs}
+
+    def get_object(self, Bucket, Key):
+        self._call()
+        with self._lock:
+            self.get_count += 1
+            obj = self.objects.get(Key)
+        if obj is None:
+            raise self.exceptions.NoSuchKey(Key)
+        return {**obj, 'Body': io.BytesIO(obj['Body']), 'ContentLength': len(obj['Body'])}
+
+    def delete_object(self, Bucket, Key):
+        self._call()
+        with self._lock:
+            self.objects.pop(Key, None)
+
+    def list_objects_v2(self, Bucket, Prefix='', Delimiter=None, MaxKeys=1000, ContinuationToken=None):
+        self._call()
+        with self._lock:
+            items = sorted(self.objects.items())
+        contents, prefixes = [], []
+        for key, obj in items:
+            if not key.startswith(Prefix):
+                continue
+            if Delimiter and Delimiter in key[len(Prefix):]:
+                prefix = key[:key.index(Delimiter, len(Prefix)) + 1]
+                if {'Prefix': prefix} not in prefixes:
+                    prefixes.append({'Prefix': prefix})
+                continue
+            contents.append({'Key': key, 'LastModified': obj['LastModified'], 'Size': len(obj['Body'])})
+        start = int(ContinuationToken or 0)
+        page = contents[start:start + MaxKeys]
+        response = {'IsTruncated': start + MaxKeys < len(contents), 'CommonPrefixes': prefixes}
+        if page:
+            response['Contents'] = page
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = str(start + MaxKeys)
+        return response
+
+    def get_paginator(self, operation):
+        return FakePaginator(self, self.page_size)
+
+
+class FakePaginator:
+    def __init__(self, s3, page_size):
+        self.s3 = s3
+        self.page_size = page_size
+
+    def paginate(self, **kwargs):
+        token = None
+        while True:
+            page = self.s3.list_objects_v2(MaxKeys=self.page_size, ContinuationToken=token, **kwargs)
+            yield page
+            if not page['IsTruncated']:
+                break
+            token = page['NextContinuationToken']
+
+
+class ConditionalCheckFailedException(Exception):
+    pass
+
+
+def condition_holds(item, expression, values):
+    """Evaluate the OR-joined attribute_exists/attribute_not_exists, = and < conditions the app uses"""
+    for clause in expression.split(' OR '):
+        exists = re.fullmatch(r'attribute_(not_)?exists\((\w+)\)', clause.strip())
+        if exists:
+            if (exists.group(2) in item) != bool(exists.group(1)):
+                return True
+            continue
+        name, operator, value = re.fullmatch(r'(\w+) (=|<) (:\w+)', clause.strip()).groups()
+        if name in item and (item[name] == values[value] if operator == '=' else item[name] < values[value]):
+            return True
+    return False
+
+
+class FakeTable:
+    """In-memory DynamoDB table supporting the item operations and expressions the app uses.
+
+    key_names are the table's partition key and, optionally, sort key. Queries
+    return items in sort key order, page_size at a time.
+    """
+
+    def __init__(self, latency=0.0, key_names=('userId',), page_size=1000):
+        self.latency = latency
+        self.key_names = tuple(key_names)
+        self.page_size = page_size
+        self.items = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _key(self, item):
+        """Items of a table keyed by userId alone are stored under the bare userId"""
+        key = tuple(item[name] for name in self.key_names)
+        return key[0] if len(key) == 1 else key
+
+    def _check(self, item, expression, values):
+        if expression and not condition_holds(item, expression, values or {}):
+            raise ConditionalCheckFailedException()
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeValues=None):
+        self._call()
+        with self._lock:
+            self._check(self.items.get(self._key(Item), {}), ConditionExpression, ExpressionAttributeValues)
+            self.items[self._key(Item)] = dict(Item)
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues=None,
+                    ConditionExpression=None, ReturnValues=None):
+        """Apply the SET (with if_not_exists), ADD and REMOVE clauses of an update expression"""
+        self._call()
+        values = ExpressionAttributeValues or {}
+        clauses = dict(re.findall(r'(SET|ADD|REMOVE) (.*?)(?= (?:SET|ADD|REMOVE) |$)', UpdateExpression))
+        with self._lock:
+            item = dict(self.items.get(self._key(Key), Key))
+            self._check(item, ConditionExpression, values)
+            for name, default, value in re.findall(r'(\w+) = (?:if_not_exists\(\w+, (:\w+)\)|(:\w+))',
+                                                   clauses.get('SET', '')):
+                if default:
+                    item.setdefault(name, values[default])
+                else:
+                    item[name] = values[value]
+            for name, value in re.findall(r'(\w+) (:\w+)', clauses.get('ADD', '')):
+                item[name] = item.get(name, 0) + values[value]
+            for name in re.findall(r'\w+', clauses.get('REMOVE', '')):
+                item.pop(name, None)
+            self.items[self._key(Key)] = item
+            return {'Attributes': dict(item)}
+
+    def get_item(self, Key, ConsistentRead=False):
+        self._call()
+        with self._lock:
+            item = self.items.get(self._key(Key))
+        return {'Item': dict(item)} if item else {}
+
+    def delete_item(self, Key, ConditionExpression=None, ExpressionAttributeValues=None):
+        self._call()
+        with self._lock:
+            self._check(self.items.get(self._key(Key), {}), ConditionExpression, ExpressionAttributeValues)
+            self.items.pop(self._key(Key), None)
+
+    def query(self, KeyConditionExpression, ExpressionAttributeValues, ConsistentRead=False,
+              ExclusiveStartKey=None):
+        """Items whose partition key equals the single value in a "name = :value" key condition"""
+        self._call()
+        name, value = re.fullmatch(r'(\w+) = (:\w+)', KeyConditionExpression).groups()
+        with self._lock:
+            matches = sorted((key, dict(item)) for key, item in self.items.items()
+                             if item.get(name) == ExpressionAttributeValues[value])
+        if ExclusiveStartKey is not None:
+            start = self._key(ExclusiveStartKey)
+            matches = [(key, item) for key, item in matches if key > start]
+        page = [item for _, item in matches[:self.page_size]]
+        response = {'Items': page}
+        if len(matches) > self.page_size:
+            response['LastEvaluatedKey'] = {key: page[-1][key] for key in self.key_names}
+        return response
+
+
+class FakeDynamoDB:
+    """Tables are created on first use; key_schema maps table names to their key attribute names
+    (userId alone by default)"""
+    class meta:
+        class client:
+            class exceptions:
+                ConditionalCheckFailedException = ConditionalCheckFailedException
+
+    def __init__(self, latency=0.0, key_schema=None):
+        self.latency = latency
+        self.key_schema = dict(key_schema or {})
+        self.tables = {}
+        self._lock = threading.Lock()
+
+    def Table(self, name):
+        with self._lock:
+            if name not in self.tables:
+                self.tables[name] = FakeTable(self.latency, self.key_schema.get(name, ('userId',)))
+            return self.tables[name]
+
+
+class FakeCognito:
+    """Accepts any email/password pair and returns a token set"""
+    class exceptions:
+        class NotAuthorizedException(Exception):
+            pass
+
+        class UserNotFoundException(Exception):
+            pass
+
+        class UserNotConfirmedException(Exception):
+            pass
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def initiate_auth(self, AuthFlow, ClientId, AuthParameters):
+        if self.latency:
+            time.sleep(self.latency)
+        return {'AuthenticationResult': {
+            'IdToken': 'id-token', 'AccessToken': 'access-token', 'RefreshToken': 'refresh-token',
+        }}
+
+
+FAKE_KEYWORDS = ['Python', 'AWS', 'Docker', 'Kubernetes', 'PostgreSQL', 'REST APIs', 'CI/CD', 'Agile']
+
+
+def fake_completion_text(prompt):
+    """A plausible model answer: one rewritten line per "- " bullet in the prompt, else keywords"""
+    _, found, bullets = prompt.partition('Original bullet points:\n')
+    if found:
+        lines = [line[2:] for line in bullets.split('\n') if line.startswith('- ')]
+        return '\n'.join(f"Delivered {line}" for line in lines)
+    return ', '.join(FAKE_KEYWORDS)
+
+
+class FakeOpenAIServer:
+    """Local HTTP server answering chat completion requests like the OpenAI API.
+
+    Each response waits latency seconds before its first byte; streamed
+    responses then send one chunk per word, token_delay seconds apart.
+    """
+
+    def __init__(self, latency=0.5, token_delay=0.01, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-openai', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with server._lock:
+                    server.requests += 1
+                if not self.path.endswith('/chat/completions'):
+                    self.send_error(404)
+                    return
+                text = fake_completion_text(body['messages'][-1]['content'])
+                time.sleep(server.latency)
+                if body.get('stream'):
+                    self._send_stream(body['model'], text)
+                else:
+                    self._send_json(body['model'], text)
+
+            def _send_json(self, model, text):
+                payload = json.dumps({
+                    'id': 'chatcmpl-bench', 'object': 'chat.completion', 'created': int(time.time()),
+                    'model': model,
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': text}}],
+                    'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+                }).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_stream(self, model, text):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+                for piece in re.findall(r'\S+\s*', text):
+                    chunk = {
+                        'id': 'chatcmpl-bench', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                        'model': model,
+                        'choices': [{'index': 0, 'finish_reason': None, 'delta': {'content': piece}}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                    time.sleep(server.token_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+
+        return Handler
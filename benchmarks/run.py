@@ -0,0 +1,396 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fakes import FakeS3, FakeDynamoDB, FakeCognito, FakeOpenAIServer
+
+
+BENCH_PASSWORD = 'benchmark'
+
+RESUME = {
+    'name': 'Bench User',
+    'email': 'bench@example.com',
+    'phone': '555-0100',
+    'summary': 'Backend engineer building Python web services on AWS.',
+    'skills': 'Python, Flask, AWS, Docker, PostgreSQL, Kubernetes',
+    'job_title': ['Senior Engineer', 'Engineer'],
+    'company': ['Acme', 'Initech'],
+    'job_description': [
+        ['Built REST APIs in Flask', 'Cut p95 latency by 40%', 'Led a team of four'],
+        ['Maintained CI/CD pipelines', 'Migrated services to Docker'],
+    ],
+    'project_title': ['Resume Builder'],
+    'project_role': ['Author'],
+    'project_description': [['Rendered PDFs with headless Chromium', 'Cached previews per section']],
+    'degree': ['BSc'],
+    'program': ['Computer Science'],
+    'institution': ['State University'],
+}
+
+JOB_DESCRIPTION = (
+    'We are hiring a backend engineer with strong Python and Flask experience to build REST APIs '
+    'on AWS. You will run services in Docker and Kubernetes, tune PostgreSQL queries, own CI/CD '
+    'pipelines and work in an Agile team.'
+)
+
+SELECTED_KEYWORDS = ['Python', 'AWS', 'Docker']
+
+
+def resume_variant(i):
+    """The benchmark resume with a summary unique to request label i, so responses are not all cache hits"""
+    return {**RESUME, 'summary': f"{RESUME['summary']} Request {i}."}
+
+
+# Each scenario sends the request labelled i on a logged-in session and returns the response;
+# labels come from Harness.request_labels and never repeat, so caches only help within a request
+SCENARIOS = {
+    'generate-resume': lambda http, url, i: http.post(f"{url}/generate-resume", json=resume_variant(i)),
+    'generate-pdf': lambda http, url, i: http.post(f"{url}/generate-pdf", json=resume_variant(i)),
+    'dashboard': lambda http, url, i: http.get(f"{url}/dashboard"),
+    'save-resume': lambda http, url, i: http.post(f"{url}/save-resume", json=resume_variant(i)),
+    'extract-keywords': lambda http, url, i: http.post(
+        f"{url}/extract-keywords", json={'job_description': f"{JOB_DESCRIPTION} Posting {i}."}),
+    'ai-rewrite': lambda http, url, i: http.post(f"{url}/ai-rewrite-job-description", json={
+        'bullet_points': [f"{point} ({i})" for point in RESUME['job_description'][0]],
+        'selected_keywords': SELECTED_KEYWORDS,
+    }),
+    'ai-tailor': lambda http, url, i: http.post(f"{url}/ai-tailor-resume", json={
+        'resume': resume_variant(i) | {
+            'job_description': [[f"{point} ({i})" for point in points] for points in RESUME['job_description']],
+        },
+        'selected_keywords': SELECTED_KEYWORDS,
+    }),
+}
+
+# Relaxed admission limits so the benchmark measures the endpoints rather than
+# the shedding; export these variables to benchmark the production limits
+BENCHMARK_ENV = {
+    'OPENAI_API_KEY': 'benchmark',
+    'COGNITO_APP_CLIENT_ID': 'benchmark',
+    'COGNITO_APP_CLIENT_SECRET': 'benchmark',
+    'PDF_RATE_PER_MINUTE': '1000000',
+    'PDF_RATE_BURST': '1000000',
+    'PDF_MAX_QUEUE': '1000',
+    'ADMISSION_QUEUE_TIMEOUT': '120',
+    'AI_RATE_PER_MINUTE': '1000000',
+    'AI_RATE_BURST': '1000000',
+    'AI_MAX_QUEUE': '1000',
+}
+
+
+def percentile(values, pct):
+    """Linearly interpolated percentile of a sorted list"""
+    if not values:
+        return 0.0
+    rank = (len(values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def memory_usage():
+    """Current and peak resident set size of this process in MB"""
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_kb //= 1024
+    try:
+        with open('/proc/self/statm') as f:
+            rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except OSError:
+        rss = peak_kb / 1024
+    return round(rss, 1), round(peak_kb / 1024, 1)
+
+
+def summarize(latencies, elapsed):
+    """Latency percentiles (ms) and throughput of one run"""
+    latencies = sorted(latencies)
+    rss, peak_rss = memory_usage()
+    return {
+        'count': len(latencies),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'rss_mb': rss,
+        'peak_rss_mb': peak_rss,
+    }
+
+
+class Harness:
+    """The real app served over HTTP on a local port, wired to the fake services"""
+
+    def __init__(self, openai_latency, token_delay, aws_latency, seed_resumes):
+        for name, value in BENCHMARK_ENV.items():
+            os.environ.setdefault(name, value)
+        self.openai = FakeOpenAIServer(openai_latency, token_delay).start()
+        os.environ.setdefault('OPENAI_BASE_URL', self.openai.url)
+
+        # Imported late so the settings above are in place when the app module loads
+        import openai
+        from werkzeug.serving import make_server, WSGIRequestHandler
+        import app as app_module
+
+        openai.base_url = self.openai.url
+        app_module.s3_client = FakeS3(aws_latency)
+        app_module.dynamodb = FakeDynamoDB(aws_latency, {app_module.RESUME_INDEX_TABLE_NAME: ('userId', 'filename')})
+        app_module.cognito_client = FakeCognito(aws_latency)
+        app_module.app.config['SESSION_COOKIE_SECURE'] = False
+        self.app_module = app_module
+        self.seed_resumes = seed_resumes
+        self._users = 0
+        # Labels embed a per-process nonce so a persistent PDF cache cannot answer them either
+        self._nonce = uuid.uuid4().hex[:8]
+        self._requests = itertools.count()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, app_module.app, threaded=True, request_handler=QuietHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name='benchmark-app', daemon=True)
+        self._thread.start()
+
+    def request_labels(self, count):
+        """count request labels, distinct from every label handed out before"""
+        with self._lock:
+            return [f"{self._nonce}-{n}" for n in itertools.islice(self._requests, count)]
+
+    def session(self):
+        """A logged-in HTTP session for the calling thread, one benchmark user per thread"""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            import requests
+            with self._lock:
+                self._users += 1
+                email = f"bench-{self._users}@example.com"
+            for label in self.request_labels(self.seed_resumes):
+                self.app_module.save_resume_to_s3(email, resume_variant(label))
+            http = requests.Session()
+            response = http.post(f"{self.url}/custom-login", json={'email': email, 'password': BENCH_PASSWORD})
+            response.raise_for_status()
+            self._local.http = http
+        return http
+
+    def close(self):
+        self.server.shutdown()
+        self.openai.stop()
+        self.app_module.pdf_pool.shutdown()
+
+
+def run_load(harness, scenario, concurrency, requests_count, warmup):
+    """Send requests_count requests of a scenario from concurrency threads and summarize them"""
+    send = SCENARIOS[scenario]
+    statuses = Counter()
+    errors = Counter()
+    latencies = []
+    lock = threading.Lock()
+
+    def one(i):
+        http = harness.session()
+        started = time.perf_counter()
+        try:
+            response = send(http, harness.url, i)
+        except Exception as e:
+            with lock:
+                errors[type(e).__name__] += 1
+            return
+        latency = time.perf_counter() - started
+        with lock:
+            statuses[response.status_code] += 1
+            if response.ok:
+                latencies.append(latency)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Log every worker in and warm caches and browsers outside the measured window
+        list(executor.map(lambda i: harness.session(), range(concurrency)))
+        list(executor.map(lambda i: send(harness.session(), harness.url, i), harness.request_labels(warmup)))
+        labels = harness.request_labels(requests_count)
+        started = time.perf_counter()
+        list(executor.map(one, labels))
+        elapsed = time.perf_counter() - started
+
+    return {
+        'kind': 'load',
+        'name': scenario,
+        'concurrency': concurrency,
+        'requests': requests_count,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'errors': dict(errors),
+        **summarize(latencies, elapsed),
+    }
+
+
+def micro_benchmarks(app_module):
+    """In-process hot paths, timed without HTTP in the way"""
+    from json_patch import make_patch, apply_patch
+    from resume_scoring import ResumeIndex, KeywordMatcher, score_resume
+
+    keywords = app_module.keyword_extractor.extract(JOB_DESCRIPTION)
+    edited = resume_variant(1)
+
+    def render_cold():
+        app_module.preview_fragment_cache.clear()
+        app_module.render_resume_html(RESUME)
+
+    return {
+        'render-resume-html-cold': render_cold,
+        'render-resume-html-warm': lambda: app_module.render_resume_html(RESUME),
+        'keyword-extract-local': lambda: app_module.keyword_extractor.extract(JOB_DESCRIPTION),
+        'score-resume': lambda: score_resume(ResumeIndex(RESUME), KeywordMatcher(keywords, app_module.keyword_synonyms)),
+        'resume-patch-roundtrip': lambda: apply_patch(RESUME, make_patch(RESUME, edited)),
+    }
+
+
+def run_micro(name, fn, iterations):
+    fn()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    return {'kind': 'micro', 'name': name, 'concurrency': 1, 'requests': iterations, **summarize(latencies, elapsed)}
+
+
+# Metrics compared against a baseline, and whether a higher value is worse
+COMPARED_METRICS = {'p50_ms': True, 'p95_ms': True, 'p99_ms': True, 'throughput_rps': False, 'peak_rss_mb': True}
+
+
+def compare(baseline, results, threshold):
+    """Differences from a baseline run; a change worse than threshold (a fraction) is a regression"""
+    previous = {(r['kind'], r['name'], r['concurrency']): r for r in baseline['results']}
+    changes = []
+    for result in results:
+        before = previous.get((result['kind'], result['name'], result['concurrency']))
+        if before is None:
+            continue
+        for metric, higher_is_worse in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > threshold if higher_is_worse else change < -threshold
+            changes.append({
+                'kind': result['kind'], 'name': result['name'], 'concurrency': result['concurrency'],
+                'metric': metric, 'baseline': old, 'current': new,
+                'change': round(change, 4), 'regression': worse,
+            })
+    return changes
+
+
+def print_results(results):
+    print(f"{'benchmark':<32}{'conc':>5}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'rps':>10}{'rss MB':>9}  statuses")
+    for r in results:
+        statuses = ' '.join(f"{status}:{count}" for status, count in r.get('statuses', {}).items())
+        if r.get('errors'):
+            statuses += ' ' + ' '.join(f"{name}:{count}" for name, count in r['errors'].items())
+        print(f"{r['kind'] + ' ' + r['name']:<32}{r['concurrency']:>5}{r['count']:>7}{r['p50_ms']:>10.2f}"
+              f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['throughput_rps']:>10.1f}{r['rss_mb']:>9.1f}  {statuses}")
+
+
+def report_startup(harness):
+    return sorted(harness.app_module.startup_timings.items(), key=lambda item: item[1])
+
+
+def print_changes(changes):
+    for c in changes:
+        flag = 'REGRESSION' if c['regression'] else ''
+        print(f"{c['kind'] + ' ' + c['name']:<32}{c['concurrency']:>5}  {c['metric']:<15}"
+              f"{c['baseline']:>10}{c['current']:>10}{c['change'] * 100:>+8.1f}%  {flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the resume builder against local stand-ins')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"Comma-separated endpoint scenarios (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=100, help='Measured requests per scenario and level')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests before each run')
+    parser.add_argument('--micro-iterations', type=int, default=200, help='Iterations per micro-benchmark (0 skips them)')
+    parser.add_argument('--openai-latency', type=float, default=0.5, help='Seconds before the fake OpenAI server answers')
+    parser.add_argument('--token-delay', type=float, default=0.01, help='Seconds between streamed fake OpenAI chunks')
+    parser.add_argument('--aws-latency', type=float, default=0.005, help='Seconds each fake S3/DynamoDB/Cognito call takes')
+    parser.add_argument('--seed-resumes', type=int, default=10, help='Saved resumes per benchmark user')
+    parser.add_argument('--save', metavar='PATH', help='Write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='Compare against a saved JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative change counted as a regression (default 0.1 = 10%%)')
+    args = parser.parse_args(argv)
+    args.scenarios = [name for name in args.scenarios.split(',') if name]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    args.concurrency = [int(level) for level in args.concurrency.split(',')]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    harness = Harness(args.openai_latency, args.token_delay, args.aws_latency, args.seed_resumes)
+    results = []
+    try:
+        if args.micro_iterations:
+            with harness.app_module.app.app_context():
+                for name, fn in micro_benchmarks(harness.app_module).items():
+                    results.append(run_micro(name, fn, args.micro_iterations))
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                results.append(run_load(harness, scenario, concurrency, args.requests, args.warmup))
+                print_results(results[-1:])
+    finally:
+        harness.close()
+
+    print()
+    print_results(results)
+    print('\nstartup (s): ' + ', '.join(f"{name} {seconds}" for name, seconds in report_startup(harness)))
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'requests': args.requests, 'warmup': args.warmup, 'micro_iterations': args.micro_iterations,
+            'openai_latency': args.openai_latency, 'token_delay': args.token_delay,
+            'aws_latency': args.aws_latency, 'seed_resumes': args.seed_resumes,
+        },
+        'startup': dict(report_startup(harness)),
+        'results': results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        changes = compare(baseline, results, args.threshold)
+        print(f"\nCompared with {args.compare}:")
+        print_changes(changes)
+        if any(change['regression'] for change in changes):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,391 @@
+import hashlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache bounded by the total size of its values.
+
+    With a ttl (seconds), entries also expire that long after they were set.
+    """
+
+    def __init__(self, max_bytes, sizeof=len, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            value, size, expires_at = self._items[key]
+            if expires_at is not None and expires_at <= time.time():
+                del self._items[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        size = self._sizeof(value)
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._items.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class DiskCache:
+    """Byte-valued cache stored as files in a local directory.
+
+    Least recently used files (by mtime) are removed once the directory grows
+    past max_bytes, so several processes on one host can share the tier.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = sum(size for _, size, _ in self._scan())
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith('.'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get_path(self, key):
+        """Return the path of a cached entry, or None on a miss"""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def get(self, key):
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._bytes += len(value)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        # Rescan so files written by other processes count toward the budget
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._bytes = total
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class SQLiteCache:
+    """Byte-valued cache persisted in a SQLite file so entries survive restarts.
+
+    Entries expire after ttl seconds; past max_entries the least recently read
+    entries are evicted.
+    """
+
+    def __init__(self, path, max_entries=10000, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)')
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+            self.hits += 1
+            return bytes(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, value, expires_at, now)
+            )
+            excess = self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0] - self.max_entries
+            if excess > 0:
+                cursor = self._conn.execute(
+                    'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)',
+                    (excess,)
+                )
+                self.evictions += cursor.rowcount
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': entries,
+                'max_entries': self.max_entries,
+            }
+
+
+class _Abandoned(Exception):
+    """Set on a streamed call whose leader stopped early, so waiting callers start over"""
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into a single call.
+
+    Callers that arrive while a call for their key is running wait for it and
+    share its result (or exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def _join(self, key):
+        """Return (leader, future): leaders run the call, everyone else waits on its future"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = Future()
+                return True, call
+            self.shared += 1
+            return False, call
+
+    def _finish(self, key):
+        with self._lock:
+            del self._calls[key]
+
+    def do(self, key, fn):
+        leader, call = self._join(key)
+        if not leader:
+            try:
+                return call.result()
+            except _Abandoned:
+                return self.do(key, fn)
+        try:
+            result = fn()
+        except Exception as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+
+    def stream(self, key, fn):
+        """Like do for a generator function, yielding its items.
+
+        The leader's caller gets each item as soon as fn yields it; callers
+        arriving meanwhile (through stream or do) get the complete list once
+        it ends. If the leader's caller stops iterating early, they start over.
+        """
+        leader, call = self._join(key)
+        if not leader:
+            try:
+                items = call.result()
+            except _Abandoned:
+                items = self.stream(key, fn)
+            yield from items
+            return
+        items = []
+        source = fn()
+        try:
+            for item in source:
+                items.append(item)
+                yield item
+        except GeneratorExit:
+            call.set_exception(_Abandoned())
+            raise
+        except Exception as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(items)
+        finally:
+            source.close()
+            self._finish(key)
+
+
+class TieredCache:
+    """In-memory LRU in front of an optional persistent (disk or SQLite) tier."""
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def open(self, key):
+        """Return a readable file object for a cached entry, or None on a miss.
+
+        Disk hits are returned as open files so callers can stream them
+        without loading the whole entry into memory.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            return io.BytesIO(value)
+        if self.disk is not None:
+            path = self.disk.get_path(key)
+            if path is not None:
+                try:
+                    return open(path, 'rb')
+                except FileNotFoundError:
+                    return None
+        return None
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self):
+        stats = {'memory': self.memory.stats()}
+        if self.disk is not None:
+            stats['disk'] = self.disk.stats()
+        tiers = list(stats.values())
+        stats['hits'] = sum(tier['hits'] for tier in tiers)
+        stats['misses'] = stats['disk']['misses'] if self.disk is not None else stats['memory']['misses']
+        stats['evictions'] = sum(tier['evictions'] for tier in tiers)
+        return stats
@@ -0,0 +1,97 @@
+import threading
+
+
+class LazyClient:
+    """Stand-in for a service client that is only built the first time it is used.
+
+    Attribute access is forwarded to the client returned by factory, which is
+    called once (even when several threads race to use it) and then cached, so
+    importing the app does not pay for heavy imports or client construction.
+    """
+
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def created(self):
+        return self._client is not None
+
+    def get(self):
+        """Return the client, building it on first use"""
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+                client = self._client
+        return client
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
+
+    def __repr__(self):
+        state = 'created' if self.created else 'not created'
+        return f"<LazyClient {self._name} ({state})>"
+
+
+def create_http_session(pool_size):
+    """requests.Session keeping up to pool_size connections alive per host, so TLS sessions are reused"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def create_httpx_client(pool_size, timeout):
+    """httpx.Client with a keep-alive pool of pool_size connections and default timeouts"""
+    import httpx
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    return httpx.Client(limits=limits, timeout=timeout)
+
+
+def urllib3_pool_stats(manager):
+    """Connections opened, requests sent and idle connections of a urllib3 PoolManager.
+
+    requests and botocore both pool connections with urllib3; requests well
+    above connections_opened means connections (and TLS sessions) are reused.
+    """
+    stats = {'hosts': 0, 'connections_opened': 0, 'requests': 0, 'idle_connections': 0}
+    for key in manager.pools.keys():
+        pool = manager.pools.get(key)
+        if pool is None:
+            continue
+        stats['hosts'] += 1
+        stats['connections_opened'] += pool.num_connections
+        stats['requests'] += pool.num_requests
+        # The idle queue is pre-filled with None placeholders for connections not opened yet
+        idle = list(pool.pool.queue) if pool.pool is not None else []
+        stats['idle_connections'] += sum(1 for connection in idle if connection is not None)
+    return stats
+
+
+def http_session_pool_stats(session):
+    return urllib3_pool_stats(session.get_adapter('https://').poolmanager)
+
+
+def aws_pool_stats(client):
+    """Connection pool counters of a boto3 client or resource"""
+    client = getattr(getattr(client, 'meta', None), 'client', client)
+    http_session = client._endpoint.http_session
+    stats = urllib3_pool_stats(http_session._manager)
+    stats['max_pool_connections'] = client.meta.config.max_pool_connections
+    return stats
+
+
+def httpx_pool_stats(client):
+    """Open and idle connections of an httpx.Client's pool"""
+    connections = client._transport._pool.connections
+    return {
+        'connections': len(connections),
+        'idle_connections': sum(1 for connection in connections if connection.is_idle()),
+    }
@@ -0,0 +1,167 @@
+import queue
+import secrets
+import threading
+import time
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted to a queue that is already at capacity."""
+
+
+class Job:
+    def __init__(self, fn, args, owner=None, meta=None):
+        self.id = secrets.token_urlsafe(16)
+        self.owner = owner
+        self.meta = meta or {}
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._fn = fn
+        self._args = args
+        self._done = threading.Event()
+
+    @property
+    def wait_time(self):
+        if self.started_at is None:
+            return time.time() - self.submitted_at
+        return self.started_at - self.submitted_at
+
+    @property
+    def service_time(self):
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'wait_time': round(self.wait_time, 3),
+            'service_time': round(self.service_time, 3) if self.service_time is not None else None,
+        }
+
+
+class JobQueue:
+    """Bounded in-process job queue drained by a pool of worker threads.
+
+    Finished jobs are kept for result_ttl seconds so clients can poll for
+    their status and download the result.
+    """
+
+    def __init__(self, workers=2, max_queue=32, result_ttl=600, name='job'):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'running': 0,
+            'total_wait_time': 0.0,
+            'total_service_time': 0.0,
+        }
+
+    def start(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} queue has been shut down")
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run_worker,
+                    name=f"{self.name}-worker-{len(self._threads)}",
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, fn, *args, owner=None, meta=None):
+        """Enqueue fn(*args) and return its Job without waiting for it to run"""
+        self.start()
+        self._prune()
+        job = Job(fn, args, owner=owner, meta=meta)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+                self._stats['rejected'] += 1
+            raise QueueFull(f"{self.name} queue is full ({self.max_queue} jobs waiting)")
+        with self._lock:
+            self._stats['submitted'] += 1
+        return job
+
+    def get(self, job_id):
+        self._prune()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        finished = stats['completed'] + stats['failed']
+        stats['depth'] = self._queue.qsize()
+        stats['max_queue'] = self.max_queue
+        stats['workers'] = self.workers
+        stats['avg_wait_time'] = stats['total_wait_time'] / finished if finished else 0.0
+        stats['avg_service_time'] = stats['total_service_time'] / finished if finished else 0.0
+        return stats
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def _run_worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            job.started_at = time.time()
+            job.status = 'running'
+            with self._lock:
+                self._stats['running'] += 1
+            try:
+                job.result = job._fn(*job._args)
+                job.status = 'done'
+            except Exception as e:
+                print(f"{self.name} job {job.id} failed: {e}")
+                job.error = str(e)
+                job.status = 'failed'
+            job.finished_at = time.time()
+            with self._lock:
+                self._stats['running'] -= 1
+                self._stats['completed' if job.status == 'done' else 'failed'] += 1
+                self._stats['total_wait_time'] += job.wait_time
+                self._stats['total_service_time'] += job.service_time
+            job._done.set()
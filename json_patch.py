@@ -0,0 +1,69 @@
+import copy
+
+
+def _escape(token):
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def make_patch(src, dst, path=''):
+    """Return RFC 6902 operations that turn src into dst.
+
+    Objects and equal-length lists are diffed member by member; a list that
+    changes length is replaced as a whole, which keeps patches small for the
+    typical "edit one field" save without needing a sequence diff.
+    """
+    if src == dst:
+        return []
+    if isinstance(src, dict) and isinstance(dst, dict):
+        ops = []
+        for key in src:
+            if key not in dst:
+                ops.append({'op': 'remove', 'path': f"{path}/{_escape(key)}"})
+        for key, value in dst.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in src:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+            else:
+                ops.extend(make_patch(src[key], value, child))
+        return ops
+    if isinstance(src, list) and isinstance(dst, list) and len(src) == len(dst):
+        ops = []
+        for i, (old, new) in enumerate(zip(src, dst)):
+            ops.extend(make_patch(old, new, f"{path}/{i}"))
+        return ops
+    return [{'op': 'replace', 'path': path, 'value': dst}]
+
+
+def apply_patch(doc, ops):
+    """Apply add/remove/replace operations to a copy of doc"""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        if op['path'] == '':
+            doc = copy.deepcopy(op.get('value'))
+            continue
+        *parents, last = [_unescape(token) for token in op['path'].split('/')[1:]]
+        target = doc
+        for token in parents:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        if isinstance(target, list):
+            index = len(target) if last == '-' else int(last)
+            if op['op'] == 'add':
+                target.insert(index, copy.deepcopy(op['value']))
+            elif op['op'] == 'remove':
+                del target[index]
+            elif op['op'] == 'replace':
+                target[index] = copy.deepcopy(op['value'])
+            else:
+                raise ValueError(f"Unsupported patch operation: {op['op']}")
+        else:
+            if op['op'] in ('add', 'replace'):
+                target[last] = copy.deepcopy(op['value'])
+            elif op['op'] == 'remove':
+                del target[last]
+            else:
+                raise ValueError(f"Unsupported patch operation: {op['op']}")
+    return doc
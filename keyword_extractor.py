@@ -0,0 +1,380 @@
+import json
+import math
+import re
+from collections import deque
+
+
+# Built-in skills lexicon: category -> {canonical keyword: [synonyms]}. Matching
+# is case-insensitive and whole-word, so synonyms only need to cover spellings
+# that differ by more than case.
+LEXICON = {
+    'languages': {
+        'Python': [],
+        'Java': [],
+        'JavaScript': ['js', 'ecmascript'],
+        'TypeScript': ['ts'],
+        'Go': ['golang'],
+        'Rust': [],
+        'C++': ['cpp'],
+        'C#': ['csharp', 'c sharp'],
+        'Ruby': [],
+        'PHP': [],
+        'Kotlin': [],
+        'Swift': [],
+        'Scala': [],
+        'R': [],
+        'MATLAB': [],
+        'Perl': [],
+        'Bash': ['shell scripting', 'shell scripts'],
+        'SQL': [],
+        'HTML': ['html5'],
+        'CSS': ['css3'],
+        'Dart': [],
+        'Elixir': [],
+        'Haskell': [],
+        'Objective-C': ['objective c'],
+        'Solidity': [],
+    },
+    'frameworks': {
+        'React': ['react.js', 'reactjs'],
+        'Angular': ['angularjs', 'angular.js'],
+        'Vue.js': ['vue', 'vuejs'],
+        'Next.js': ['nextjs'],
+        'Node.js': ['Node', 'nodejs'],
+        'Express': ['express.js', 'expressjs'],
+        'Django': [],
+        'Flask': [],
+        'FastAPI': [],
+        'Spring Boot': ['Spring'],
+        'Ruby on Rails': ['rails', 'ror'],
+        'Laravel': [],
+        '.NET': ['dotnet', 'asp.net', '.net core'],
+        'Flutter': [],
+        'React Native': [],
+        'Redux': [],
+        'GraphQL': [],
+        'REST APIs': ['REST', 'restful', 'rest api', 'restful apis', 'restful api'],
+        'gRPC': [],
+        'Tailwind CSS': ['tailwind'],
+        'Bootstrap': [],
+        'jQuery': [],
+        'Pandas': [],
+        'NumPy': [],
+        'scikit-learn': ['sklearn', 'scikit learn'],
+        'TensorFlow': [],
+        'PyTorch': [],
+        'Keras': [],
+        'Spark': ['apache spark', 'pyspark'],
+        'Hadoop': [],
+        'Airflow': ['apache airflow'],
+        'Kafka': ['apache kafka'],
+        'Celery': [],
+        'Playwright': [],
+        'Selenium': [],
+        'Cypress': [],
+        'Jest': [],
+        'pytest': [],
+        'JUnit': [],
+    },
+    'cloud': {
+        'AWS': ['amazon web services'],
+        'Azure': ['microsoft azure'],
+        'GCP': ['google cloud', 'google cloud platform'],
+        'Lambda': ['aws lambda'],
+        'S3': ['amazon s3', 'aws s3'],
+        'EC2': ['amazon ec2', 'aws ec2'],
+        'DynamoDB': ['amazon dynamodb'],
+        'CloudFormation': ['aws cloudformation'],
+        'Docker': ['containers', 'containerization'],
+        'Kubernetes': ['k8s'],
+        'Terraform': [],
+        'Ansible': [],
+        'Helm': [],
+        'Serverless': [],
+        'Microservices': ['microservice', 'microservices architecture'],
+        'Linux': ['unix'],
+        'Nginx': [],
+        'Heroku': [],
+        'Vercel': [],
+        'Cloudflare': [],
+    },
+    'data': {
+        'PostgreSQL': ['postgres'],
+        'MySQL': [],
+        'MongoDB': ['mongo'],
+        'Redis': [],
+        'Elasticsearch': ['elastic search', 'opensearch'],
+        'SQLite': [],
+        'Oracle': ['oracle database'],
+        'SQL Server': ['mssql', 'microsoft sql server'],
+        'Snowflake': [],
+        'BigQuery': [],
+        'Redshift': ['amazon redshift'],
+        'Cassandra': [],
+        'NoSQL': [],
+        'ETL': ['elt', 'data pipelines', 'data pipeline'],
+        'Data Warehousing': ['data warehouse'],
+        'Data Modeling': ['data modelling'],
+        'Tableau': [],
+        'Power BI': ['powerbi'],
+        'Looker': [],
+        'Excel': ['microsoft excel'],
+        'dbt': [],
+    },
+    'ml': {
+        'Machine Learning': ['ml'],
+        'Deep Learning': [],
+        'Artificial Intelligence': ['ai'],
+        'Natural Language Processing': ['nlp'],
+        'Computer Vision': [],
+        'Large Language Models': ['llm', 'llms', 'large language model'],
+        'Generative AI': ['genai', 'gen ai'],
+        'Data Science': [],
+        'Data Analysis': ['data analytics', 'analytics'],
+        'Statistics': ['statistical analysis'],
+        'A/B Testing': ['ab testing', 'a/b tests', 'experimentation'],
+        'MLOps': [],
+        'Prompt Engineering': [],
+        'OpenAI API': ['openai'],
+        'LangChain': [],
+    },
+    'practices': {
+        'CI/CD': ['ci cd', 'continuous integration', 'continuous delivery', 'continuous deployment'],
+        'DevOps': [],
+        'Agile': ['scrum', 'kanban'],
+        'Test-Driven Development': ['tdd', 'test driven development'],
+        'Unit Testing': ['unit tests'],
+        'Automated Testing': ['test automation'],
+        'Code Review': ['code reviews'],
+        'System Design': [],
+        'Distributed Systems': [],
+        'Object-Oriented Programming': ['oop', 'object oriented programming'],
+        'Design Patterns': [],
+        'API Design': [],
+        'Performance Optimization': ['performance tuning'],
+        'Scalability': [],
+        'Security': ['cybersecurity', 'application security'],
+        'Authentication': ['oauth', 'oauth2', 'sso', 'single sign-on'],
+        'Monitoring': ['observability'],
+        'Git': ['github', 'gitlab', 'version control'],
+        'Jira': [],
+        'Full Stack': ['full-stack', 'fullstack'],
+        'Frontend': ['front-end', 'front end'],
+        'Backend': ['back-end', 'back end'],
+        'Mobile Development': ['ios', 'android'],
+        'UI/UX': ['ui', 'ux', 'user experience', 'user interface'],
+        'Figma': [],
+        'SEO': [],
+        'Product Management': [],
+        'Project Management': [],
+        'Technical Writing': ['documentation'],
+    },
+    'soft_skills': {
+        'Communication': ['communication skills'],
+        'Leadership': [],
+        'Teamwork': ['collaboration', 'collaborative', 'cross-functional'],
+        'Problem Solving': ['problem-solving'],
+        'Mentoring': ['mentorship'],
+        'Stakeholder Management': ['stakeholders'],
+        'Time Management': [],
+        'Attention to Detail': ['detail-oriented', 'detail oriented'],
+    },
+}
+
+# Terms that are also everyday words ("go", "rest", "swift") and only count
+# when written with exactly this capitalisation
+CASE_SENSITIVE_TERMS = {
+    'Go', 'R', 'Rust', 'Swift', 'Dart', 'Spring', 'Express', 'Node', 'REST', 'Lambda', 'Helm',
+    'Oracle', 'Excel', 'Looker', 'Spark', 'Jest',
+}
+
+# How informative a match from each category is. Soft skills appear in nearly
+# every posting, so they play the part of high document frequency terms in
+# TF-IDF and are ranked below specific tools.
+CATEGORY_IDF = {
+    'languages': 1.2,
+    'frameworks': 1.2,
+    'cloud': 1.1,
+    'data': 1.1,
+    'ml': 1.0,
+    'practices': 0.8,
+    'soft_skills': 0.4,
+    'custom': 1.0,
+}
+
+# Weight of capitalised terms that are not in the lexicon, e.g. "HIPAA" or "SOC"
+CANDIDATE_IDF = 0.5
+
+CANDIDATE_PATTERN = re.compile(r"(?<![\w.])(?:[A-Z][A-Z0-9&+#]{1,9}|[A-Z][a-z]+[A-Z][A-Za-z]*)(?![\w])")
+
+# Capitalised words that are common in job postings but are not skills
+CANDIDATE_STOPWORDS = {
+    'US', 'USA', 'UK', 'EU', 'EEO', 'EOE', 'OR', 'AND', 'THE', 'FOR', 'WITH', 'TO', 'OF', 'IN',
+    'WE', 'YOU', 'OUR', 'IT', 'IS', 'BS', 'BA', 'MS', 'MBA', 'PHD', 'PTO', 'HR', 'CEO', 'CTO',
+    'ASAP', 'FAQ', 'LLC', 'INC', 'NYC', 'SF', 'LA', 'ET', 'PT', 'PST', 'EST', 'ID', 'OK',
+}
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton that finds every occurrence of many patterns in one pass."""
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern, value in patterns:
+            self._add(pattern, value)
+        self._build()
+
+    def _add(self, pattern, value):
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._out[state].append((len(pattern), value))
+
+    def _build(self):
+        # Depth-one states fail back to the root, which they already do
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def finditer(self, text):
+        """Yield (start, end, value) for every pattern occurrence in text"""
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._out[state]:
+                yield i + 1 - length, i + 1, value
+
+
+def load_lexicon(path=None):
+    """Return the built-in lexicon, extended by a JSON file of {keyword: [synonyms]} if given"""
+    lexicon = {category: dict(terms) for category, terms in LEXICON.items()}
+    if path:
+        with open(path, encoding='utf-8') as f:
+            lexicon.setdefault('custom', {}).update(json.load(f))
+    return lexicon
+
+
+def synonym_groups(lexicon):
+    """Map each lexicon term (casefolded) to the other spellings of the same keyword.
+
+    Case-sensitive terms are left out since callers match without case.
+    """
+    groups = {}
+    for terms in lexicon.values():
+        for keyword, synonyms in terms.items():
+            group = [term for term in [keyword, *synonyms] if term not in CASE_SENSITIVE_TERMS]
+            for term in group:
+                groups[term.casefold()] = [other for other in group if other != term]
+    return groups
+
+
+def _lower(text):
+    # str.lower() can lengthen some characters, which would shift match offsets
+    return ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+class KeywordExtractor:
+    """Offline keyword extraction from a skills lexicon.
+
+    Lexicon terms and their synonyms are found with a single Aho-Corasick pass
+    and ranked by a TF-IDF-style score: how often a keyword is mentioned,
+    weighted by how specific its category is, with small boosts for multi-word
+    phrases and early mentions. Capitalised terms that are not in the lexicon
+    (acronyms, CamelCase product names) are kept as lower-weighted candidates.
+    """
+
+    def __init__(self, lexicon=None):
+        lexicon = lexicon if lexicon is not None else LEXICON
+        self._idf = {}
+        self._known = set()
+        patterns = []
+        for category, terms in lexicon.items():
+            for keyword, synonyms in terms.items():
+                self._idf[keyword] = CATEGORY_IDF.get(category, 1.0)
+                for term in [keyword, *synonyms]:
+                    exact = term if term in CASE_SENSITIVE_TERMS else None
+                    term = ' '.join(_lower(term).split())
+                    self._known.add(term)
+                    patterns.append((term, (keyword, exact)))
+        self._automaton = AhoCorasick(patterns)
+
+    def _matches(self, text):
+        """Longest non-overlapping whole-word lexicon matches in normalized text"""
+        lowered = _lower(text)
+        found = []
+        for start, end, (keyword, exact) in self._automaton.finditer(lowered):
+            if exact is not None and text[start:end] != exact:
+                continue
+            before = lowered[start - 1] if start > 0 else ' '
+            after = lowered[end] if end < len(lowered) else ' '
+            if before.isalnum() or after.isalnum():
+                continue
+            # Don't start a match inside a dotted name such as "node.js" -> "js"
+            if before == '.' and start > 1 and lowered[start - 2].isalnum():
+                continue
+            found.append((start, end, keyword))
+        found.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches = []
+        covered_until = 0
+        for start, end, keyword in found:
+            if start >= covered_until:
+                matches.append((start, end, keyword))
+                covered_until = end
+        return matches
+
+    def scores(self, text):
+        """Return (keyword, score) pairs for text, best first"""
+        text = ' '.join(text.split())
+        if not text:
+            return []
+        counts = {}
+        first_seen = {}
+        phrase_words = {}
+
+        def count(keyword, start, words):
+            counts[keyword] = counts.get(keyword, 0) + 1
+            first_seen.setdefault(keyword, start)
+            phrase_words[keyword] = max(phrase_words.get(keyword, 1), words)
+
+        spans = []
+        for start, end, keyword in self._matches(text):
+            count(keyword, start, len(text[start:end].split()))
+            spans.append((start, end))
+
+        for match in CANDIDATE_PATTERN.finditer(text):
+            candidate = match.group()
+            if candidate.upper() in CANDIDATE_STOPWORDS or _lower(candidate) in self._known:
+                continue
+            if any(start < match.end() and match.start() < end for start, end in spans):
+                continue
+            count(candidate, match.start(), 1)
+
+        ranked = []
+        for keyword, tf in counts.items():
+            idf = self._idf.get(keyword, CANDIDATE_IDF)
+            score = (1 + math.log(tf)) * idf
+            score *= 1 + 0.1 * (phrase_words[keyword] - 1)
+            score *= 1 + 0.1 * (1 - first_seen[keyword] / len(text))
+            ranked.append((keyword, round(score, 4)))
+        ranked.sort(key=lambda item: (-item[1], first_seen[item[0]]))
+        return ranked
+
+    def extract(self, text, limit=None):
+        """Return the keywords found in text, best first"""
+        return [keyword for keyword, _ in self.scores(text)[:limit]]
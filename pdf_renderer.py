@@ -0,0 +1,270 @@
+import base64
+import contextvars
+import os
+import queue
+import threading
+from contextlib import nullcontext
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+FONT_WEIGHTS = {
+    'thin': 100, 'extralight': 200, 'light': 300, 'regular': 400, 'medium': 500,
+    'semibold': 600, 'bold': 700, 'extrabold': 800, 'black': 900,
+}
+
+FONT_FORMATS = {
+    '.woff2': ('font/woff2', 'woff2'),
+    '.woff': ('font/woff', 'woff'),
+    '.ttf': ('font/ttf', 'truetype'),
+    '.otf': ('font/otf', 'opentype'),
+}
+
+
+def font_face_css(directory):
+    """@font-face rules embedding each font file in directory as a data URI.
+
+    Files are named Family-Style, e.g. Inter-Regular.woff2, Inter-SemiBoldItalic.ttf
+    or Inter-600.woff2. A missing directory gives an empty stylesheet.
+    """
+    if not directory or not os.path.isdir(directory):
+        return ''
+    rules = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in FONT_FORMATS or '-' not in stem:
+            continue
+        family, style = stem.rsplit('-', 1)
+        italic = style.lower().endswith('italic')
+        weight = style[:-len('italic')] if italic else style
+        weight = int(weight) if weight.isdigit() else FONT_WEIGHTS.get(weight.lower() or 'regular')
+        if weight is None:
+            continue
+        mimetype, font_format = FONT_FORMATS[ext.lower()]
+        with open(os.path.join(directory, name), 'rb') as f:
+            data = base64.b64encode(f.read()).decode('ascii')
+        rules.append(
+            f"@font-face {{ font-family: '{family}'; font-style: {'italic' if italic else 'normal'}; "
+            f"font-weight: {weight}; font-display: block; "
+            f"src: url(data:{mimetype};base64,{data}) format('{font_format}'); }}"
+        )
+    return '\n'.join(rules)
+
+
+class BrowserPool:
+    """Pool of long-lived headless Chromium instances for PDF rendering.
+
+    Playwright's sync API is bound to the thread that started it, so every
+    browser is owned by a dedicated worker thread. Requests hand their HTML to
+    the pool and wait for the worker to print it on a warm page.
+
+    Pages only touch the network where allowed: requests for URLs in assets
+    (a dict of url -> (body, content type)) are answered from memory, URLs
+    starting with one of network_prefixes are fetched as usual and every
+    other request is aborted, so a render only waits on the resources it needs.
+
+    With span (a callable taking a name and returning a context manager),
+    page.set_content and page.pdf are timed in the caller's context, so the
+    timings count toward the request that asked for the PDF.
+    """
+
+    def __init__(self, size=2, max_page_uses=50, render_timeout=30,
+                 health_check_interval=30, assets=None, network_prefixes=(), span=None):
+        self.size = size
+        self.assets = dict(assets or {})
+        self.network_prefixes = tuple(network_prefixes)
+        self._span = span or (lambda name: nullcontext())
+        self.max_page_uses = max_page_uses
+        self.render_timeout = render_timeout
+        self.health_check_interval = health_check_interval
+        self._jobs = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            'renders': 0,
+            'failures': 0,
+            'browser_launches': 0,
+            'browser_recycles': 0,
+            'page_recycles': 0,
+            'served_assets': 0,
+            'network_requests': 0,
+            'blocked_requests': 0,
+        }
+
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PDF browser pool has been shut down")
+            while len(self._workers) < self.size:
+                worker = threading.Thread(
+                    target=self._run_worker,
+                    name=f"pdf-browser-{len(self._workers)}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def render_pdf(self, html, pdf_options, timeout=None):
+        """Render HTML to PDF bytes on a pooled browser page"""
+        self.start()
+        future = Future()
+        self._jobs.put((html, pdf_options, future, contextvars.copy_context()))
+        try:
+            return future.result(timeout=timeout or self.render_timeout)
+        except FutureTimeoutError:
+            # A job still queued is dropped so no worker prints a PDF nobody is waiting for
+            future.cancel()
+            raise
+
+    def warm_up(self, timeout=None):
+        """Launch the browsers now by rendering a blank page per worker.
+
+        Browser launches take the longest, so while one worker launches the
+        next blank page is normally picked up by another idle worker.
+        """
+        self.start()
+        futures = []
+        for _ in range(self.size):
+            future = Future()
+            self._jobs.put(('<html></html>', {}, future, contextvars.copy_context()))
+            futures.append(future)
+        for future in futures:
+            future.result(timeout=timeout or self.render_timeout)
+
+    def shutdown(self, wait=True):
+        """Close every browser and stop the worker threads"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._jobs.put(None)
+        if wait:
+            for worker in workers:
+                worker.join(timeout=self.render_timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['size'] = self.size
+        stats['workers'] = len(self._workers)
+        stats['queued'] = self._jobs.qsize()
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _route_request(self, route):
+        url = route.request.url
+        asset = self.assets.get(url)
+        if asset is None and self.network_prefixes and url.startswith(self.network_prefixes):
+            self._count('network_requests')
+            route.continue_()
+            return
+        if asset is None:
+            self._count('blocked_requests')
+            route.abort()
+            return
+        body, content_type = asset
+        self._count('served_assets')
+        route.fulfill(status=200, body=body, content_type=content_type)
+
+    def _print_page(self, page, html, pdf_options):
+        with self._span('page.set_content'):
+            page.set_content(html, timeout=self.render_timeout * 1000)
+        with self._span('page.pdf'):
+            return page.pdf(**pdf_options)
+
+    # Overridable hooks so the pool can be exercised without a real browser
+    def _start_playwright(self):
+        from playwright.sync_api import sync_playwright
+        return sync_playwright().start()
+
+    def _launch_browser(self, playwright):
+        return playwright.chromium.launch()
+
+    def _run_worker(self):
+        playwright = None
+        browser = None
+        context = None
+        page = None
+        page_uses = 0
+
+        def close_page():
+            nonlocal context, page, page_uses
+            if context is not None:
+                try:
+                    context.close()
+                except Exception as e:
+                    print(f"Error closing browser context: {e}")
+            context, page, page_uses = None, None, 0
+
+        def close_browser():
+            nonlocal browser
+            close_page()
+            if browser is not None:
+                try:
+                    browser.close()
+                except Exception as e:
+                    print(f"Error closing browser: {e}")
+            browser = None
+
+        try:
+            while True:
+                try:
+                    job = self._jobs.get(timeout=self.health_check_interval)
+                except queue.Empty:
+                    # Idle health check: replace a crashed browser before the next request needs it
+                    if browser is not None and not browser.is_connected():
+                        self._count('browser_recycles')
+                        close_browser()
+                    continue
+
+                if job is None:
+                    break
+
+                html, pdf_options, future, caller_context = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    if playwright is None:
+                        playwright = self._start_playwright()
+                    if browser is not None and not browser.is_connected():
+                        self._count('browser_recycles')
+                        close_browser()
+                    if browser is None:
+                        browser = self._launch_browser(playwright)
+                        self._count('browser_launches')
+                    if page is None:
+                        context = browser.new_context()
+                        context.route('**/*', self._route_request)
+                        page = context.new_page()
+
+                    pdf_bytes = caller_context.run(self._print_page, page, html, pdf_options)
+                    page_uses += 1
+                    self._count('renders')
+                    future.set_result(pdf_bytes)
+                except Exception as e:
+                    self._count('failures')
+                    future.set_exception(e)
+                    # Never hand a page in an unknown state to the next request
+                    if browser is not None and not browser.is_connected():
+                        self._count('browser_recycles')
+                        close_browser()
+                    else:
+                        close_page()
+
+                if page is not None and page_uses >= self.max_page_uses:
+                    self._count('page_recycles')
+                    close_page()
+        finally:
+            close_browser()
+            if playwright is not None:
+                try:
+                    playwright.stop()
+                except Exception as e:
+                    print(f"Error stopping Playwright: {e}")
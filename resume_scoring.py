@@ -0,0 +1,94 @@
+import re
+from keyword_extractor import AhoCorasick
+
+
+# Resume fields that make up each section of the rendered resume
+RESUME_SECTIONS = {
+    'summary': ('summary',),
+    'skills': ('skills',),
+    'experience': ('job_title', 'company', 'job_description'),
+    'projects': ('project_title', 'project_role', 'project_description'),
+    'education': ('degree', 'program', 'institution'),
+}
+
+# Words with the punctuation that is part of skill names ("node.js", "c++", "ci/cd")
+TOKEN_PATTERN = re.compile(r"[\w+#]+(?:[./-][\w+#]+)*")
+
+
+def normalize(text):
+    """Casefold text into space-separated tokens, with a space at each end"""
+    return ' ' + ' '.join(TOKEN_PATTERN.findall(text.casefold())) + ' '
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+class ResumeIndex:
+    """Normalized text of each resume section, built once and matched against any keyword set."""
+
+    def __init__(self, resume_data):
+        self.sections = {}
+        for section, fields in RESUME_SECTIONS.items():
+            text = ' '.join(text for field in fields for text in _strings(resume_data.get(field)))
+            self.sections[section] = normalize(text)
+
+    @property
+    def size(self):
+        return sum(len(text) for text in self.sections.values())
+
+
+class KeywordMatcher:
+    """Finds which of a set of keywords (or their synonyms) occur in normalized text.
+
+    Every keyword and synonym is compiled into one Aho-Corasick automaton with
+    surrounding spaces, so each pass over a section matches whole words only.
+    """
+
+    def __init__(self, keywords, synonyms=None):
+        synonyms = synonyms or {}
+        self.keywords = []
+        patterns = []
+        seen = set()
+        for keyword in keywords:
+            key = keyword.casefold()
+            if key in seen or not normalize(keyword).strip():
+                continue
+            seen.add(key)
+            i = len(self.keywords)
+            self.keywords.append(keyword)
+            for term in [keyword, *synonyms.get(key, [])]:
+                patterns.append((normalize(term), i))
+        self._automaton = AhoCorasick(patterns)
+
+    def find(self, text):
+        """Indexes of the keywords found in normalized text"""
+        return {i for _, _, i in self._automaton.finditer(text)}
+
+
+def _percent(found, total):
+    return round(100 * found / total) if total else 0
+
+
+def score_resume(index, matcher):
+    """Keyword coverage of a resume overall and per section"""
+    total = len(matcher.keywords)
+    found = set()
+    sections = {}
+    for section, text in index.sections.items():
+        section_found = matcher.find(text)
+        found |= section_found
+        sections[section] = {
+            'matched': [matcher.keywords[i] for i in sorted(section_found)],
+            'score': _percent(len(section_found), total),
+        }
+    return {
+        'score': _percent(len(found), total),
+        'matched': [matcher.keywords[i] for i in sorted(found)],
+        'missing': [keyword for i, keyword in enumerate(matcher.keywords) if i not in found],
+        'sections': sections,
+    }
@@ -0,0 +1,108 @@
+import threading
+import time
+import pytest
+from admission import ConcurrencyLimiter, RateLimiter, Rejected
+
+
+def test_concurrency_limiter_rejects_when_queue_is_full():
+    """Test that requests past the limit and queue are rejected with a 503."""
+    limiter = ConcurrencyLimiter('pdf', limit=1, max_queue=0)
+    release = limiter.acquire()
+    with pytest.raises(Rejected) as excinfo:
+        limiter.acquire()
+    assert excinfo.value.status == 503
+    assert excinfo.value.retry_after >= 1
+    release()
+    limiter.acquire()()
+    stats = limiter.stats()
+    assert stats['admitted'] == 2
+    assert stats['rejected'] == 1
+    assert stats['active'] == 0
+
+
+def test_concurrency_limiter_try_acquire_never_waits():
+    """Test that try_acquire takes a free slot but returns None at capacity without counting a rejection."""
+    limiter = ConcurrencyLimiter('ai', limit=1, max_queue=1, queue_timeout=5)
+    release = limiter.try_acquire()
+    assert release is not None
+    assert limiter.try_acquire() is None
+    release()
+    limiter.try_acquire()()
+    stats = limiter.stats()
+    assert stats['admitted'] == 2
+    assert stats['rejected'] == 0
+    assert stats['active'] == 0
+
+
+def test_concurrency_limiter_queued_request_gets_released_slot():
+    """Test that a queued request runs as soon as a slot is released."""
+    limiter = ConcurrencyLimiter('pdf', limit=1, max_queue=1, queue_timeout=5)
+    release = limiter.acquire()
+    admitted = threading.Event()
+
+    def waiter():
+        limiter.acquire()()
+        admitted.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    while limiter.stats()['waiting'] == 0:
+        time.sleep(0.001)
+    assert not admitted.is_set()
+    release()
+    thread.join(5)
+    assert admitted.is_set()
+    assert limiter.stats()['max_waiting'] == 1
+
+
+def test_concurrency_limiter_queue_wait_times_out():
+    """Test that a queued request gives up after queue_timeout."""
+    limiter = ConcurrencyLimiter('ai', limit=1, max_queue=1, queue_timeout=0.01)
+    limiter.acquire()
+    with pytest.raises(Rejected):
+        limiter.acquire()
+    stats = limiter.stats()
+    assert stats['timeouts'] == 1
+    assert stats['waiting'] == 0
+
+
+def test_release_is_idempotent():
+    """Test that releasing a slot twice frees it only once."""
+    limiter = ConcurrencyLimiter('pdf', limit=2)
+    release = limiter.acquire()
+    limiter.acquire()
+    release()
+    release()
+    assert limiter.stats()['active'] == 1
+
+
+def test_rate_limiter_limits_each_key_separately():
+    """Test that a key is limited after its burst while other keys are not."""
+    limiter = RateLimiter('ai', rate=1, burst=2)
+    limiter.acquire('a')
+    limiter.acquire('a')
+    with pytest.raises(Rejected) as excinfo:
+        limiter.acquire('a')
+    assert excinfo.value.status == 429
+    assert excinfo.value.retry_after == 1
+    limiter.acquire('b')
+    assert limiter.stats()['limited'] == 1
+
+
+def test_rate_limiter_refills_over_time():
+    """Test that tokens come back at the configured rate."""
+    limiter = RateLimiter('pdf', rate=100, burst=1)
+    limiter.acquire('a')
+    with pytest.raises(Rejected):
+        limiter.acquire('a')
+    time.sleep(0.02)
+    limiter.acquire('a')
+
+
+def test_rate_limiter_keeps_only_recent_keys():
+    """Test that the least recently seen buckets are dropped past max_keys."""
+    limiter = RateLimiter('pdf', rate=1, burst=1, max_keys=2)
+    for key in ['a', 'b', 'c']:
+        limiter.acquire(key)
+    assert limiter.stats()['keys'] == 2
+    limiter.acquire('a')
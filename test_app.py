@@ -1,5 +1,16 @@
+import gzip
+import io
+import json
+import re
+import threading
+import time
+import types
+import zipfile
 import pytest
+import app as app_module
+from admission import ConcurrencyLimiter, RateLimiter
 from app import app
+from benchmarks.fakes import FakeS3, FakeDynamoDB
 
 @pytest.fixture
 def client():
@@ -8,6 +19,47 @@ def client():
     with app.test_client() as client:
         yield client
 
+@pytest.fixture
+def auth_client(client):
+    """Create a test client with a logged-in session."""
+    with client.session_transaction() as sess:
+        sess['user_id'] = 'user@example.com'
+        sess['email'] = 'user@example.com'
+    yield client
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    """Replace the S3 client with an in-memory fake and start from an empty resume cache."""
+    s3 = FakeS3()
+    monkeypatch.setattr(app_module, 's3_client', s3)
+    monkeypatch.setattr(app_module, 'resume_cache', app_module.TieredCache(app_module.LRUCache(1024 * 1024)))
+    monkeypatch.setattr(app_module, 'coverage_index_cache', app_module.LRUCache(1024 * 1024, sizeof=lambda index: index.size))
+    return s3
+
+@pytest.fixture
+def fake_dynamodb(monkeypatch):
+    """Replace the DynamoDB resource with an in-memory fake."""
+    dynamodb = FakeDynamoDB(key_schema={app_module.RESUME_INDEX_TABLE_NAME: ('userId', 'filename')})
+    monkeypatch.setattr(app_module, 'dynamodb', dynamodb)
+    return dynamodb.Table(app_module.DYNAMODB_TABLE_NAME)
+
+@pytest.fixture(autouse=True)
+def admission_limits(monkeypatch):
+    """Give every test fresh, generous admission limits so rate buckets do not carry over."""
+    limits = {
+        group: (ConcurrencyLimiter(group, 100, 100), RateLimiter(group, 100, 1000))
+        for group in app_module.admission_limits
+    }
+    monkeypatch.setattr(app_module, 'admission_limits', limits)
+    return limits
+
+RESUME = {
+    'name': 'Test User',
+    'email': 'user@example.com',
+    'phone': '555-0100',
+    'summary': 'Engineer with experience building web applications.'
+}
+
 def test_index_route(client):
     """Test that the index route returns a 200 status code."""
     response = client.get('/')
@@ -64,4 +116,846 @@ def test_ai_rewrite_project_description_empty(client):
                           json={'bullet_points': []})
     assert response.status_code == 400
     data = response.get_json()
-    assert 'error' in data 
\ No newline at end of file
+    assert 'error' in data
+
+@pytest.fixture
+def pdf_renders(monkeypatch):
+    """Replace Chromium with a fake renderer and start from an empty PDF cache."""
+    rendered = []
+    def fake_render(html, options):
+        rendered.append(options)
+        return b'%PDF-1.4 test'
+    monkeypatch.setattr(app_module.pdf_pool, 'render_pdf', fake_render)
+    monkeypatch.setattr(app_module, 'pdf_cache', app_module.TieredCache(app_module.LRUCache(1024 * 1024)))
+    return rendered
+
+def test_generate_pdf_uses_browser_pool(auth_client, pdf_renders):
+    """Test that generate PDF renders through the shared browser pool."""
+    response = auth_client.post('/generate-pdf', json=RESUME)
+    assert response.status_code == 200
+    assert response.data == b'%PDF-1.4 test'
+    assert pdf_renders == [app_module.PDF_OPTIONS]
+
+def test_generate_pdf_serves_cached_pdf(auth_client, pdf_renders):
+    """Test that an unchanged resume is rendered once and revalidated by ETag."""
+    first = auth_client.post('/generate-pdf', json=RESUME)
+    second = auth_client.post('/generate-pdf', json=RESUME)
+    assert second.data == first.data
+    assert len(pdf_renders) == 1
+    etag = first.headers['ETag']
+    third = auth_client.post('/generate-pdf', json=RESUME, headers={'If-None-Match': etag})
+    assert third.status_code == 304
+    assert app_module.pdf_cache.stats()['hits'] == 1
+
+def test_default_pdf_pool_renders_offline():
+    """Test that by default PDF renders get the font stylesheet from memory and may not fetch anything."""
+    pool = app_module.pdf_pool
+    assert not app_module.RESUME_FONTS_FROM_NETWORK
+    assert pool.network_prefixes == ()
+    assert pool.assets[app_module.RESUME_FONT_CSS_URL] == (app_module.RESUME_FONT_CSS, 'text/css')
+
+
+def test_pdf_job_lifecycle(auth_client, pdf_renders):
+    """Test that a queued PDF job can be polled and downloaded."""
+    response = auth_client.post('/pdf-jobs', json=RESUME)
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    app_module.pdf_jobs.get(job_id).wait(timeout=5)
+    status = auth_client.get(f'/pdf-jobs/{job_id}').get_json()
+    assert status['status'] == 'done'
+    download = auth_client.get(f'/pdf-jobs/{job_id}/download')
+    assert download.status_code == 200
+    assert download.data == b'%PDF-1.4 test'
+
+def test_pdf_job_is_private_to_owner(auth_client, pdf_renders):
+    """Test that another user cannot see a PDF job."""
+    job_id = auth_client.post('/pdf-jobs', json=RESUME).get_json()['job_id']
+    with auth_client.session_transaction() as sess:
+        sess['user_id'] = 'someone-else@example.com'
+    assert auth_client.get(f'/pdf-jobs/{job_id}').status_code == 404
+
+def test_export_resumes_streams_zip(auth_client, fake_s3, fake_dynamodb, pdf_renders):
+    """Test that bulk export returns one PDF per saved resume in a ZIP."""
+    for stamp in ['20240101_000000', '20240102_000000']:
+        fake_s3.put_object(Bucket='b', Key=f'user@example.com/resume_{stamp}.json', Body=json.dumps(RESUME))
+    response = auth_client.get('/export-resumes')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    assert sorted(archive.namelist()) == [
+        'Test_User_resume_20240101_000000.pdf',
+        'Test_User_resume_20240102_000000.pdf',
+    ]
+    assert archive.read('Test_User_resume_20240101_000000.pdf') == b'%PDF-1.4 test'
+
+def test_export_resumes_rejects_other_users_files(auth_client, fake_s3):
+    """Test that bulk export only accepts the current user's resumes."""
+    response = auth_client.get('/export-resumes?filename=other@example.com/resume_1.json')
+    assert response.status_code == 403
+
+def test_resume_index_avoids_fetching_resume_bodies(auth_client, fake_s3, fake_dynamodb):
+    """Test that saved resumes are listed from the index without reading each resume."""
+    auth_client.post('/save-resume', json=RESUME)
+    fake_s3.get_count = 0
+    resumes = auth_client.get('/get-resumes').get_json()['resumes']
+    assert len(resumes) == 1
+    assert resumes[0]['data']['name'] == 'Test User'
+    assert resumes[0]['size'] > 0
+    assert fake_s3.get_count == 0
+
+def test_delete_resume_updates_index(auth_client, fake_s3, fake_dynamodb):
+    """Test that deleting a resume removes it from the index."""
+    filename = auth_client.post('/save-resume', json=RESUME).get_json()['filename']
+    response = auth_client.delete(f'/delete-resume/{filename}')
+    assert response.status_code == 200
+    assert auth_client.get('/get-resumes').get_json()['resumes'] == []
+
+def test_save_from_another_worker_stays_indexed(auth_client, fake_s3, fake_dynamodb, monkeypatch):
+    """Test that a save landing while another is in flight keeps both versions listed."""
+    write_version = app_module.write_resume_version
+
+    def write_alongside_other_worker(user_id, resume_data, head):
+        monkeypatch.setattr(app_module, 'write_resume_version', write_version)
+        other.append(app_module.save_resume_to_s3(user_id, dict(resume_data, phone='other worker')))
+        return write_version(user_id, resume_data, head)
+
+    other = []
+    monkeypatch.setattr(app_module, 'write_resume_version', write_alongside_other_worker)
+    filename = auth_client.post('/save-resume', json=RESUME).get_json()['filename']
+    listed = [r['filename'] for r in auth_client.get('/get-resumes').get_json()['resumes']]
+    assert sorted(listed) == sorted(other + [filename])
+
+def test_rebuild_resume_index_command(fake_s3, fake_dynamodb):
+    """Test that the backfill command indexes resumes saved before the index existed."""
+    key = 'user@example.com/resume_20240101_000000.json'
+    fake_s3.put_object(Bucket='b', Key=key, Body=json.dumps(RESUME))
+    result = app.test_cli_runner().invoke(args=['rebuild-resume-index', '--user', 'user@example.com'])
+    assert 'indexed 1 resumes' in result.output
+    index = app_module.load_resume_index('user@example.com')
+    assert list(index['resumes']) == [key]
+    assert index['head']['base'] == key
+
+def test_get_user_resumes_follows_pagination(fake_s3):
+    """Test that resumes beyond the first listing page are returned in LastModified order."""
+    fake_s3.page_size = 2
+    for i in range(5):
+        fake_s3.put_object(Bucket='b', Key=f'user@example.com/resume_{i}.json', Body=json.dumps({'name': str(i)}))
+    resumes = list(app_module.get_user_resumes_from_s3('user@example.com'))
+    assert [resume['data']['name'] for resume in resumes] == ['0', '1', '2', '3', '4']
+    assert fake_s3.get_count == 5
+
+def test_load_resume_is_served_from_cache(auth_client, fake_s3, fake_dynamodb):
+    """Test that repeat loads skip S3 and revalidate with the ETag."""
+    key = 'user@example.com/resume_20240101_000000.json'
+    fake_s3.put_object(Bucket='b', Key=key, Body=json.dumps(RESUME))
+    first = auth_client.get(f'/load-resume/{key}')
+    second = auth_client.get(f'/load-resume/{key}')
+    assert first.get_json() == second.get_json() == {'resume': RESUME}
+    assert fake_s3.get_count == 1
+    assert first.headers['Last-Modified']
+    revalidated = auth_client.get(f'/load-resume/{key}', headers={'If-None-Match': first.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert fake_s3.get_count == 1
+
+def test_saved_resume_loads_without_s3_read(auth_client, fake_s3, fake_dynamodb):
+    """Test that saving writes the new resume through to the cache and deleting drops it."""
+    filename = auth_client.post('/save-resume', json=RESUME).get_json()['filename']
+    fake_s3.get_count = 0
+    assert auth_client.get(f'/load-resume/{filename}').get_json() == {'resume': RESUME}
+    assert fake_s3.get_count == 0
+    auth_client.delete(f'/delete-resume/{filename}')
+    assert auth_client.get(f'/load-resume/{filename}').status_code == 500
+
+FULL_RESUME = dict(RESUME, experience=[{
+    'company': f'Company {i}',
+    'role': 'Software Engineer',
+    'bullets': [f'Built and operated service {i}.{j} handling millions of requests per day' for j in range(4)]
+} for i in range(3)])
+
+def test_resume_saves_are_stored_as_deltas(auth_client, fake_s3, fake_dynamodb):
+    """Test that a small edit is stored as a patch and reconstructs to the full resume."""
+    first = auth_client.post('/save-resume', json=FULL_RESUME).get_json()['filename']
+    edited = dict(FULL_RESUME, phone='555-0199')
+    second = auth_client.post('/save-resume', json=edited).get_json()['filename']
+    assert first.endswith('.json')
+    assert second.endswith('.patch')
+    assert len(fake_s3.objects[second]['Body']) * 2 < len(fake_s3.objects[first]['Body'])
+    app_module.resume_cache.memory.clear()
+    assert auth_client.get(f'/load-resume/{second}').get_json() == {'resume': edited}
+    versions = auth_client.get('/resume-versions').get_json()['versions']
+    assert [v['storage'] for v in versions] == ['delta', 'snapshot']
+
+def test_resume_deltas_are_compacted(auth_client, fake_s3, fake_dynamodb, monkeypatch):
+    """Test that a new base snapshot is written after the configured number of deltas."""
+    monkeypatch.setattr(app_module, 'RESUME_COMPACT_EVERY', 2)
+    keys = [auth_client.post('/save-resume', json=dict(FULL_RESUME, phone=str(i))).get_json()['filename']
+            for i in range(4)]
+    assert [key.rsplit('.', 1)[1] for key in keys] == ['json', 'patch', 'patch', 'json']
+
+def test_deleting_a_base_keeps_dependent_versions(auth_client, fake_s3, fake_dynamodb):
+    """Test that a base snapshot stays in S3 while a delta still depends on it."""
+    base = auth_client.post('/save-resume', json=FULL_RESUME).get_json()['filename']
+    delta = auth_client.post('/save-resume', json=dict(FULL_RESUME, phone='1')).get_json()['filename']
+    auth_client.delete(f'/delete-resume/{base}')
+    assert [r['filename'] for r in auth_client.get('/get-resumes').get_json()['resumes']] == [delta]
+    assert base in fake_s3.objects
+    auth_client.delete(f'/delete-resume/{delta}')
+    assert base not in fake_s3.objects
+    assert delta not in fake_s3.objects
+
+def test_deleted_base_stays_deleted(auth_client, fake_s3, fake_dynamodb):
+    """Test that a deleted base kept for its deltas cannot be loaded and is not listed again after a rebuild."""
+    base = auth_client.post('/save-resume', json=FULL_RESUME).get_json()['filename']
+    delta = auth_client.post('/save-resume', json=dict(FULL_RESUME, phone='1')).get_json()['filename']
+    auth_client.delete(f'/delete-resume/{base}')
+    assert auth_client.get(f'/load-resume/{base}').status_code == 404
+    index = app_module.rebuild_resume_index('user@example.com')
+    assert index['head'] is None
+    assert [r['filename'] for r in auth_client.get('/get-resumes').get_json()['resumes']] == [delta]
+    assert auth_client.get(f'/load-resume/{base}').status_code == 404
+    auth_client.delete(f'/delete-resume/{delta}')
+    assert sorted(fake_s3.objects) == []
+
+def test_base_deleted_during_a_save_is_not_left_referenced(auth_client, fake_s3, fake_dynamodb, monkeypatch):
+    """Test that a delta whose base another worker purges mid-save is written again as a snapshot."""
+    base = auth_client.post('/save-resume', json=FULL_RESUME).get_json()['filename']
+    write_version = app_module.write_resume_version
+
+    def write_while_base_is_deleted(user_id, resume_data, head):
+        monkeypatch.setattr(app_module, 'write_resume_version', write_version)
+        written = write_version(user_id, resume_data, head)
+        app_module.delete_resume_version(user_id, base)
+        return written
+
+    monkeypatch.setattr(app_module, 'write_resume_version', write_while_base_is_deleted)
+    edited = dict(FULL_RESUME, phone='1')
+    filename = auth_client.post('/save-resume', json=edited).get_json()['filename']
+    assert filename.endswith('.json')
+    assert sorted(fake_s3.objects) == [filename]
+    assert [r['filename'] for r in auth_client.get('/get-resumes').get_json()['resumes']] == [filename]
+    app_module.resume_cache.memory.clear()
+    assert auth_client.get(f'/load-resume/{filename}').get_json() == {'resume': edited}
+
+def test_bytes_written_per_save_do_not_grow_with_history(auth_client, fake_s3, fake_dynamodb, monkeypatch):
+    """Test that a delta save writes the same few bytes however many versions came before."""
+    written = []
+    put_object = fake_s3.put_object
+    monkeypatch.setattr(fake_s3, 'put_object', lambda **params: written.append(len(params['Body'])) or put_object(**params))
+    index = app_module.dynamodb.Table(app_module.RESUME_INDEX_TABLE_NAME)
+    put_item, update_item = index.put_item, index.update_item
+    monkeypatch.setattr(index, 'put_item', lambda **params: written.append(len(json.dumps(params))) or put_item(**params))
+    monkeypatch.setattr(index, 'update_item', lambda **params: written.append(len(json.dumps(params))) or update_item(**params))
+    per_save = []
+    for i in range(20):
+        written.clear()
+        auth_client.post('/save-resume', json=dict(FULL_RESUME, phone=str(i)))
+        per_save.append(sum(written))
+    snapshot, first_delta, last_delta = per_save[0], per_save[1], per_save[-1]
+    assert last_delta <= first_delta + 8
+    assert last_delta < snapshot
+
+def test_resume_retention_prunes_old_versions(auth_client, fake_s3, fake_dynamodb, monkeypatch):
+    """Test that only the newest versions are kept when retention is configured."""
+    monkeypatch.setattr(app_module, 'RESUME_VERSION_RETENTION', 2)
+    monkeypatch.setattr(app_module, 'RESUME_COMPACT_EVERY', 0)
+    keys = [auth_client.post('/save-resume', json=dict(FULL_RESUME, phone=str(i))).get_json()['filename']
+            for i in range(3)]
+    assert keys[0] not in fake_s3.objects
+    assert [r['filename'] for r in auth_client.get('/get-resumes').get_json()['resumes']] == keys[1:]
+
+def test_saved_resumes_are_gzipped_in_s3(auth_client, fake_s3, fake_dynamodb):
+    """Test that resumes are stored compressed and read back transparently."""
+    filename = auth_client.post('/save-resume', json=RESUME).get_json()['filename']
+    stored = fake_s3.objects[filename]
+    assert stored['ContentEncoding'] == 'gzip'
+    assert json.loads(gzip.decompress(stored['Body'])) == RESUME
+    app_module.resume_cache.memory.clear()
+    assert auth_client.get(f'/load-resume/{filename}').get_json() == {'resume': RESUME}
+
+def test_json_responses_are_gzipped_when_accepted(auth_client, fake_s3, fake_dynamodb):
+    """Test that large JSON responses are compressed for clients that accept gzip."""
+    for i in range(20):
+        auth_client.post('/save-resume', json=dict(RESUME, phone=str(i)))
+    plain = auth_client.get('/get-resumes')
+    compressed = auth_client.get('/get-resumes', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+
+def test_gzipped_responses_carry_a_weak_etag(auth_client, fake_s3, fake_dynamodb):
+    """Test that a compressed response does not reuse the plain body's strong ETag."""
+    key = 'user@example.com/resume_20240101_000000.json'
+    fake_s3.put_object(Bucket='b', Key=key, Body=json.dumps(FULL_RESUME))
+    plain = auth_client.get(f'/load-resume/{key}')
+    compressed = auth_client.get(f'/load-resume/{key}', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert not plain.headers['ETag'].startswith('W/')
+    assert compressed.headers['ETag'] == 'W/' + plain.headers['ETag']
+    revalidated = auth_client.get(f'/load-resume/{key}', headers={'Accept-Encoding': 'gzip',
+                                                                  'If-None-Match': compressed.headers['ETag']})
+    assert revalidated.status_code == 304
+
+def test_concurrent_saves_count_every_resume(fake_dynamodb):
+    """Test that concurrent saves each increment the resume count exactly once."""
+    threads = [threading.Thread(target=app_module.record_resume_saved, args=('user@example.com', 'user@example.com'))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fake_dynamodb.items['user@example.com']['resume_count'] == 10
+    assert fake_dynamodb.calls == 10
+
+def test_login_keeps_created_at_and_resume_count(fake_dynamodb):
+    """Test that a login updates last_login without resetting the rest of the record."""
+    app_module.record_user_login('user@example.com', 'user@example.com', '2024-01-01T00:00:00')
+    app_module.record_resume_saved('user@example.com', 'user@example.com')
+    app_module.record_user_login('user@example.com', 'user@example.com', '2024-02-01T00:00:00')
+    assert app_module.record_user_login('user@example.com', 'user@example.com', '2024-01-15T00:00:00')
+    item = fake_dynamodb.items['user@example.com']
+    assert item['created_at'] == '2024-01-01T00:00:00'
+    assert item['last_login'] == '2024-02-01T00:00:00'
+    assert item['resume_count'] == 1
+
+def test_login_does_not_wait_for_dynamodb(client, fake_dynamodb, monkeypatch):
+    """Test that login bookkeeping is buffered and written on the next flush."""
+    monkeypatch.setattr(app_module, 'COGNITO_APP_CLIENT_ID', 'client-id')
+    monkeypatch.setattr(app_module, 'COGNITO_APP_CLIENT_SECRET', 'client-secret')
+    monkeypatch.setattr(app_module.cognito_client, 'initiate_auth',
+                        lambda **params: {'AuthenticationResult': {'IdToken': 'id', 'AccessToken': 'access'}})
+    response = client.post('/custom-login', json={'email': 'user@example.com', 'password': 'secret'})
+    assert response.get_json()['success']
+    assert fake_dynamodb.calls == 0
+    app_module.login_writes.flush()
+    assert fake_dynamodb.calls == 1
+    assert 'last_login' in fake_dynamodb.items['user@example.com']
+
+def test_dashboard_shows_a_login_not_yet_written(client, fake_dynamodb, fake_s3, monkeypatch):
+    """Test that a first-time user's dashboard reflects their login before the buffered write is flushed."""
+    monkeypatch.setattr(app_module, 'COGNITO_APP_CLIENT_ID', 'client-id')
+    monkeypatch.setattr(app_module, 'COGNITO_APP_CLIENT_SECRET', 'client-secret')
+    monkeypatch.setattr(app_module.cognito_client, 'initiate_auth',
+                        lambda **params: {'AuthenticationResult': {'IdToken': 'id', 'AccessToken': 'access'}})
+    client.post('/custom-login', json={'email': 'user@example.com', 'password': 'secret'})
+    body = client.get('/dashboard').get_data(as_text=True)
+    assert fake_dynamodb.items == {}
+    today = app_module.datetime.now().date().isoformat()
+    assert body.count(today) == 2
+    app_module.login_writes.flush()
+
+JOB_DESCRIPTION = 'Senior Python engineer with AWS, SQL and Docker experience building APIs.'
+
+def test_extract_keywords_cached_across_formatting(auth_client, monkeypatch):
+    """Test that repeat job descriptions differing only in whitespace/case reuse one model call."""
+    calls = []
+    def fake_extract(job_description):
+        calls.append(job_description)
+        return ['Python', 'AWS']
+    monkeypatch.setattr(app_module, 'extract_keywords_with_openai', fake_extract)
+    monkeypatch.setattr(app_module, 'keyword_cache', app_module.TieredCache(app_module.LRUCache(1024 * 1024)))
+    first = auth_client.post('/extract-keywords', json={'job_description': JOB_DESCRIPTION})
+    second = auth_client.post('/extract-keywords', json={'job_description': '  ' + JOB_DESCRIPTION.upper().replace(' ', '\n ')})
+    assert first.get_json() == second.get_json() == {'keywords': ['Python', 'AWS']}
+    assert len(calls) == 1
+
+@pytest.fixture
+def rewrite_calls(monkeypatch):
+    """Replace the rewrite model call with a fake and start from an empty rewrite cache."""
+    calls = []
+    def fake_rewrite(kind, bullet_points, selected_keywords, timeout=None):
+        calls.append(list(bullet_points))
+        return [f'Improved {point}' for point in bullet_points]
+    monkeypatch.setattr(app_module, 'rewrite_bullets_with_openai', fake_rewrite)
+    monkeypatch.setattr(app_module, 'rewrite_cache', app_module.LRUCache(1024 * 1024))
+    return calls
+
+def test_ai_rewrite_only_sends_changed_bullets(auth_client, rewrite_calls):
+    """Test that cached bullets are reused and only edited bullets go to the model."""
+    payload = {'bullet_points': ['a', 'b', 'c'], 'selected_keywords': ['SQL']}
+    first = auth_client.post('/ai-rewrite-job-description', json=payload).get_json()
+    assert first == {'rewritten_points': ['Improved a', 'Improved b', 'Improved c']}
+    payload['bullet_points'] = ['a', 'B2', 'c']
+    second = auth_client.post('/ai-rewrite-job-description', json=payload).get_json()
+    assert second == {'rewritten_points': ['Improved a', 'Improved B2', 'Improved c']}
+    assert rewrite_calls == [['a', 'b', 'c'], ['B2']]
+
+def test_ai_rewrite_rerun_on_rewritten_bullets_is_cached(auth_client, rewrite_calls):
+    """Test that re-running a rewrite on its own output needs no model call."""
+    payload = {'bullet_points': ['a', 'b'], 'selected_keywords': []}
+    rewritten = auth_client.post('/ai-rewrite-project-description', json=payload).get_json()['rewritten_points']
+    again = auth_client.post('/ai-rewrite-project-description',
+                             json={'bullet_points': rewritten, 'selected_keywords': []}).get_json()
+    assert again == {'rewritten_points': rewritten}
+    assert len(rewrite_calls) == 1
+    auth_client.post('/ai-rewrite-job-description', json=payload)
+    assert len(rewrite_calls) == 2
+
+def parse_sse(body):
+    """Split a text/event-stream body into (event, data) pairs"""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+def test_rewrite_stream_sends_each_bullet_once_its_line_completes(auth_client, monkeypatch):
+    """Test that streamed bullets are sent before the completion finishes and cached after it."""
+    monkeypatch.setattr(app_module, 'rewrite_cache', app_module.LRUCache(1024 * 1024))
+    progress = []
+    def fake_stream(prompt, max_tokens, temperature):
+        for piece in ['1. Led ', 'the team\n- Shi', 'pped v2']:
+            progress.append(piece)
+            yield piece
+    monkeypatch.setattr(app_module, 'stream_completion', fake_stream)
+    
+    response = auth_client.post('/ai-rewrite-job-description/stream',
+                                json={'bullet_points': ['a', 'b'], 'selected_keywords': []})
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+    assert next(chunks) == b'event: bullet\ndata: {"index": 0, "text": "Led the team"}\n\n'
+    assert progress == ['1. Led ', 'the team\n- Shi']
+    events = parse_sse(b''.join(chunks).decode())
+    assert events == [('bullet', {'index': 1, 'text': 'Shipped v2'}),
+                      ('done', {'rewritten_points': ['Led the team', 'Shipped v2']})]
+    
+    # The streamed rewrites are cached for the regular endpoint too
+    monkeypatch.setattr(app_module, 'rewrite_bullets_with_openai', lambda *args: pytest.fail('model called'))
+    again = auth_client.post('/ai-rewrite-job-description', json={'bullet_points': ['a', 'b'], 'selected_keywords': []})
+    assert again.get_json() == {'rewritten_points': ['Led the team', 'Shipped v2']}
+
+def test_streamed_keyword_requests_share_one_model_call(monkeypatch):
+    """Test that concurrent identical postings, streamed or not, make a single upstream call."""
+    monkeypatch.setattr(app_module, 'keyword_cache', app_module.LRUCache(1024 * 1024))
+    monkeypatch.setattr(app_module, 'keyword_flights', app_module.SingleFlight())
+    calls = []
+    release = threading.Event()
+    def fake_stream(prompt, max_tokens, temperature):
+        calls.append(prompt)
+        yield 'Python, '
+        release.wait(5)
+        yield 'AWS'
+    monkeypatch.setattr(app_module, 'stream_completion', fake_stream)
+    monkeypatch.setattr(app_module, 'extract_keywords_with_openai', lambda job_description: pytest.fail('model called'))
+    
+    leader = app_module.stream_job_keywords(JOB_DESCRIPTION)
+    assert next(leader) == 'Python'
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(list(app_module.stream_job_keywords(JOB_DESCRIPTION)))),
+               threading.Thread(target=lambda: results.append(app_module.get_job_keywords(JOB_DESCRIPTION)))]
+    for thread in threads:
+        thread.start()
+    while app_module.keyword_flights.shared < 2:
+        time.sleep(0.001)
+    release.set()
+    assert list(leader) == ['AWS']
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [['Python', 'AWS'], ['Python', 'AWS']]
+
+def test_keyword_stream_reports_errors_as_events(auth_client, monkeypatch):
+    """Test that keywords stream one by one and a mid-stream failure becomes an error event."""
+    monkeypatch.setattr(app_module, 'keyword_cache', app_module.LRUCache(1024 * 1024))
+    def fake_stream(prompt, max_tokens, temperature):
+        yield 'Python, S'
+        yield 'QL\nAWS'
+        raise RuntimeError('upstream closed')
+    monkeypatch.setattr(app_module, 'stream_completion', fake_stream)
+    
+    response = auth_client.post('/extract-keywords/stream', json={'job_description': JOB_DESCRIPTION})
+    assert parse_sse(response.get_data(as_text=True)) == [
+        ('keyword', {'keyword': 'Python'}),
+        ('keyword', {'keyword': 'SQL'}),
+        ('error', {'error': 'upstream closed'}),
+    ]
+    assert len(app_module.keyword_cache) == 0
+
+def test_ai_tailor_resume_rewrites_sections_concurrently(auth_client, rewrite_calls, monkeypatch):
+    """Test that every job and project entry is rewritten in parallel in one request."""
+    barrier = threading.Barrier(3, timeout=5)
+    def fake_rewrite(kind, bullet_points, selected_keywords, timeout=None):
+        # Fails unless all three sections are in flight at the same time
+        barrier.wait()
+        assert timeout == app_module.AI_TAILOR_TIMEOUT
+        return [f'{kind}: {point}' for point in bullet_points]
+    monkeypatch.setattr(app_module, 'rewrite_bullets_with_openai', fake_rewrite)
+    
+    response = auth_client.post('/ai-tailor-resume', json={
+        'resume': {
+            'job_description': [['a', ''], ['b']],
+            'project_description': [['c']],
+        },
+        'selected_keywords': ['SQL'],
+    })
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'job_description': [['job: a'], ['job: b']],
+        'project_description': [['project: c']],
+        'errors': [],
+    }
+
+def test_ai_tailor_resume_keeps_failed_sections(auth_client, rewrite_calls, monkeypatch):
+    """Test that a failing section keeps its original bullets and is reported."""
+    def fake_rewrite(kind, bullet_points, selected_keywords, timeout=None):
+        if kind == 'project':
+            raise TimeoutError('Request timed out.')
+        return [f'Improved {point}' for point in bullet_points]
+    monkeypatch.setattr(app_module, 'rewrite_bullets_with_openai', fake_rewrite)
+    
+    response = auth_client.post('/ai-tailor-resume', json={
+        'resume': {'job_description': [['a']], 'project_description': [['c']]},
+    })
+    assert response.get_json() == {
+        'job_description': [['Improved a']],
+        'project_description': [['c']],
+        'errors': [{'section': 'project_description', 'index': 0, 'error': 'Request timed out.'}],
+    }
+    assert auth_client.post('/ai-tailor-resume', json={'resume': {}}).status_code == 400
+
+def test_ai_tailor_resume_reports_sections_past_the_deadline(auth_client, rewrite_calls, monkeypatch):
+    """Test that the request returns at the deadline and slow sections keep their bullets."""
+    release = threading.Event()
+    def fake_rewrite(kind, bullet_points, selected_keywords, timeout=None):
+        if kind == 'project':
+            release.wait(5)
+        return [f'Improved {point}' for point in bullet_points]
+    monkeypatch.setattr(app_module, 'rewrite_bullets_with_openai', fake_rewrite)
+    monkeypatch.setattr(app_module, 'AI_TAILOR_DEADLINE', 0.1)
+    
+    try:
+        response = auth_client.post('/ai-tailor-resume', json={
+            'resume': {'job_description': [['a']], 'project_description': [['c']]},
+        })
+    finally:
+        release.set()
+    assert response.get_json() == {
+        'job_description': [['Improved a']],
+        'project_description': [['c']],
+        'errors': [{'section': 'project_description', 'index': 0, 'error': 'Timed out after 0.1 seconds'}],
+    }
+
+def test_ai_tailor_resume_fans_out_only_on_free_ai_slots(auth_client, rewrite_calls, monkeypatch):
+    """Test that parallel section rewrites are charged to the AI limiter and capped by its free slots."""
+    concurrency = ConcurrencyLimiter('ai', 2)
+    monkeypatch.setitem(app_module.admission_limits, 'ai', (concurrency, RateLimiter('ai', 100, 1000)))
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+    def fake_rewrite(kind, bullet_points, selected_keywords, timeout=None):
+        with lock:
+            in_flight.append(kind)
+            peak.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.remove(kind)
+        return [f'Improved {point}' for point in bullet_points]
+    monkeypatch.setattr(app_module, 'rewrite_bullets_with_openai', fake_rewrite)
+    
+    response = auth_client.post('/ai-tailor-resume', json={
+        'resume': {'job_description': [['a'], ['b'], ['c']], 'project_description': [['d']]},
+    })
+    assert response.get_json()['errors'] == []
+    assert max(peak) == 2
+    assert concurrency.stats()['admitted'] == 2
+    assert concurrency.stats()['active'] == 0
+
+def test_keyword_routes_are_admission_controlled(auth_client, fake_s3, fake_dynamodb, monkeypatch):
+    """Test that keyword coverage and ranking, which may call the model, get a 503 when AI is at capacity."""
+    concurrency = ConcurrencyLimiter('ai', 1)
+    monkeypatch.setitem(app_module.admission_limits, 'ai', (concurrency, RateLimiter('ai', 100, 1000)))
+    release = concurrency.acquire()
+    payload = {'job_description': JOB_DESCRIPTION, 'mode': 'local', 'resume': RESUME}
+    assert auth_client.post('/keyword-coverage', json=payload).status_code == 503
+    assert auth_client.post('/rank-resumes', json=payload).status_code == 503
+    release()
+    assert auth_client.post('/keyword-coverage', json=payload).status_code == 200
+    assert auth_client.post('/rank-resumes', json=payload).status_code == 200
+
+def test_rewrite_forwards_only_an_explicit_timeout(monkeypatch):
+    """Test that a rewrite without its own timeout keeps the client default instead of disabling it."""
+    calls = []
+    def create(**params):
+        calls.append(params)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content='Led'))])
+    completions = types.SimpleNamespace(create=create)
+    monkeypatch.setattr(app_module, 'openai', types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)))
+    assert app_module.rewrite_bullets_with_openai('job', ['led'], []) == ['Led']
+    app_module.rewrite_bullets_with_openai('job', ['led'], [], timeout=5)
+    assert 'timeout' not in calls[0]
+    assert calls[1]['timeout'].read == 5
+
+def test_extract_keywords_local_mode_needs_no_model(auth_client, monkeypatch):
+    """Test that local mode answers from the lexicon without calling the model."""
+    monkeypatch.setattr(app_module, 'extract_keywords_with_openai', lambda *args: pytest.fail('model called'))
+    response = auth_client.post('/extract-keywords', json={'job_description': JOB_DESCRIPTION, 'mode': 'local'})
+    assert set(response.get_json()['keywords']) == {'Python', 'AWS', 'SQL', 'Docker'}
+    bad = auth_client.post('/extract-keywords', json={'job_description': JOB_DESCRIPTION, 'mode': 'psychic'})
+    assert bad.status_code == 400
+
+def test_extract_keywords_hybrid_mode_enriches_on_request(auth_client, monkeypatch):
+    """Test that hybrid mode adds model keywords only when enrich is set."""
+    calls = []
+    def fake_extract(job_description):
+        calls.append(job_description)
+        return ['python', 'API design', 'Mentoring']
+    monkeypatch.setattr(app_module, 'extract_keywords_with_openai', fake_extract)
+    monkeypatch.setattr(app_module, 'keyword_cache', app_module.LRUCache(1024 * 1024))
+    monkeypatch.setattr(app_module, 'KEYWORD_EXTRACTION_MODE', 'hybrid')
+    
+    quick = auth_client.post('/extract-keywords', json={'job_description': JOB_DESCRIPTION}).get_json()
+    assert quick['enriched'] is False
+    assert calls == []
+    
+    enriched = auth_client.post('/extract-keywords', json={'job_description': JOB_DESCRIPTION, 'enrich': True}).get_json()
+    assert enriched == {'keywords': quick['keywords'] + ['API design', 'Mentoring'], 'enriched': True}
+    assert len(calls) == 1
+
+def test_keyword_stream_hybrid_sends_local_keywords_first(auth_client, monkeypatch):
+    """Test that hybrid streaming sends lexicon keywords before the model's new ones."""
+    monkeypatch.setattr(app_module, 'keyword_cache', app_module.LRUCache(1024 * 1024))
+    monkeypatch.setattr(app_module, 'stream_completion', lambda *args, **kwargs: iter(['SQL, Kafka\n']))
+    local = app_module.extract_keywords_locally(JOB_DESCRIPTION)
+    
+    response = auth_client.post('/extract-keywords/stream',
+                                json={'job_description': JOB_DESCRIPTION, 'mode': 'hybrid', 'enrich': True})
+    events = parse_sse(response.get_data(as_text=True))
+    assert [data['keyword'] for event, data in events[:-1]] == local + ['Kafka']
+    assert events[-1] == ('done', {'keywords': local + ['Kafka']})
+
+def test_rank_resumes_scores_every_saved_resume(auth_client, fake_s3, fake_dynamodb, monkeypatch):
+    """Test that all saved resumes are scored in one call and ranked best first."""
+    python_resume = dict(RESUME, skills='Python, Docker', job_description=[['Ran Kubernetes on AWS']])
+    auth_client.post('/save-resume', json=dict(RESUME, skills='Java'))
+    best = auth_client.post('/save-resume', json=python_resume).get_json()['filename']
+    
+    response = auth_client.post('/rank-resumes', json={'keywords': ['Python', 'AWS', 'K8s', 'Java']})
+    assert response.status_code == 200
+    resumes = response.get_json()['resumes']
+    assert [resume['filename'] for resume in resumes][0] == best
+    assert resumes[0]['score'] == 75
+    assert resumes[0]['sections']['experience']['matched'] == ['AWS', 'K8s']
+    assert resumes[1]['matched'] == ['Java']
+    
+    # Saved versions are normalized once and reused by later rankings
+    monkeypatch.setattr(app_module, 'get_cached_resume', lambda key: pytest.fail('resume refetched'))
+    again = auth_client.post('/rank-resumes', json={'keywords': ['Docker']}).get_json()
+    assert [resume['score'] for resume in again['resumes']] == [100, 0]
+
+def test_rank_resumes_skips_unreadable_versions(auth_client, fake_s3, fake_dynamodb):
+    """Test that a resume that fails to load is left out instead of failing the whole ranking."""
+    good = auth_client.post('/save-resume', json=dict(RESUME, skills='Python')).get_json()['filename']
+    corrupt = auth_client.post('/save-resume', json=dict(RESUME, skills='Java', phone='1')).get_json()['filename']
+    fake_s3.objects[corrupt]['Body'] = b'not json'
+    app_module.resume_cache.memory.clear()
+    response = auth_client.post('/rank-resumes', json={'keywords': ['Python']})
+    assert response.status_code == 200
+    assert [resume['filename'] for resume in response.get_json()['resumes']] == [good]
+
+def test_keyword_coverage_of_unsaved_resume(auth_client, monkeypatch):
+    """Test that coverage of the resume being edited can use locally extracted keywords."""
+    monkeypatch.setattr(app_module, 'extract_keywords_with_openai', lambda *args: pytest.fail('model called'))
+    response = auth_client.post('/keyword-coverage', json={
+        'job_description': JOB_DESCRIPTION,
+        'mode': 'local',
+        'resume': dict(RESUME, skills='Python and SQL'),
+    })
+    result = response.get_json()
+    assert set(result['keywords']) == {'Python', 'AWS', 'SQL', 'Docker'}
+    assert result['score'] == 50
+    assert set(result['sections']['skills']['matched']) == {'Python', 'SQL'}
+    assert auth_client.post('/keyword-coverage', json={'resume': RESUME}).status_code == 400
+
+PREVIEW = dict(RESUME, skills='Languages: Python; Tools: Docker', job_title=['Engineer'], company=['Acme'],
+               job_description=[['Built APIs']], section_order=['experience', 'summary', 'skills'])
+
+@pytest.fixture
+def fragment_renders(monkeypatch):
+    """Count section template renders, starting from empty preview caches."""
+    renders = []
+    render_template = app_module.render_template
+    def counting_render(name, **context):
+        renders.append(name)
+        return render_template(name, **context)
+    monkeypatch.setattr(app_module, 'render_template', counting_render)
+    monkeypatch.setattr(app_module, 'preview_fragment_cache', app_module.LRUCache(1024 * 1024))
+    monkeypatch.setattr(app_module, 'preview_memo', app_module.LRUCache(1024 * 1024, sizeof=lambda memo: len(memo[1])))
+    return renders
+
+def test_generate_resume_full_render_matches_template(auth_client, fragment_renders):
+    """Test that assembled fragments give the same document as the full template."""
+    result = auth_client.post('/generate-resume', json=PREVIEW).get_json()
+    with app.test_request_context():
+        expected = app_module.render_template('resume_template.html', data=PREVIEW,
+                                              section_order=PREVIEW['section_order'])
+    normalize = lambda html: re.sub(r'<!--.*?-->|\s+', '', html)
+    assert normalize(result['resume_html']) == normalize(expected)
+    assert result['resume_html'].index('PROFESSIONAL EXPERIENCE') < result['resume_html'].index('SKILLS')
+    assert result['version']
+
+def test_generate_resume_returns_only_changed_fragments(auth_client, fragment_renders):
+    """Test that an edit re-renders and returns only the section it touched."""
+    first = auth_client.post('/generate-resume', json=dict(PREVIEW, known_fragments=[])).get_json()
+    assert set(first['fragments']) == set(first['sections'])
+    assert len(first['sections']) == 6
+    
+    fragment_renders.clear()
+    edited = dict(PREVIEW, summary='Engineer who ships.', known_fragments=first['sections'])
+    second = auth_client.post('/generate-resume', json=edited).get_json()
+    assert fragment_renders == ['resume_sections/summary.html']
+    assert list(second['fragments']) == [second['sections'][3]]
+    assert 'Engineer who ships.' in next(iter(second['fragments'].values()))
+    assert second['version'] != first['version']
+    
+    # Reordering sections needs no rendering at all, only a new order
+    fragment_renders.clear()
+    reordered = dict(edited, section_order=['summary', 'experience', 'skills'], known_fragments=second['sections'])
+    third = auth_client.post('/generate-resume', json=reordered).get_json()
+    assert fragment_renders == []
+    assert third['fragments'] == {}
+    assert third['sections'][2:4] == [second['sections'][3], second['sections'][2]]
+
+def test_generate_resume_unchanged_payload_is_not_modified(auth_client, fragment_renders):
+    """Test that an identical preview payload gets a 304 for the ETag the client holds."""
+    first = auth_client.post('/generate-resume', json=dict(PREVIEW, known_fragments=[]))
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+    
+    fragment_renders.clear()
+    # Key order and the client's fragment list don't change the payload
+    same = dict(reversed(list(PREVIEW.items())), known_fragments=first.get_json()['sections'])
+    response = auth_client.post('/generate-resume', json=same, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert fragment_renders == []
+    
+    edited = auth_client.post('/generate-resume', json=dict(PREVIEW, summary='New summary.'),
+                              headers={'If-None-Match': etag})
+    assert edited.status_code == 200
+    assert edited.headers['ETag'] != etag
+
+def test_generate_resume_memoizes_last_html_per_session(auth_client, fragment_renders):
+    """Test that a session re-posting its last payload gets the memoized HTML without rendering."""
+    first = auth_client.post('/generate-resume', json=PREVIEW).get_json()
+    fragment_renders.clear()
+    app_module.preview_fragment_cache.clear()
+    again = auth_client.post('/generate-resume', json=PREVIEW).get_json()
+    assert again == first
+    assert fragment_renders == []
+    
+    with app.test_client() as other:
+        with other.session_transaction() as sess:
+            sess['user_id'] = 'someone-else'
+        assert other.post('/generate-resume', json=PREVIEW).get_json() == first
+    assert fragment_renders != []
+
+def test_pdf_rate_limit_returns_429_with_retry_after(auth_client, pdf_renders, monkeypatch):
+    """Test that a user past the PDF burst is told when to retry."""
+    monkeypatch.setitem(app_module.admission_limits, 'pdf',
+                        (ConcurrencyLimiter('pdf', 10), RateLimiter('pdf', 1 / 60, 2)))
+    assert auth_client.post('/generate-pdf', json=RESUME).status_code == 200
+    assert auth_client.post('/generate-pdf', json=RESUME).status_code == 200
+    response = auth_client.post('/generate-pdf', json=RESUME)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    assert 'error' in response.get_json()
+    assert len(pdf_renders) == 1
+
+def test_full_pdf_limit_sheds_load_without_blocking_other_routes(auth_client, pdf_renders, fragment_renders, monkeypatch):
+    """Test that PDF requests get a 503 at capacity while cheap routes keep working."""
+    concurrency = ConcurrencyLimiter('pdf', 1)
+    monkeypatch.setitem(app_module.admission_limits, 'pdf', (concurrency, RateLimiter('pdf', 100, 1000)))
+    release = concurrency.acquire()
+    response = auth_client.post('/generate-pdf', json=RESUME)
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+    assert pdf_renders == []
+    assert auth_client.post('/generate-resume', json=RESUME).status_code == 200
+    release()
+    assert auth_client.post('/generate-pdf', json=RESUME).status_code == 200
+
+def test_streamed_response_holds_its_slot_until_closed(auth_client, monkeypatch):
+    """Test that a streaming AI route keeps its concurrency slot until the stream is closed."""
+    monkeypatch.setattr(app_module, 'keyword_cache', app_module.LRUCache(1024 * 1024))
+    monkeypatch.setattr(app_module, 'stream_completion', lambda *args, **kwargs: iter(['Python, SQL']))
+    concurrency = ConcurrencyLimiter('ai', 1)
+    monkeypatch.setitem(app_module.admission_limits, 'ai', (concurrency, RateLimiter('ai', 100, 1000)))
+    response = auth_client.post('/extract-keywords/stream', json={'job_description': JOB_DESCRIPTION},
+                                buffered=False)
+    assert concurrency.stats()['active'] == 1
+    assert 'Python' in response.get_data(as_text=True)
+    response.close()
+    assert concurrency.stats()['active'] == 0
+
+def test_metrics_expose_request_and_span_histograms(auth_client, fake_s3, fake_dynamodb):
+    """Test that /metrics reports request latency per route and the spans a request went through."""
+    auth_client.post('/save-resume', json=RESUME)
+    response = auth_client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{method="POST",endpoint="/save-resume",status="200"}' in body
+    for span in ['save_resume_to_s3', 's3.put_object', 'dynamodb.update_item']:
+        assert f'span_duration_seconds_count{{span="{span}"}}' in body
+
+def test_server_timing_header_lists_request_spans(auth_client, fake_s3, fake_dynamodb, monkeypatch):
+    """Test that the optional Server-Timing header breaks a request down by span."""
+    assert 'Server-Timing' not in auth_client.get('/get-resumes').headers
+    monkeypatch.setattr(app_module, 'SERVER_TIMING_ENABLED', True)
+    auth_client.post('/save-resume', json=RESUME)
+    timing = auth_client.get('/dashboard').headers['Server-Timing']
+    names = [entry.split(';')[0] for entry in timing.split(', ')]
+    assert names == ['dynamodb.get_item', 'dynamodb.query', 'render_template', 'total']
+
+def test_import_defers_heavy_clients():
+    """Test that importing the app builds no AWS clients and imports neither boto3 nor openai."""
+    import subprocess
+    import sys
+    script = ("import sys, app; "
+              "print(sorted(m for m in ('boto3', 'openai') if m in sys.modules), "
+              "app.s3_client.created, app.dynamodb.created, app.cognito_client.created, app.openai.created)")
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                            cwd=app_module.os.path.dirname(app_module.__file__)).stdout
+    assert output.strip().splitlines()[-1] == '[] False False False False'
+
+def test_create_app_warms_up_clients_and_browsers(monkeypatch):
+    """Test that create_app(warm=True) builds every client and launches the browsers first."""
+    clients = {name: app_module.LazyClient(name, object) for name in ['openai', 's3_client', 'dynamodb', 'cognito_client']}
+    for name, client in clients.items():
+        monkeypatch.setattr(app_module, name, client)
+    warmed = []
+    monkeypatch.setattr(app_module.pdf_pool, 'warm_up', lambda: warmed.append(True))
+    monkeypatch.setattr(app_module, 'startup_timings', {})
+    assert app_module.create_app(warm=True) is app
+    assert all(client.created for client in clients.values())
+    assert warmed == [True]
+    assert set(app_module.startup_timings) == {'warm_up', 'ready'}
+
+def test_stats_report_time_to_first_response(client, monkeypatch):
+    """Test that the time from import to the first response is recorded once."""
+    monkeypatch.setattr(app_module, 'startup_timings', {'import': 0.2})
+    client.get('/')
+    first = client.get('/stats').get_json()['startup']
+    assert first['first_response'] >= 0.2
+    assert client.get('/stats').get_json()['startup'] == first
+
+def test_aws_clients_share_tuned_config():
+    """Test that AWS clients get the sized pool, timeouts and adaptive retries."""
+    s3 = app_module.create_s3_client()
+    config = s3.meta.config
+    assert config.max_pool_connections == app_module.AWS_MAX_POOL_CONNECTIONS
+    assert config.connect_timeout == app_module.UPSTREAM_CONNECT_TIMEOUT
+    assert config.read_timeout == app_module.AWS_READ_TIMEOUT
+    assert config.retries == {'mode': 'adaptive', 'total_max_attempts': app_module.AWS_MAX_ATTEMPTS}
+    assert app_module.aws_pool_stats(s3) == {'hosts': 0, 'connections_opened': 0, 'requests': 0,
+                                             'idle_connections': 0,
+                                             'max_pool_connections': app_module.AWS_MAX_POOL_CONNECTIONS}
+
+def test_stats_report_outbound_pools(client, monkeypatch):
+    """Test that /stats reports connection pools only for clients that exist."""
+    monkeypatch.setattr(app_module, 'http_session', app_module.LazyClient('http', app_module.requests.Session))
+    monkeypatch.setattr(app_module, 's3_client', FakeS3())
+    assert client.get('/stats').get_json()['http_pools']['cognito-token'] is None
+    app_module.http_session.get_adapter('https://')
+    pools = client.get('/stats').get_json()['http_pools']
+    assert pools['cognito-token'] == {'hosts': 0, 'connections_opened': 0, 'requests': 0, 'idle_connections': 0}
+    assert pools['s3'] is None
@@ -0,0 +1,76 @@
+import json
+import urllib.request
+import pytest
+from benchmarks.fakes import FakeOpenAIServer, FakeS3, fake_completion_text
+from benchmarks.run import percentile, compare, parse_args
+
+
+def test_percentile_interpolates_between_samples():
+    """Test that percentiles are interpolated over the sorted samples."""
+    values = [1, 2, 3, 4]
+    assert percentile(values, 0) == 1
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4
+    assert percentile([], 99) == 0.0
+
+
+def test_compare_flags_only_changes_past_threshold():
+    """Test that slower latency and lower throughput count as regressions past the threshold."""
+    baseline = {'results': [{'kind': 'load', 'name': 'dashboard', 'concurrency': 4,
+                             'p50_ms': 10.0, 'p95_ms': 20.0, 'throughput_rps': 100.0}]}
+    results = [{'kind': 'load', 'name': 'dashboard', 'concurrency': 4,
+                'p50_ms': 10.5, 'p95_ms': 30.0, 'throughput_rps': 80.0},
+               {'kind': 'load', 'name': 'save-resume', 'concurrency': 4, 'p50_ms': 1.0}]
+    changes = {change['metric']: change for change in compare(baseline, results, threshold=0.1)}
+    assert set(changes) == {'p50_ms', 'p95_ms', 'throughput_rps'}
+    assert not changes['p50_ms']['regression']
+    assert changes['p95_ms']['regression']
+    assert changes['throughput_rps']['regression']
+
+
+def test_parse_args_rejects_unknown_scenarios(capsys):
+    """Test that a misspelled scenario fails fast instead of benchmarking nothing."""
+    args = parse_args(['--scenarios', 'dashboard,save-resume', '--concurrency', '1,8'])
+    assert args.scenarios == ['dashboard', 'save-resume']
+    assert args.concurrency == [1, 8]
+    with pytest.raises(SystemExit):
+        parse_args(['--scenarios', 'dashbord'])
+    assert 'dashbord' in capsys.readouterr().err
+
+
+def test_fake_completion_rewrites_each_bullet():
+    """Test that the fake model answers one line per bullet, or keywords otherwise."""
+    prompt = 'Rewrite these.\n\nOriginal bullet points:\n- Built APIs\n- Led a team\n\nPlease rewrite'
+    assert fake_completion_text(prompt) == 'Delivered Built APIs\nDelivered Led a team'
+    assert 'Python' in fake_completion_text('Job Description:\nPython role\n\nKeywords:')
+
+
+def test_fake_openai_server_answers_and_streams_completions():
+    """Test that the fake server speaks the chat completions wire format."""
+    server = FakeOpenAIServer(latency=0, token_delay=0).start()
+    try:
+        def post(body):
+            request = urllib.request.Request(f"{server.url}chat/completions", data=json.dumps(body).encode(),
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.read().decode()
+
+        messages = [{'role': 'user', 'content': 'Keywords:'}]
+        reply = json.loads(post({'model': 'gpt-4', 'messages': messages}))
+        assert reply['choices'][0]['message']['content'].startswith('Python')
+        events = post({'model': 'gpt-4', 'messages': messages, 'stream': True}).strip().split('\n\n')
+        assert events[-1] == 'data: [DONE]'
+        text = ''.join(json.loads(event[len('data: '):])['choices'][0]['delta']['content'] for event in events[:-1])
+        assert text == fake_completion_text('Keywords:')
+        assert server.requests == 2
+    finally:
+        server.stop()
+
+
+def test_fake_s3_lists_what_was_put():
+    """Test that the fake S3 round-trips objects and listings."""
+    s3 = FakeS3()
+    s3.put_object(Bucket='b', Key='u/resume_1.json', Body='{}')
+    assert s3.get_object(Bucket='b', Key='u/resume_1.json')['Body'].read() == b'{}'
+    pages = list(s3.get_paginator('list_objects_v2').paginate(Bucket='b', Prefix='u/'))
+    assert [obj['Key'] for obj in pages[0]['Contents']] == ['u/resume_1.json']
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from caching import LRUCache, DiskCache, SQLiteCache, TieredCache, SingleFlight
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test that the LRU cache stays within its byte budget."""
+    cache = LRUCache(max_bytes=10)
+    cache.set('a', b'12345')
+    cache.set('b', b'12345')
+    cache.get('a')
+    cache.set('c', b'12345')
+    assert cache.get('a') == b'12345'
+    assert cache.get('b') is None
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == 10
+
+
+def test_lru_cache_skips_oversized_values():
+    """Test that a value larger than the budget is not cached."""
+    cache = LRUCache(max_bytes=4)
+    cache.set('a', b'12345')
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_disk_cache_evicts_oldest_files(tmp_path):
+    """Test that the disk tier removes the oldest entries past its budget."""
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    cache.set('a', b'12345')
+    cache.set('b', b'12345')
+    old = tmp_path / cache._path('a').rsplit('/', 1)[1]
+    os.utime(old, (0, 0))
+    cache.set('c', b'12345')
+    assert cache.get('a') is None
+    assert cache.get('c') == b'12345'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_tiered_cache_streams_disk_hits(tmp_path):
+    """Test that disk hits are returned as open files."""
+    disk = DiskCache(str(tmp_path), max_bytes=1024)
+    disk.set('key', b'pdf-bytes')
+    cache = TieredCache(LRUCache(max_bytes=1024), disk)
+    with cache.open('key') as f:
+        assert f.read() == b'pdf-bytes'
+    assert cache.open('missing') is None
+    assert cache.stats()['hits'] == 1
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    """Test that entries older than the TTL are treated as misses."""
+    cache = LRUCache(max_bytes=100, ttl=10)
+    cache.set('a', b'1')
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 11)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_sqlite_cache_survives_restart(tmp_path):
+    """Test that the SQLite tier keeps entries across instances and caps its size."""
+    path = str(tmp_path / 'cache.db')
+    cache = SQLiteCache(path, max_entries=2)
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    cache.set('c', b'3')
+    reopened = SQLiteCache(path, max_entries=2)
+    assert reopened.get('a') is None
+    assert reopened.get('c') == b'3'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_single_flight_shares_concurrent_calls():
+    """Test that concurrent callers for one key share a single call."""
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return 'result'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.shared < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert results == ['result'] * 5
+
+
+def test_single_flight_streams_to_the_leader_and_shares_the_list():
+    """Test that the leader gets items as they come and waiting callers get the full list."""
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def produce():
+        calls.append(1)
+        yield 'a'
+        release.wait(5)
+        yield 'b'
+
+    stream = flight.stream('key', produce)
+    assert next(stream) == 'a'
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', lambda: ['other']))),
+               threading.Thread(target=lambda: results.append(list(flight.stream('key', produce))))]
+    for thread in threads:
+        thread.start()
+    while flight.shared < 2:
+        time.sleep(0.001)
+    release.set()
+    assert list(stream) == ['b']
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert results == [['a', 'b'], ['a', 'b']]
+
+
+def test_single_flight_waiters_start_over_when_the_leader_stops_early():
+    """Test that a caller waiting on an abandoned stream runs the call itself."""
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def produce():
+        yield 'a'
+        yield 'b'
+
+    stream = flight.stream('key', produce)
+    next(stream)
+    results = []
+
+    def follow():
+        started.set()
+        results.append(flight.do('key', lambda: ['own']))
+
+    thread = threading.Thread(target=follow)
+    thread.start()
+    started.wait(5)
+    while flight.shared < 1:
+        time.sleep(0.001)
+    stream.close()
+    thread.join()
+    assert results == [['own']]
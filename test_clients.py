@@ -0,0 +1,97 @@
+import threading
+import pytest
+from clients import LazyClient, create_http_session, urllib3_pool_stats
+
+
+class FakeClient:
+    region = 'us-east-2'
+
+    def get_object(self, Key):
+        return {'Key': Key}
+
+
+def test_client_is_built_on_first_use_and_cached():
+    """Test that the factory only runs when the client is first used."""
+    calls = []
+    client = LazyClient('s3', lambda: calls.append(1) or FakeClient())
+    assert not client.created
+    assert 'not created' in repr(client)
+    assert client.get_object(Key='a') == {'Key': 'a'}
+    assert client.region == 'us-east-2'
+    assert client.created
+    assert client.get() is client.get()
+    assert calls == [1]
+
+
+def test_concurrent_first_use_builds_one_client():
+    """Test that threads racing on first use share a single client."""
+    barrier = threading.Barrier(8)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return FakeClient()
+
+    client = LazyClient('s3', factory)
+    seen = []
+
+    def use():
+        barrier.wait()
+        seen.append(client.get())
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(c is seen[0] for c in seen)
+
+
+def test_failed_build_is_retried():
+    """Test that a factory error is raised to the caller and the next use tries again."""
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('no credentials')
+        return FakeClient()
+
+    client = LazyClient('s3', factory)
+    with pytest.raises(RuntimeError):
+        client.get()
+    assert not client.created
+    assert client.region == 'us-east-2'
+    assert len(attempts) == 2
+
+
+def test_http_session_reuses_pooled_connections():
+    """Test that repeated requests to one host share a kept-alive connection."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        session = create_http_session(pool_size=2)
+        url = f"http://127.0.0.1:{server.server_port}/oauth2/token"
+        for _ in range(5):
+            assert session.post(url, data={'code': 'abc'}, timeout=(1, 5)).json() == {}
+        stats = urllib3_pool_stats(session.get_adapter(url).poolmanager)
+        assert stats == {'hosts': 1, 'connections_opened': 1, 'requests': 5, 'idle_connections': 1}
+    finally:
+        server.shutdown()
+        server.server_close()
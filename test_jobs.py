@@ -0,0 +1,49 @@
+import threading
+import pytest
+from jobs import JobQueue, QueueFull
+
+
+@pytest.fixture
+def job_queue():
+    job_queue = JobQueue(workers=1, max_queue=1, name='test')
+    yield job_queue
+    job_queue.shutdown()
+
+
+def test_job_runs_in_background(job_queue):
+    """Test that a submitted job completes and records its timings."""
+    job = job_queue.submit(lambda x: x * 2, 21, owner='user')
+    assert job.wait(timeout=5)
+    assert job.status == 'done'
+    assert job.result == 42
+    assert job.service_time is not None
+    assert job_queue.get(job.id) is job
+    assert job_queue.stats()['completed'] == 1
+
+
+def test_failed_job_records_error(job_queue):
+    """Test that an exception in a job marks it as failed."""
+    def boom():
+        raise ValueError('render failed')
+    job = job_queue.submit(boom)
+    job.wait(timeout=5)
+    assert job.status == 'failed'
+    assert job.error == 'render failed'
+
+
+def test_full_queue_rejects_jobs(job_queue):
+    """Test that the queue is bounded and counts rejections."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    job_queue.submit(block)
+    assert started.wait(5)
+    job_queue.submit(lambda: None)
+    with pytest.raises(QueueFull):
+        job_queue.submit(lambda: None)
+    release.set()
+    assert job_queue.stats()['rejected'] == 1
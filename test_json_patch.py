@@ -0,0 +1,22 @@
+from json_patch import make_patch, apply_patch
+
+
+def test_patch_round_trip():
+    """Test that applying a generated patch reproduces the target document."""
+    src = {'name': 'A', 'skills': ['Python', 'SQL'], 'experience': [{'role': 'Dev', 'bullets': ['x']}]}
+    dst = {'name': 'B', 'skills': ['Python', 'Go'], 'experience': [{'role': 'Dev', 'bullets': ['x', 'y']}], 'a/b': 1}
+    assert apply_patch(src, make_patch(src, dst)) == dst
+    assert src['name'] == 'A'
+
+
+def test_patch_touches_only_changed_fields():
+    """Test that a single field edit produces a single small operation."""
+    src = {'name': 'A', 'summary': 'long text ' * 100}
+    ops = make_patch(src, dict(src, name='B'))
+    assert ops == [{'op': 'replace', 'path': '/name', 'value': 'B'}]
+
+
+def test_patch_removes_keys():
+    """Test that removed keys are dropped by the patch."""
+    src = {'name': 'A', 'phone': '1'}
+    assert apply_patch(src, make_patch(src, {'name': 'A'})) == {'name': 'A'}
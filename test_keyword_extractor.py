@@ -0,0 +1,43 @@
+import json
+from keyword_extractor import AhoCorasick, KeywordExtractor, load_lexicon
+
+
+def test_automaton_finds_overlapping_patterns():
+    """Test that every pattern occurrence is reported, including ones inside others."""
+    automaton = AhoCorasick([('he', 1), ('she', 2), ('hers', 3)])
+    assert sorted(automaton.finditer('ushers')) == [(1, 4, 2), (2, 4, 1), (2, 6, 3)]
+
+
+def test_synonyms_and_multi_word_terms_map_to_canonical_keywords():
+    """Test that synonyms, dotted names and phrases resolve to one keyword each."""
+    extractor = KeywordExtractor()
+    keywords = extractor.extract(
+        'Build RESTful services in Golang and React.js on Amazon Web Services; '
+        'set up continuous integration and k8s.'
+    )
+    assert set(keywords) == {'REST APIs', 'Go', 'React', 'AWS', 'CI/CD', 'Kubernetes'}
+
+
+def test_matches_respect_word_boundaries_and_case_sensitive_terms():
+    """Test that keywords inside other words and everyday homonyms are not matched."""
+    extractor = KeywordExtractor()
+    keywords = extractor.extract('We go the extra mile, javascripting aside, and rest on Fridays in Go.')
+    assert keywords == ['Go']
+
+
+def test_specific_and_repeated_keywords_rank_first():
+    """Test that tools outrank soft skills and repeated mentions raise the score."""
+    extractor = KeywordExtractor()
+    keywords = extractor.extract('Strong communication skills. SQL, Python, Python and more Python. HIPAA.')
+    assert keywords[0] == 'Python'
+    assert keywords.index('SQL') < keywords.index('Communication')
+    assert 'HIPAA' in keywords
+    assert extractor.extract('Python, SQL and Docker', limit=2) == ['Python', 'SQL']
+
+
+def test_lexicon_file_adds_custom_keywords(tmp_path):
+    """Test that a JSON lexicon file extends the built-in lexicon."""
+    path = tmp_path / 'lexicon.json'
+    path.write_text(json.dumps({'Workday': ['workday hcm']}))
+    extractor = KeywordExtractor(load_lexicon(str(path)))
+    assert extractor.extract('Experience with Workday HCM and Python') == ['Python', 'Workday']
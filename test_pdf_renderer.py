@@ -0,0 +1,231 @@
+import contextvars
+import re
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+import pytest
+from pdf_renderer import BrowserPool, font_face_css
+
+
+class FakeRequest:
+    def __init__(self, url):
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, url):
+        self.request = FakeRequest(url)
+        self.outcome = None
+
+    def fulfill(self, status, body, content_type):
+        self.outcome = ('fulfilled', body, content_type)
+
+    def abort(self):
+        self.outcome = ('aborted',)
+
+    def continue_(self):
+        self.outcome = ('continued',)
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.browser = context.browser
+        self.html = None
+
+    def set_content(self, html, timeout=None):
+        if self.browser.block_on == html:
+            self.browser.unblock.wait(5)
+        if self.browser.crash_on == html:
+            self.browser.connected = False
+            raise RuntimeError("Target closed")
+        # Every linked URL is requested through the context's route handler
+        for url in re.findall(r'(?:href|src)="([^"]+)"', html):
+            route = FakeRoute(url)
+            self.context.handler(route)
+            self.context.routes.append(route)
+        self.html = html
+
+    def pdf(self, **options):
+        return f"PDF:{self.html}".encode()
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+        self.handler = None
+        self.routes = []
+
+    def route(self, pattern, handler):
+        self.handler = handler
+
+    def new_page(self):
+        return FakePage(self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, crash_on=None, block_on=None, unblock=None):
+        self.crash_on = crash_on
+        self.block_on = block_on
+        self.unblock = unblock
+        self.connected = True
+        self.contexts = []
+
+    def new_context(self):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def stop(self):
+        pass
+
+
+class FakeBrowserPool(BrowserPool):
+    def __init__(self, crash_on=None, block_on=None, **kwargs):
+        super().__init__(**kwargs)
+        self.crash_on = crash_on
+        self.block_on = block_on
+        self.unblock = threading.Event()
+        self.browsers = []
+
+    def _start_playwright(self):
+        return FakePlaywright()
+
+    def _launch_browser(self, playwright):
+        browser = FakeBrowser(crash_on=self.crash_on, block_on=self.block_on, unblock=self.unblock)
+        self.browsers.append(browser)
+        return browser
+
+
+@pytest.fixture
+def pool():
+    pool = FakeBrowserPool(size=1, max_page_uses=2, render_timeout=5, crash_on='<crash>')
+    yield pool
+    pool.shutdown()
+
+
+def test_render_pdf_reuses_warm_browser(pool):
+    """Test that consecutive renders share one launched browser."""
+    assert pool.render_pdf('<a>', {}) == b'PDF:<a>'
+    assert pool.render_pdf('<b>', {}) == b'PDF:<b>'
+    assert pool.stats()['browser_launches'] == 1
+    assert pool.stats()['renders'] == 2
+
+
+def test_page_is_recycled_after_reuse_limit(pool):
+    """Test that a page's context is replaced once it hits the reuse limit."""
+    for html in ['<a>', '<b>', '<c>']:
+        pool.render_pdf(html, {})
+    browser = pool.browsers[0]
+    assert len(browser.contexts) == 2
+    assert browser.contexts[0].closed
+    assert pool.stats()['page_recycles'] == 1
+
+
+def test_crashed_browser_is_relaunched(pool):
+    """Test that a browser crash fails one render and the next gets a new browser."""
+    pool.render_pdf('<a>', {})
+    with pytest.raises(RuntimeError):
+        pool.render_pdf('<crash>', {})
+    assert pool.render_pdf('<b>', {}) == b'PDF:<b>'
+    assert len(pool.browsers) == 2
+    assert pool.stats()['browser_recycles'] == 1
+
+
+def test_timed_out_render_is_dropped_from_the_queue():
+    """Test that a render nobody waits for any more is never printed."""
+    pool = FakeBrowserPool(size=1, block_on='<slow>')
+    try:
+        first = threading.Thread(target=pool.render_pdf, args=('<slow>', {}))
+        first.start()
+        with pytest.raises(FutureTimeoutError):
+            pool.render_pdf('<abandoned>', {}, timeout=0.05)
+        pool.unblock.set()
+        first.join()
+        assert pool.render_pdf('<b>', {}) == b'PDF:<b>'
+        assert pool.stats()['renders'] == 2
+    finally:
+        pool.unblock.set()
+        pool.shutdown()
+
+
+def test_shutdown_closes_browsers(pool):
+    """Test that shutdown closes browsers and rejects new renders."""
+    pool.render_pdf('<a>', {})
+    pool.shutdown()
+    assert not pool.browsers[0].is_connected()
+    with pytest.raises(RuntimeError):
+        pool.render_pdf('<b>', {})
+
+
+def test_requests_are_served_from_assets_or_aborted():
+    """Test that known assets are fulfilled from memory and everything else is blocked."""
+    css_url = 'https://fonts.example/inter.css'
+    pool = FakeBrowserPool(size=1, assets={css_url: (b'@font-face {}', 'text/css')})
+    try:
+        pool.render_pdf(f'<link href="{css_url}"><img src="https://tracker.example/pixel.gif">', {})
+        routes = pool.browsers[0].contexts[0].routes
+        assert [route.outcome for route in routes] == [('fulfilled', b'@font-face {}', 'text/css'), ('aborted',)]
+        assert pool.stats()['served_assets'] == 1
+        assert pool.stats()['blocked_requests'] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_requests_under_network_prefixes_are_fetched():
+    """Test that URLs under a network prefix reach the network while everything else stays blocked."""
+    pool = FakeBrowserPool(size=1, network_prefixes=('https://fonts.example/',))
+    try:
+        pool.render_pdf('<link href="https://fonts.example/inter.css"><img src="https://tracker.example/pixel.gif">', {})
+        routes = pool.browsers[0].contexts[0].routes
+        assert [route.outcome for route in routes] == [('continued',), ('aborted',)]
+        assert pool.stats()['network_requests'] == 1
+        assert pool.stats()['blocked_requests'] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_render_spans_run_in_the_callers_context():
+    """Test that page spans are timed on the worker but see the requesting thread's context."""
+    request_id = contextvars.ContextVar('request_id', default=None)
+    spans = []
+
+    @contextmanager
+    def span(name):
+        yield
+        spans.append((name, request_id.get()))
+
+    pool = FakeBrowserPool(size=1, span=span)
+    try:
+        request_id.set('req-1')
+        pool.render_pdf('<a>', {})
+        assert spans == [('page.set_content', 'req-1'), ('page.pdf', 'req-1')]
+    finally:
+        pool.shutdown()
+
+
+def test_font_face_css_embeds_local_fonts(tmp_path):
+    """Test that font files become @font-face rules with data URIs and parsed weights."""
+    (tmp_path / 'Inter-SemiBold.woff2').write_bytes(b'font')
+    (tmp_path / 'Inter-Italic.ttf').write_bytes(b'font')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    css = font_face_css(str(tmp_path))
+    rules = css.split('\n')
+    assert len(rules) == 2
+    assert "font-style: italic; font-weight: 400;" in rules[0]
+    assert "format('truetype')" in rules[0]
+    assert "font-weight: 600;" in rules[1]
+    assert 'url(data:font/woff2;base64,Zm9udA==)' in rules[1]
+    assert font_face_css(str(tmp_path / 'missing')) == ''
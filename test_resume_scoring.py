@@ -0,0 +1,34 @@
+from resume_scoring import KeywordMatcher, ResumeIndex, normalize, score_resume
+
+
+RESUME = {
+    'summary': 'Backend engineer focused on Node.js services.',
+    'skills': 'Python, C++, CI/CD',
+    'job_title': ['Software Engineer'],
+    'job_description': [['Ran Kubernetes clusters on AWS.', 'Wrote SQL reports']],
+    'project_title': ['Resume builder'],
+    'project_description': [['Flask app using Playwright']],
+}
+
+
+def test_normalize_keeps_skill_punctuation():
+    """Test that normalization keeps punctuation inside skill names but drops it elsewhere."""
+    assert normalize('Node.js, C++ and CI/CD.') == ' node.js c++ and ci/cd '
+
+
+def test_coverage_is_reported_per_section():
+    """Test that keywords are matched as whole words and attributed to their sections."""
+    matcher = KeywordMatcher(['Python', 'AWS', 'node.js', 'Java', 'Flask', 'SQL', 'python'])
+    result = score_resume(ResumeIndex(RESUME), matcher)
+    assert result['matched'] == ['Python', 'AWS', 'node.js', 'Flask', 'SQL']
+    assert result['missing'] == ['Java']
+    assert result['score'] == 83
+    assert result['sections']['experience'] == {'matched': ['AWS', 'SQL'], 'score': 33}
+    assert result['sections']['education'] == {'matched': [], 'score': 0}
+
+
+def test_synonyms_count_towards_a_keyword():
+    """Test that a synonym in the resume covers the keyword it stands for."""
+    matcher = KeywordMatcher(['K8s', 'Continuous Integration'],
+                             synonyms={'k8s': ['Kubernetes'], 'continuous integration': ['CI/CD']})
+    assert score_resume(ResumeIndex(RESUME), matcher)['score'] == 100
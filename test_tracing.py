@@ -0,0 +1,74 @@
+import contextvars
+import threading
+from tracing import Histogram, Tracer, render_metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that buckets are cumulative and each label set is its own series."""
+    histogram = Histogram('span_seconds', 'Span time', ('span',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, span='a')
+    histogram.observe(0.5, span='a')
+    histogram.observe(5, span='a')
+    histogram.observe(0.2, span='b "quoted"')
+    lines = render_metrics(histogram).splitlines()
+    assert lines[:2] == ['# HELP span_seconds Span time', '# TYPE span_seconds histogram']
+    assert 'span_seconds_bucket{span="a",le="0.1"} 1' in lines
+    assert 'span_seconds_bucket{span="a",le="1.0"} 2' in lines
+    assert 'span_seconds_bucket{span="a",le="+Inf"} 3' in lines
+    assert 'span_seconds_sum{span="a"} 5.55' in lines
+    assert 'span_seconds_count{span="a"} 3' in lines
+    assert 'span_seconds_count{span="b \\"quoted\\""} 1' in lines
+
+
+def test_spans_are_recorded_to_histogram_and_current_trace():
+    """Test that spans always reach the histogram and only the active request's trace."""
+    histogram = Histogram('span_seconds', 'Span time', ('span',))
+    tracer = Tracer(histogram)
+    with tracer.span('outside'):
+        pass
+    trace = tracer.begin()
+    with tracer.span('s3.get_object'):
+        pass
+
+    @tracer.traced()
+    def save_resume_to_s3():
+        return 'saved'
+
+    assert save_resume_to_s3() == 'saved'
+    with tracer.span('s3.get_object'):
+        pass
+    tracer.end()
+    assert list(trace.totals()) == ['s3.get_object', 'save_resume_to_s3']
+    assert trace.totals()['s3.get_object'][1] == 2
+    assert 'span_seconds_count{span="outside"} 1' in histogram.render()
+
+
+def test_spans_in_other_threads_join_the_request_trace():
+    """Test that work run under a copy of the request's context is attributed to it."""
+    tracer = Tracer(Histogram('span_seconds', 'Span time', ('span',)))
+    trace = tracer.begin()
+
+    def fetch():
+        with tracer.span('s3.get_object'):
+            pass
+
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(fetch,)) for _ in range(3)]
+    threads.append(threading.Thread(target=fetch))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert trace.totals()['s3.get_object'][1] == 3
+
+
+def test_server_timing_header_aggregates_spans_by_name():
+    """Test that repeated spans are summed into one Server-Timing entry with a call count."""
+    tracer = Tracer(Histogram('span_seconds', 'Span time', ('span',)))
+    trace = tracer.begin()
+    tracer.record('s3.get_object', 0.010)
+    tracer.record('s3.get_object', 0.0025)
+    tracer.record('render_template', 0.001)
+    entries = trace.server_timing().split(', ')
+    assert entries[0] == 's3.get_object;dur=12.5;desc="2 calls"'
+    assert entries[1] == 'render_template;dur=1.0'
+    assert entries[2].startswith('total;dur=')
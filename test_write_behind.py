@@ -0,0 +1,51 @@
+from write_behind import WriteBehindBuffer
+
+
+def test_writes_are_coalesced_per_key():
+    """Test that only the latest pending write per key is flushed."""
+    flushed = []
+    buffer = WriteBehindBuffer(flushed.append, max_pending=10, flush_interval=60)
+    buffer.put('a', 1)
+    buffer.put('a', 2)
+    buffer.put('b', 3)
+    assert buffer.get('a') == 2
+    buffer.flush()
+    assert flushed == [{'a': 2, 'b': 3}]
+    assert buffer.stats()['coalesced'] == 1
+    buffer.shutdown()
+
+
+def test_values_being_flushed_stay_readable():
+    """Test that get still returns a value while the flush writing it is in progress."""
+    seen = []
+    buffer = WriteBehindBuffer(lambda items: seen.append(buffer.get('a')), max_pending=10, flush_interval=60)
+    buffer.put('a', 1)
+    buffer.flush()
+    assert seen == [1]
+    assert buffer.get('a') is None
+    buffer.shutdown()
+
+
+def test_size_threshold_triggers_background_flush():
+    """Test that reaching max_pending wakes the background flusher."""
+    flushed = []
+    buffer = WriteBehindBuffer(flushed.append, max_pending=2, flush_interval=60)
+    buffer.put('a', 1)
+    buffer.put('b', 2)
+    for _ in range(100):
+        if flushed:
+            break
+        buffer._thread.join(0.01)
+    assert flushed == [{'a': 1, 'b': 2}]
+    buffer.shutdown()
+
+
+def test_shutdown_flushes_pending_writes():
+    """Test that pending writes are not lost on shutdown."""
+    flushed = []
+    buffer = WriteBehindBuffer(flushed.append, max_pending=10, flush_interval=60)
+    buffer.put('a', 1)
+    buffer.shutdown()
+    assert flushed == [{'a': 1}]
+    buffer.put('b', 2)
+    assert flushed == [{'a': 1}, {'b': 2}]
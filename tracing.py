@@ -0,0 +1,153 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+# Seconds; spans range from sub-millisecond cache reads to multi-second model calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value):
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus text format, one series per label combination"""
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        """Lines of the Prometheus exposition format for this histogram"""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, dict(value, counts=list(value['counts']))) for key, value in self._series.items())
+        for key, value in series:
+            labels = [f'{name}="{_escape(label)}"' for name, label in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, count in zip(self.buckets, value['counts']):
+                cumulative += count
+                bucket_labels = ','.join(labels + [f'le="{_format_value(bound)}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = '{' + ','.join(labels) + '}' if labels else ''
+            lines.append(f"{self.name}_sum{suffix} {value['sum']!r}")
+            lines.append(f"{self.name}_count{suffix} {value['count']}")
+        return lines
+
+
+def render_metrics(*metrics):
+    """Prometheus text exposition of several metrics"""
+    return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+
+class RequestTrace:
+    """Spans recorded while serving one request, possibly from several threads"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._spans = []
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self._spans.append((name, seconds))
+
+    def totals(self):
+        """Total seconds and number of spans per name, in the order names first appeared"""
+        totals = {}
+        with self._lock:
+            spans = list(self._spans)
+        for name, seconds in spans:
+            total, count = totals.get(name, (0.0, 0))
+            totals[name] = (total + seconds, count + 1)
+        return totals
+
+    def server_timing(self):
+        """Server-Timing header value: one entry per span name plus the total so far"""
+        entries = []
+        for name, (seconds, count) in self.totals().items():
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                entry += f';desc="{count} calls"'
+            entries.append(entry)
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ', '.join(entries)
+
+
+class Tracer:
+    """Times named spans into a histogram and into the trace of the request being served.
+
+    The current trace lives in a context variable, so work handed to another
+    thread is attributed to the request when run under a copy of the caller's
+    context (contextvars.copy_context().run).
+    """
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self._trace = contextvars.ContextVar('request_trace', default=None)
+
+    def begin(self):
+        trace = RequestTrace()
+        self._trace.set(trace)
+        return trace
+
+    def end(self):
+        self._trace.set(None)
+
+    def current(self):
+        return self._trace.get()
+
+    def record(self, name, seconds):
+        self.histogram.observe(seconds, span=name)
+        trace = self._trace.get()
+        if trace is not None:
+            trace.add(name, seconds)
+
+    def start(self, name):
+        """Start a span and return the callable that ends it, for code that cannot use a with block"""
+        started = time.perf_counter()
+        return lambda: self.record(name, time.perf_counter() - started)
+
+    @contextmanager
+    def span(self, name):
+        finish = self.start(name)
+        try:
+            yield
+        finally:
+            finish()
+
+    def traced(self, name=None):
+        """Decorator timing every call of a function as a span (named after the function by default)"""
+        def decorator(f):
+            span_name = name or f.__name__
+
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return f(*args, **kwargs)
+            return wrapper
+        return decorator
@@ -0,0 +1,103 @@
+import threading
+
+
+class WriteBehindBuffer:
+    """Coalesce keyed writes in memory and flush them from a background thread.
+
+    Only the latest value per key is kept. A flush runs when max_pending keys
+    are waiting, every flush_interval seconds, and on shutdown.
+    """
+
+    def __init__(self, flush_fn, max_pending=100, flush_interval=5.0, name='write-behind'):
+        self.flush_fn = flush_fn
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.name = name
+        self._pending = {}
+        # Taken out of _pending by a flush that has not finished writing them yet
+        self._flushing = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+        self._stats = {'writes': 0, 'coalesced': 0, 'flushes': 0, 'flushed': 0, 'errors': 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def put(self, key, value):
+        """Queue a write, replacing any pending write for the same key"""
+        self.start()
+        with self._lock:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._stats['writes'] += 1
+                if key in self._pending:
+                    self._stats['coalesced'] += 1
+                self._pending[key] = value
+                if len(self._pending) >= self.max_pending:
+                    self._wakeup.set()
+        if closed:
+            # Late writes after shutdown go straight through rather than being lost
+            self.flush_fn({key: value})
+
+    def get(self, key):
+        """Return the pending value for a key, if it has not been written yet"""
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            return self._flushing.get(key)
+
+    def flush(self):
+        """Write out everything pending now"""
+        with self._flush_lock:
+            with self._lock:
+                items, self._pending = self._pending, {}
+                self._flushing = items
+            if not items:
+                return
+            try:
+                self.flush_fn(items)
+            except Exception as e:
+                print(f"{self.name} flush failed: {e}")
+                with self._lock:
+                    self._stats['errors'] += 1
+                return
+            finally:
+                with self._lock:
+                    self._flushing = {}
+            with self._lock:
+                self._stats['flushes'] += 1
+                self._stats['flushed'] += len(items)
+
+    def shutdown(self):
+        """Stop the background thread and flush whatever is still pending"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        return stats
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self._lock:
+                closed = self._closed
+            if closed:
+                break
+            self.flush()
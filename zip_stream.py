@@ -0,0 +1,38 @@
+import zipfile
+
+
+class ZipChunkWriter:
+    """Write-only file object that collects ZIP output until it is drained.
+
+    It deliberately has no tell()/seek(), so zipfile writes entries with data
+    descriptors and never needs to rewind already-sent bytes.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries):
+    """Yield a ZIP archive chunk by chunk from an iterable of (name, bytes) pairs"""
+    writer = ZipChunkWriter()
+    with zipfile.ZipFile(writer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            chunk = writer.drain()
+            if chunk:
+                yield chunk
+    chunk = writer.drain()
+    if chunk:
+        yield chunk